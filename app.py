@@ -10,12 +10,16 @@ import openai
 import nicegui.run as nicegui_run
 from nicegui import ui
 
+from backend.llm import chat_completion
+from backend.openai_client import get_openai_client
+from backend.token_budget import fit_messages
 from config import get_secret
-from scripts.analyze_gioia import analyze_gioia
+from scripts.analyze_gioia import analyze_gioia, analyze_gioia_text
 from scripts.export_results import export_all_formats
-from scripts.simulate_interviews import simulate_interview
+from scripts.simulate_interviews import simulate_interview_async
 from utils.docx_parser import extract_questions_from_docx, extract_text_from_docx
 from utils.pdf_parser import (
+    QUESTION_TEXT_MAX_CHARS,
     extract_questions_with_ai,
     extract_text_from_pdf,
     validate_and_improve_questions,
@@ -237,7 +241,7 @@ def get_client() -> openai.OpenAI:
     api_key = get_secret("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is not configured.")
-    return openai.OpenAI(api_key=api_key)
+    return get_openai_client()
 
 
 def run_comparison(ai_file: Path) -> str:
@@ -246,7 +250,8 @@ def run_comparison(ai_file: Path) -> str:
     ai_text = "\n".join([f"Q: {item['question']}\nA: {item['answer']}" for item in ai_responses])
     settings = state["study_settings"]
 
-    comparison_prompt = f"""
+    def build_messages(sections: dict[str, str]) -> list[dict[str, str]]:
+        comparison_prompt = f"""
     You are supporting a qualitative research project comparing real interviews to AI-simulated persona interviews.
 
     The study logic is:
@@ -264,15 +269,12 @@ def run_comparison(ai_file: Path) -> str:
     6. Research implications, including where AI may be useful as an augmentative tool and where it falls short
 
     Real interview transcript:
-    {real_transcript[:5000]}
+    {sections["transcript"]}
 
     AI-generated interview:
-    {ai_text[:5000]}
+    {sections["ai_transcript"]}
     """
-
-    response = get_client().chat.completions.create(
-        model=settings.get("model", "gpt-4o-mini"),
-        messages=[
+        return [
             {
                 "role": "system",
                 "content": (
@@ -281,8 +283,18 @@ def run_comparison(ai_file: Path) -> str:
                 ),
             },
             {"role": "user", "content": comparison_prompt},
-        ],
-        max_tokens=settings.get("analysis_max_tokens", 2200),
+        ]
+
+    model = settings.get("model", "gpt-4o-mini")
+    max_tokens = settings.get("analysis_max_tokens", 2200)
+    messages, _ = fit_messages(
+        model, build_messages, {"transcript": real_transcript, "ai_transcript": ai_text}, completion_tokens=max_tokens
+    )
+    response = chat_completion(
+        get_client(),
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
         temperature=settings.get("analysis_temperature", 0.3),
     )
     return response.choices[0].message.content or ""
@@ -294,7 +306,8 @@ def run_structured_comparison(ai_file: Path) -> dict[str, Any] | None:
     ai_text = "\n".join([f"Q: {item['question']}\nA: {item['answer']}" for item in ai_responses])
     settings = state["study_settings"]
 
-    prompt = f"""
+    def build_messages(sections: dict[str, str]) -> list[dict[str, str]]:
+        prompt = f"""
     Compare a real interview transcript against an AI-generated interview and return valid JSON only.
 
     Use this structure exactly:
@@ -341,22 +354,29 @@ def run_structured_comparison(ai_file: Path) -> dict[str, Any] | None:
     - Additional analysis focus: {settings.get("analysis_focus", "")}
 
     Real transcript:
-    {real_transcript[:6000]}
+    {sections["transcript"]}
 
     AI transcript:
-    {ai_text[:6000]}
+    {sections["ai_transcript"]}
     """
-
-    response = get_client().chat.completions.create(
-        model=settings.get("model", "gpt-4o-mini"),
-        messages=[
+        return [
             {
                 "role": "system",
                 "content": "You are an expert qualitative researcher. Return valid JSON only.",
             },
             {"role": "user", "content": prompt},
-        ],
-        max_tokens=settings.get("analysis_max_tokens", 2200),
+        ]
+
+    model = settings.get("model", "gpt-4o-mini")
+    max_tokens = settings.get("analysis_max_tokens", 2200)
+    messages, _ = fit_messages(
+        model, build_messages, {"transcript": real_transcript, "ai_transcript": ai_text}, completion_tokens=max_tokens
+    )
+    response = chat_completion(
+        get_client(),
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
         temperature=settings.get("analysis_temperature", 0.3),
     )
     return extract_json_payload(response.choices[0].message.content or "")
@@ -365,7 +385,7 @@ def run_structured_comparison(ai_file: Path) -> dict[str, Any] | None:
 def run_real_interview_analysis() -> str:
     real_transcript = safe_read_text(REAL_TRANSCRIPT_PATH)
     settings = state["study_settings"]
-    prompt = f"""
+    instructions = f"""
     Analyze this real interview transcript using Gioia methodology.
     Return markdown with:
     - 3 aggregate dimensions
@@ -374,20 +394,13 @@ def run_real_interview_analysis() -> str:
     - representative quotes
     - a short memo on what is especially human, contextual, or surprising in the transcript
     - additional analysis focus: {settings.get("analysis_focus", "")}
-
-    Transcript:
-    {real_transcript[:6000]}
     """
-    response = get_client().chat.completions.create(
-        model=settings.get("model", "gpt-4o-mini"),
-        messages=[
-            {"role": "system", "content": "You are an expert qualitative researcher using the Gioia methodology."},
-            {"role": "user", "content": prompt},
-        ],
-        max_tokens=settings.get("analysis_max_tokens", 2200),
-        temperature=settings.get("analysis_temperature", 0.3),
+    # Long transcripts are coded chunk by chunk in parallel and merged, so nothing is cut off.
+    return analyze_gioia_text(
+        real_transcript,
+        settings={"model": "gpt-4o-mini", "analysis_max_tokens": 2200, **settings},
+        instructions=instructions,
     )
-    return response.choices[0].message.content or ""
 
 
 def metric_card(label: str, value: str) -> None:
@@ -439,7 +452,7 @@ def handle_questions_upload(event) -> None:
         name = event.name
         suffix = Path(name).suffix.lower()
         if suffix == ".pdf":
-            text = extract_text_from_pdf(bytes_to_buffer(content, name))
+            text = extract_text_from_pdf(bytes_to_buffer(content, name), max_chars=QUESTION_TEXT_MAX_CHARS)
             questions = extract_questions_with_ai(text)
         elif suffix == ".docx":
             questions = extract_questions_from_docx(bytes_to_buffer(content, name))
@@ -829,14 +842,16 @@ def render_simulation_lab() -> None:
             label="Choose personas to simulate",
         ).classes("w-full q-mt-md")
 
-        def simulate_many(paths: list[Path]) -> None:
+        async def simulate_many(paths: list[Path]) -> None:
             try:
                 if not paths:
                     ui.notify("Choose at least one persona.", type="warning")
                     return
                 for persona_path in paths:
                     output_path = AI_RESPONSES_DIR / f"{persona_path.stem}_responses.json"
-                    simulate_interview(str(persona_path), str(QUESTIONS_PATH), str(output_path), settings=state["study_settings"])
+                    await simulate_interview_async(
+                        str(persona_path), str(QUESTIONS_PATH), str(output_path), settings=state["study_settings"]
+                    )
                 ui.notify(f"Generated {len(paths)} AI interview(s).", type="positive")
                 refresh_page()
             except Exception as exc:
@@ -1013,10 +1028,11 @@ def render_analysis_studio() -> None:
             except Exception as exc:
                 notify_error("AI interview analysis failed.", exc)
 
-        def export_selected_ai() -> None:
+        async def export_selected_ai() -> None:
             try:
                 ai_path = selected_ai_path()
-                export_all_formats(str(ai_path), ai_path.stem, output_dir=str(EXPORTS_DIR))
+                # Off the event loop, so the page stays responsive while DOCX and PDF render.
+                await nicegui_run.io_bound(export_all_formats, str(ai_path), ai_path.stem, output_dir=str(EXPORTS_DIR))
                 ui.notify("Interview exported to DOCX, PDF, CSV, TXT, and HTML.", type="positive")
                 refresh_page()
             except Exception as exc:
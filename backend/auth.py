@@ -1,3 +1,9 @@
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any
 
@@ -7,6 +13,11 @@ from backend.errors import AuthenticationError, SupabaseOperationError
 from backend.settings import settings
 from backend.storage import get_supabase_admin_client, get_supabase_auth_client
 
+try:
+    import jwt
+except Exception:  # pragma: no cover - optional until installed/configured
+    jwt = None
+
 
 @dataclass
 class AuthContext:
@@ -16,6 +27,100 @@ class AuthContext:
     access_token: str
 
 
+_UNRESOLVED = object()
+_metrics_lock = threading.Lock()
+_metrics = {
+    "resolutions": 0,
+    "memoized_hits": 0,
+    "remote_calls": 0,
+    "token_cache_hits": 0,
+    "token_cache_misses": 0,
+    "total_ms": 0.0,
+    "max_ms": 0.0,
+}
+
+
+class TokenContextCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, AuthContext]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(access_token: str) -> str:
+        return hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _token_expiry(access_token: str) -> float | None:
+        try:
+            payload = access_token.split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+            return float(claims["exp"])
+        except Exception:
+            return None
+
+    def get(self, access_token: str) -> AuthContext | None:
+        key = self._key(access_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, context = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return context
+
+    def put(self, access_token: str, context: AuthContext) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        token_expiry = self._token_expiry(access_token)
+        if token_expiry is not None:
+            expires_at = min(expires_at, token_expiry)
+        if expires_at <= time.time():
+            return
+        key = self._key(access_token)
+        with self._lock:
+            self._entries[key] = (expires_at, context)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, access_token: str) -> None:
+        with self._lock:
+            self._entries.pop(self._key(access_token), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_token_cache = TokenContextCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+
+
+def _count_remote_call() -> None:
+    with _metrics_lock:
+        _metrics["remote_calls"] += 1
+
+
+def _record_resolution(duration_ms: float) -> None:
+    with _metrics_lock:
+        _metrics["resolutions"] += 1
+        _metrics["total_ms"] += duration_ms
+        _metrics["max_ms"] = max(_metrics["max_ms"], duration_ms)
+
+
+def auth_metrics() -> dict[str, float | int]:
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    resolutions = snapshot["resolutions"]
+    snapshot["avg_ms"] = snapshot["total_ms"] / resolutions if resolutions else 0.0
+    return snapshot
+
+
 def _extract_bearer_token(request: Request) -> str | None:
     header = request.headers.get("Authorization")
     if not header:
@@ -36,18 +141,24 @@ def _extract_refresh_token(request: Request) -> str | None:
     return request.cookies.get(settings.auth_refresh_cookie_name)
 
 
-def _read_user_role(user: Any) -> str | None:
-    metadata = getattr(user, "user_metadata", None)
-    if isinstance(metadata, dict) and metadata.get("role"):
-        return str(metadata["role"])
-    app_metadata = getattr(user, "app_metadata", None)
+def _role_from_metadata(user_metadata: Any, app_metadata: Any) -> str | None:
+    if isinstance(user_metadata, dict) and user_metadata.get("role"):
+        return str(user_metadata["role"])
     if isinstance(app_metadata, dict) and app_metadata.get("role"):
         return str(app_metadata["role"])
     return None
 
 
+def _read_user_role(user: Any) -> str | None:
+    return _role_from_metadata(getattr(user, "user_metadata", None), getattr(user, "app_metadata", None))
+
+
 def _profile_role_for_user(user_id: str) -> str | None:
-    client = get_supabase_admin_client()
+    try:
+        client = get_supabase_admin_client()
+    except Exception:
+        return None
+    _count_remote_call()
     try:
         response = client.table("profiles").select("role").eq("id", user_id).limit(1).execute()
     except Exception:
@@ -59,8 +170,47 @@ def _profile_role_for_user(user_id: str) -> str | None:
     return str(role) if role else None
 
 
+_profile_roles: OrderedDict[str, tuple[float, str | None]] = OrderedDict()
+_profile_roles_lock = threading.Lock()
+
+
+def _cached_profile_role(user_id: str) -> str | None:
+    # Both verification modes read the role from `profiles`; cache it so local verification stays in-process.
+    now = time.time()
+    with _profile_roles_lock:
+        entry = _profile_roles.get(user_id)
+        if entry is not None and entry[0] > now:
+            _profile_roles.move_to_end(user_id)
+            return entry[1]
+    role = _profile_role_for_user(user_id)
+    if settings.auth_cache_max_entries <= 0 or settings.auth_cache_ttl_seconds <= 0:
+        return role
+    with _profile_roles_lock:
+        _profile_roles[user_id] = (now + settings.auth_cache_ttl_seconds, role)
+        _profile_roles.move_to_end(user_id)
+        while len(_profile_roles) > settings.auth_cache_max_entries:
+            _profile_roles.popitem(last=False)
+    return role
+
+
 def _resolve_auth_context_from_token(access_token: str) -> AuthContext:
+    cached = _token_cache.get(access_token)
+    with _metrics_lock:
+        _metrics["token_cache_hits" if cached else "token_cache_misses"] += 1
+    if cached is not None:
+        return cached
+
+    context = _validate_access_token(access_token)
+    _token_cache.put(access_token, context)
+    return context
+
+
+def _validate_access_token(access_token: str) -> AuthContext:
+    if settings.auth_verification_mode.lower() == "local":
+        return _verify_access_token_locally(access_token)
+
     client = get_supabase_auth_client()
+    _count_remote_call()
     try:
         user_response = client.auth.get_user(access_token)
     except Exception as exc:  # pragma: no cover - external call
@@ -69,12 +219,60 @@ def _resolve_auth_context_from_token(access_token: str) -> AuthContext:
     user = getattr(user_response, "user", None)
     if not user:
         raise AuthenticationError("Supabase session is invalid.")
+    return _context_from_user(user, access_token)
+
+
+_jwks_client_singleton: Any = None
 
+
+def _get_jwks_client() -> Any:
+    global _jwks_client_singleton
+    if _jwks_client_singleton is not None:
+        return _jwks_client_singleton
+
+    jwks_url = settings.supabase_jwks_url
+    if not jwks_url:
+        if not settings.supabase_url:
+            # A deployment error, not a bad token: a 401 would only send the client into a refresh loop.
+            raise RuntimeError("SUPABASE_JWKS_URL or SUPABASE_URL is required for local token verification.")
+        jwks_url = f"{settings.supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json"
+    _jwks_client_singleton = jwt.PyJWKClient(jwks_url, cache_keys=True, lifespan=settings.supabase_jwks_cache_seconds)
+    return _jwks_client_singleton
+
+
+def _verify_access_token_locally(access_token: str) -> AuthContext:
+    if jwt is None:
+        raise RuntimeError("PyJWT is not installed.")
+    try:
+        algorithm = jwt.get_unverified_header(access_token).get("alg")
+        if algorithm == "HS256":
+            if not settings.supabase_jwt_secret:
+                raise RuntimeError("SUPABASE_JWT_SECRET is required to verify HS256 access tokens.")
+            key: Any = settings.supabase_jwt_secret
+        else:
+            key = _get_jwks_client().get_signing_key_from_jwt(access_token).key
+        claims = jwt.decode(
+            access_token,
+            key,
+            algorithms=[algorithm] if algorithm in {"HS256", "RS256", "ES256"} else ["RS256", "ES256"],
+            audience=settings.auth_jwt_audience,
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.PyJWTError as exc:
+        raise AuthenticationError("Supabase access token is invalid or expired.") from exc
+
+    user_id = str(claims["sub"])
+    # Same precedence as the remote path, so a token gets the same role in either mode.
+    role = _cached_profile_role(user_id) or _role_from_metadata(claims.get("user_metadata"), claims.get("app_metadata"))
+    return AuthContext(user_id=user_id, email=claims.get("email"), role=role, access_token=access_token)
+
+
+def _context_from_user(user: Any, access_token: str) -> AuthContext:
     user_id = str(getattr(user, "id", "") or "")
     if not user_id:
         raise AuthenticationError("Supabase user id is missing.")
 
-    role = _profile_role_for_user(user_id) or _read_user_role(user)
+    role = _cached_profile_role(user_id) or _read_user_role(user)
     return AuthContext(
         user_id=user_id,
         email=getattr(user, "email", None),
@@ -87,7 +285,35 @@ def get_auth_context_from_access_token(access_token: str) -> AuthContext:
     return _resolve_auth_context_from_token(access_token)
 
 
+def get_auth_context_for_new_session(access_token: str, user: Any | None) -> AuthContext:
+    # Supabase just issued this token for `user`, so there is nothing to re-validate remotely.
+    if user is None or settings.auth_verification_mode.lower() == "local":
+        return get_auth_context_from_access_token(access_token)
+    context = _context_from_user(user, access_token)
+    _token_cache.put(access_token, context)
+    return context
+
+
 def get_optional_auth_context(request: Request) -> AuthContext | None:
+    # The middleware and the route handler both ask for the context; resolve it once per request.
+    cached = getattr(request.state, "auth", _UNRESOLVED)
+    if cached is not _UNRESOLVED:
+        with _metrics_lock:
+            _metrics["memoized_hits"] += 1
+        return cached
+
+    started = time.perf_counter()
+    try:
+        context = _resolve_optional_auth_context(request)
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        request.state.auth_duration_ms = duration_ms
+        _record_resolution(duration_ms)
+    request.state.auth = context
+    return context
+
+
+def _resolve_optional_auth_context(request: Request) -> AuthContext | None:
     access_token = _extract_access_token(request)
     if not access_token:
         return None
@@ -98,6 +324,7 @@ def get_optional_auth_context(request: Request) -> AuthContext | None:
         if not refresh_token:
             return None
         # Refresh once, then re-validate the new access token.
+        _count_remote_call()
         try:
             session_response = get_supabase_auth_client().auth.refresh_session(refresh_token)
             refreshed_access = getattr(session_response.session, "access_token", None) if session_response else None
@@ -110,7 +337,6 @@ def get_optional_auth_context(request: Request) -> AuthContext | None:
             request.state.refreshed_access_token = str(refreshed_access)
             request.state.refreshed_refresh_token = str(refreshed_refresh)
         context = _resolve_auth_context_from_token(refreshed_access)
-    request.state.auth = context
     return context
 
 
@@ -121,7 +347,7 @@ def require_authenticated_user(request: Request) -> AuthContext:
     return context
 
 
-def sign_in_with_password(email: str, password: str) -> tuple[str, str]:
+def sign_in_with_password(email: str, password: str) -> tuple[str, str, Any]:
     client = get_supabase_auth_client()
     try:
         auth_response = client.auth.sign_in_with_password({"email": email, "password": password})
@@ -131,7 +357,8 @@ def sign_in_with_password(email: str, password: str) -> tuple[str, str]:
     session = getattr(auth_response, "session", None)
     if not session or not getattr(session, "access_token", None) or not getattr(session, "refresh_token", None):
         raise AuthenticationError("Sign in did not return a valid session.")
-    return str(session.access_token), str(session.refresh_token)
+    user = getattr(auth_response, "user", None) or getattr(session, "user", None)
+    return str(session.access_token), str(session.refresh_token), user
 
 
 def sign_up_with_password(email: str, password: str) -> tuple[str | None, str | None, Any]:
@@ -154,6 +381,7 @@ def sign_up_with_password(email: str, password: str) -> tuple[str | None, str |
 def sign_out_with_token(access_token: str | None) -> None:
     if not access_token:
         return
+    _token_cache.discard(access_token)
     try:
         get_supabase_admin_client().auth.admin.sign_out(access_token)
     except Exception as exc:  # pragma: no cover - external call
@@ -0,0 +1,96 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class DiskLRUCache:
+    """Byte-valued cache in a SQLite file, bounded by total value size with LRU eviction."""
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed_at ON entries(accessed_at)")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Running total of value sizes, so a write does not have to sum the table to decide whether to evict.
+        self._bytes = self._stored_bytes()
+
+    def _stored_bytes(self) -> int:
+        return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return bytes(row[0])
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, len(value), time.time()),
+                )
+                self._bytes += len(value) - (row[0] if row else 0)
+                if self._bytes > self.max_bytes:
+                    self._evict()
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                self._bytes = self._stored_bytes()
+                raise
+
+    def _evict(self) -> None:
+        # Other processes may share the file; resync the running total before deleting anything.
+        self._bytes = self._stored_bytes()
+        while self._bytes > self.max_bytes:
+            rows = self._connection.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                return
+            for key, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._bytes -= size
+                self.evictions += 1
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            entries, total = self._connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
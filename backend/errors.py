@@ -14,3 +14,32 @@ class AuthenticationError(BackendError):
 
     def __init__(self, message: str = "Authentication failed."):
         super().__init__(message)
+
+
+class InvalidCursorError(BackendError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self, message: str = "Invalid pagination cursor."):
+        super().__init__(message)
+
+
+class SimulationIncompleteError(BackendError):
+    """Raised when a simulation stops with unanswered questions; the record is left `partial` for resume."""
+
+    def __init__(self, message: str = "Simulation stopped before all questions were answered."):
+        super().__init__(message)
+
+
+class UploadTooLargeError(BackendError):
+    """Raised when an uploaded file exceeds the configured size cap."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Uploaded file exceeds the {max_bytes // (1024 * 1024)} MB limit.")
+        self.max_bytes = max_bytes
+
+
+class ExportInProgressError(BackendError):
+    """Raised when the same export is still being rendered by another request past the wait limit."""
+
+    def __init__(self, message: str = "This export is still being generated; retry shortly."):
+        super().__init__(message)
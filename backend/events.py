@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+
+class EventBroker:
+    """In-process pub/sub: job threads publish, event-loop subscribers receive on an asyncio.Queue."""
+
+    def __init__(self, max_queue_size: int = 1000):
+        self.max_queue_size = max_queue_size
+        self._subscribers: dict[str, list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self, topic: str) -> Iterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers[topic].append(entry)
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(topic, [])
+                if entry in subscribers:
+                    subscribers.remove(entry)
+                if not subscribers:
+                    self._subscribers.pop(topic, None)
+
+    def publish(self, topic: str, event: dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # The subscriber's loop has closed; its finally block will drop the entry.
+                continue
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict[str, Any]) -> None:
+        # A subscriber that stopped reading loses token deltas, not correctness: answers are re-read from storage.
+        if not queue.full():
+            queue.put_nowait(event)
+
+
+simulation_events = EventBroker()
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import threading
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any
+
+from backend.cache import DiskLRUCache
+from backend.errors import ExportInProgressError
+from backend.settings import settings
+from scripts.export_results import EXPORT_MEDIA_TYPES, iter_export, render_export
+
+logger = logging.getLogger(__name__)
+
+# Part of every export key: bump whenever exporter output changes so cached artifacts are not served.
+EXPORT_VERSION = "1"
+# CSV, TXT and HTML stream as they render and cost little; only the whole-document formats are cached.
+CACHED_EXPORT_FORMATS = {"docx", "pdf"}
+
+
+class ExportCache:
+    """DiskLRUCache of rendered exports where each artifact is rendered by at most one request at a time."""
+
+    def __init__(self, store: DiskLRUCache, wait_seconds: float):
+        self.store = store
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._rendering: dict[str, threading.Event] = {}
+        self._counters = {"renders": 0, "waits": 0, "conflicts": 0}
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        cached = self.store.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            in_flight = self._rendering.get(key)
+            if in_flight is None:
+                done = self._rendering[key] = threading.Event()
+                self._counters["renders"] += 1
+            else:
+                self._counters["waits"] += 1
+        if in_flight is not None:
+            # Someone is already rendering this artifact: wait for their result rather than render it twice.
+            if in_flight.wait(self.wait_seconds):
+                cached = self.store.get(key)
+                if cached is not None:
+                    return cached
+            with self._lock:
+                self._counters["conflicts"] += 1
+            raise ExportInProgressError()
+        try:
+            artifact = render()
+            self.store.set(key, artifact)
+            return artifact
+        finally:
+            with self._lock:
+                self._rendering.pop(key, None)
+            done.set()
+
+    def peek(self, key: str) -> bytes | None:
+        """The cached artifact, if any; never renders or inserts, so bulk reads leave the LRU alone."""
+        return self.store.get(key)
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["in_flight"] = len(self._rendering)
+        return {**self.store.stats(), **counters}
+
+
+_export_cache_singleton: ExportCache | None = None
+_export_cache_lock = threading.Lock()
+
+
+def get_export_cache() -> ExportCache | None:
+    global _export_cache_singleton
+    if not settings.export_cache_enabled or settings.export_cache_max_bytes <= 0:
+        return None
+    with _export_cache_lock:
+        if _export_cache_singleton is None:
+            store = DiskLRUCache(settings.export_cache_path, settings.export_cache_max_bytes)
+            _export_cache_singleton = ExportCache(store, settings.export_wait_seconds)
+        return _export_cache_singleton
+
+
+def export_cache_stats() -> dict[str, float | int]:
+    cache = get_export_cache()
+    return cache.stats() if cache else {"enabled": 0}
+
+
+_render_pool: Executor | None = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool() -> Executor:
+    # Sized once from EXPORT_WORKERS: every render shares it, so it is never resized under queued work.
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            workers = max(1, settings.export_workers)
+            if settings.export_executor == "process":
+                try:
+                    # FPDF and python-docx hold the GIL while rendering; separate processes render in parallel.
+                    _render_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                except (OSError, NotImplementedError, ValueError):
+                    logger.warning("Process pool unavailable; rendering exports in threads instead.")
+            if _render_pool is None:
+                _render_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+        return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    global _render_pool
+    with _render_pool_lock:
+        pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_in_pool(responses: list[dict[str, Any]], file_type: str) -> bytes:
+    """Render one export in the shared pool of EXPORT_WORKERS and wait for it."""
+    global _render_pool
+    pool = _get_render_pool()
+    try:
+        return pool.submit(render_export, responses, file_type).result()
+    except BrokenProcessPool:
+        # A worker died mid-render; replace the pool for later exports.
+        with _render_pool_lock:
+            if _render_pool is pool:
+                _render_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+def export_key(simulation: dict[str, Any], file_type: str) -> str:
+    # Every storage backend bumps updated_at on write; hash the answers for records that predate it.
+    version = simulation.get("updated_at") or hashlib.sha256(
+        json.dumps(simulation.get("responses") or [], sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    canonical = json.dumps([simulation["id"], str(version), file_type, EXPORT_VERSION], separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class SimulationExport:
+    filename: str
+    file_type: str
+    etag: str
+    render: Callable[[], Iterable[bytes]]
+
+    @property
+    def media_type(self) -> str:
+        return EXPORT_MEDIA_TYPES[self.file_type]
+
+
+def build_simulation_export(simulation: dict[str, Any], file_type: str) -> SimulationExport:
+    """Describe a simulation export; nothing is rendered until `render()` is called."""
+    file_type = file_type.lower()
+    if file_type not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unsupported export format: {file_type}")
+    key = export_key(simulation, file_type)
+    responses = simulation.get("responses") or []
+
+    def render() -> Iterable[bytes]:
+        if file_type not in CACHED_EXPORT_FORMATS:
+            return iter_export(responses, file_type)
+        cache = get_export_cache()
+        if cache is None:
+            return [render_in_pool(responses, file_type)]
+        return [cache.get_or_render(key, lambda: render_in_pool(responses, file_type))]
+
+    return SimulationExport(
+        filename=f"simulation_{simulation['id']}.{file_type}",
+        file_type=file_type,
+        etag=f'"{key[:32]}"',
+        render=render,
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def parse_export_formats(spec: str | None) -> list[str]:
+    """Export formats from a comma-separated list ("csv,pdf"); every format when empty."""
+    if spec is None or not spec.strip():
+        return list(EXPORT_MEDIA_TYPES)
+    formats = []
+    for part in spec.split(","):
+        file_type = part.strip().lower()
+        if file_type not in EXPORT_MEDIA_TYPES:
+            raise ValueError(f"Unsupported export format: {part.strip()!r}")
+        if file_type not in formats:
+            formats.append(file_type)
+    return formats
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    name: str
+    produce: Callable[[], bytes]
+    # DOCX and PDF are compressed already; deflating them again only costs CPU.
+    compress_type: int = zipfile.ZIP_DEFLATED
+
+
+def _render_archived_export(export: SimulationExport, key: str, responses: list[dict[str, Any]]) -> bytes:
+    if export.file_type not in CACHED_EXPORT_FORMATS:
+        return b"".join(export.render())
+    # Serve what single exports already cached, but do not insert: one large study would evict every
+    # per-simulation artifact the ETag route relies on.
+    cache = get_export_cache()
+    cached = cache.peek(key) if cache is not None else None
+    return cached if cached is not None else render_in_pool(responses, export.file_type)
+
+
+def _json_bytes(item: dict[str, Any]) -> bytes:
+    return json.dumps(item, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def study_archive_entries(
+    study: dict[str, Any],
+    simulations: Iterable[dict[str, Any]],
+    gioia_analyses: Iterable[dict[str, Any]],
+    comparisons: Iterable[dict[str, Any]],
+    formats: list[str],
+) -> Iterator[ArchiveEntry]:
+    """Entries of a study archive, consuming the record iterables lazily."""
+    yield ArchiveEntry("study.json", lambda: _json_bytes(study))
+    for simulation in simulations:
+        responses = simulation.get("responses") or []
+        for file_type in formats:
+            export = build_simulation_export(simulation, file_type)
+            key = export_key(simulation, file_type)
+            yield ArchiveEntry(
+                f"simulations/{export.filename}",
+                lambda export=export, key=key, responses=responses: _render_archived_export(export, key, responses),
+                zipfile.ZIP_STORED if file_type in CACHED_EXPORT_FORMATS else zipfile.ZIP_DEFLATED,
+            )
+    for analysis in gioia_analyses:
+        markdown = (analysis.get("markdown") or "").encode("utf-8")
+        yield ArchiveEntry(f"gioia_analyses/gioia_{analysis['id']}.md", lambda markdown=markdown: markdown)
+    for comparison in comparisons:
+        yield ArchiveEntry(f"comparisons/comparison_{comparison['id']}.json", lambda item=comparison: _json_bytes(item))
+
+
+class _ZipSink:
+    """Write-only target: ZipFile cannot seek it, so it streams entries with data descriptors."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip_archive(entries: Iterable[ArchiveEntry], window: int) -> Iterator[bytes]:
+    """Stream a ZIP of `entries`, producing up to `window` of them concurrently.
+
+    Each entry is written as soon as it finishes and then dropped, and entries are
+    only pulled from `entries` as the window frees up, so memory is bounded by the
+    window rather than the archive. Nothing is staged on disk.
+    """
+    sink = _ZipSink()
+    window = max(1, window)
+    pending: dict[Future, ArchiveEntry] = {}
+    producers = ThreadPoolExecutor(max_workers=window, thread_name_prefix="archive")
+    entry_iter = iter(entries)
+    exhausted = False
+    try:
+        with zipfile.ZipFile(sink, mode="w") as archive:
+            while True:
+                while not exhausted and len(pending) < window:
+                    entry = next(entry_iter, None)
+                    if entry is None:
+                        exhausted = True
+                    else:
+                        pending[producers.submit(entry.produce)] = entry
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entry = pending.pop(future)
+                    info = zipfile.ZipInfo(entry.name, date_time=(1980, 1, 1, 0, 0, 0))
+                    info.compress_type = entry.compress_type
+                    info.external_attr = 0o644 << 16
+                    archive.writestr(info, future.result())
+                    yield sink.drain()
+        yield sink.drain()
+    finally:
+        producers.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,327 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any
+
+from backend.errors import BackendError
+from backend.storage import StorageAdapter, utc_now
+
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = "jobs"
+ACTIVE_JOB_STATUSES = ("queued", "running")
+MAX_JOB_ATTEMPTS = 3
+
+ProgressCallback = Callable[[int, int], None]
+JobHandler = Callable[[dict[str, Any], ProgressCallback], list[str]]
+GiveUpHandler = Callable[[dict[str, Any]], None]
+
+
+class JobQueue:
+    """Background jobs persisted in storage and claimed under a lease, so each runs in exactly one worker.
+
+    A worker claims a job with a compare-and-set on its status and attempt count,
+    then renews `lease_expires_at` while the handler runs. Every write it makes is
+    fenced on its `lease_owner` and attempt, so a worker that lost its lease cannot
+    overwrite the job. Queued jobs and running jobs whose lease lapsed (their
+    worker died) are picked up by whichever worker sweeps them first.
+    """
+
+    def __init__(self, storage: StorageAdapter, max_workers: int, lease_seconds: float = 60.0):
+        self.storage = storage
+        self.max_workers = max_workers
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor: ThreadPoolExecutor | None = None
+        self._handlers: dict[str, JobHandler] = {}
+        self._give_up_handlers: dict[str, GiveUpHandler] = {}
+        self._lock = threading.Lock()
+        # Jobs this worker has queued or is running: the sweep skips them, the heartbeat renews the running ones.
+        self._local_jobs: set[str] = set()
+        self._leases: dict[str, tuple[dict[str, Any], threading.Lock]] = {}
+        self._stopped = threading.Event()
+        self._maintenance: threading.Thread | None = None
+
+    def register(self, kind: str, handler: JobHandler, on_give_up: GiveUpHandler | None = None) -> None:
+        self._handlers[kind] = handler
+        if on_give_up is not None:
+            self._give_up_handlers[kind] = on_give_up
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+            return self._executor
+
+    def _enqueue(self, job_id: str) -> bool:
+        with self._lock:
+            if job_id in self._local_jobs:
+                return False
+            self._local_jobs.add(job_id)
+        self._pool().submit(self._run, job_id)
+        return True
+
+    def submit(
+        self,
+        kind: str,
+        params: dict[str, Any],
+        user_id: str,
+        study_id: str | None = None,
+        result_ids: list[str] | None = None,
+    ) -> dict[str, Any]:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = self.storage.upsert_item(
+            JOBS_COLLECTION,
+            {
+                "kind": kind,
+                "status": "queued",
+                "params": params,
+                "progress": {"completed": 0, "total": 0},
+                "result_ids": result_ids or [],
+                "error": None,
+                "attempts": 0,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "study_id": study_id,
+                "owner_user_id": user_id,
+            },
+        )
+        self._enqueue(job["id"])
+        return job
+
+    def get(self, job_id: str, user_id: str) -> dict[str, Any] | None:
+        return self.storage.get_item(JOBS_COLLECTION, job_id, filters={"owner_user_id": user_id})
+
+    def _lease_expiry(self) -> str:
+        return (utc_now() + timedelta(seconds=self.lease_seconds)).isoformat()
+
+    @staticmethod
+    def _lease_expired(job: dict[str, Any]) -> bool:
+        expires_at = job.get("lease_expires_at")
+        if not expires_at:
+            return True
+        try:
+            return datetime.fromisoformat(str(expires_at)) <= utc_now()
+        except ValueError:
+            return True
+
+    def _claimable(self, job: dict[str, Any]) -> bool:
+        return job.get("status") == "queued" or (job.get("status") == "running" and self._lease_expired(job))
+
+    def recover(self) -> int:
+        # Called at start-up and then periodically: a running job with a live lease belongs to another worker.
+        self._start_maintenance()
+        recovered = 0
+        for status in ACTIVE_JOB_STATUSES:
+            for job in self.storage.list_items(JOBS_COLLECTION, filters={"status": status}):
+                if self._claimable(job) and self._enqueue(job["id"]):
+                    recovered += 1
+        if recovered:
+            logger.info("Queued %s unclaimed job(s)", recovered)
+        return recovered
+
+    def _start_maintenance(self) -> None:
+        with self._lock:
+            if self._maintenance is not None or self.lease_seconds <= 0:
+                return
+            self._stopped.clear()
+            self._maintenance = threading.Thread(target=self._maintain, name="job-leases", daemon=True)
+            self._maintenance.start()
+
+    def _maintain(self) -> None:
+        interval = self.lease_seconds / 3
+        ticks = 0
+        while not self._stopped.wait(interval):
+            ticks += 1
+            with self._lock:
+                leases = list(self._leases.values())
+            for job, job_lock in leases:
+                with job_lock:
+                    self._update_leased(job, {"lease_expires_at": self._lease_expiry()})
+            if ticks % 3 == 0:
+                try:
+                    self.recover()
+                except Exception:
+                    logger.exception("Sweeping for unclaimed jobs failed")
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._maintenance = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _update_leased(self, job: dict[str, Any], changes: dict[str, Any]) -> bool:
+        updated = self.storage.update_item_if(
+            JOBS_COLLECTION, job["id"], {"lease_owner": self.worker_id, "attempts": job["attempts"]}, changes
+        )
+        if updated is None:
+            logger.warning("Lost the lease on job %s; another worker has taken it over", job["id"])
+            return False
+        job.update(changes)
+        return True
+
+    def _claim(self, job_id: str) -> dict[str, Any] | None:
+        job = self.storage.get_item(JOBS_COLLECTION, job_id)
+        if job is None or not self._claimable(job):
+            return None
+        attempts = job.get("attempts") or 0
+        expected = {"status": job["status"], "attempts": attempts}
+        if attempts >= MAX_JOB_ATTEMPTS:
+            failed = self.storage.update_item_if(
+                JOBS_COLLECTION,
+                job_id,
+                expected,
+                {
+                    "status": "failed",
+                    "error": "Job was interrupted too many times.",
+                    "finished_at": utc_now().isoformat(),
+                    "lease_expires_at": None,
+                },
+            )
+            if failed is not None:
+                self._give_up(failed)
+            return None
+        return self.storage.update_item_if(
+            JOBS_COLLECTION,
+            job_id,
+            expected,
+            {
+                "status": "running",
+                "attempts": attempts + 1,
+                "started_at": utc_now().isoformat(),
+                "lease_owner": self.worker_id,
+                "lease_expires_at": self._lease_expiry(),
+            },
+        )
+
+    def _give_up(self, job: dict[str, Any]) -> None:
+        # Only the worker whose compare-and-set failed the job gets here, so the hook runs once.
+        handler = self._give_up_handlers.get(job.get("kind"))
+        if handler is None:
+            return
+        try:
+            handler(job)
+        except Exception:
+            logger.exception("Cleaning up after abandoned job %s (%s) failed", job["id"], job.get("kind"))
+
+    def _run(self, job_id: str) -> None:
+        try:
+            job = self._claim(job_id)
+            if job is not None:
+                self._execute(job)
+        finally:
+            with self._lock:
+                self._local_jobs.discard(job_id)
+                self._leases.pop(job_id, None)
+
+    def _finish(self, job: dict[str, Any], job_lock: threading.Lock, status: str, error: str | None = None) -> None:
+        with job_lock:
+            self._update_leased(
+                job,
+                {
+                    "status": status,
+                    "error": error,
+                    "result_ids": job.get("result_ids") or [],
+                    "finished_at": utc_now().isoformat(),
+                    "lease_expires_at": None,
+                },
+            )
+
+    def _execute(self, job: dict[str, Any]) -> None:
+        job_lock = threading.Lock()
+        with self._lock:
+            self._leases[job["id"]] = (job, job_lock)
+
+        def report_progress(completed: int, total: int) -> None:
+            # Handlers record resume state in params/result_ids; persist it with the progress and renew the lease.
+            with job_lock:
+                self._update_leased(
+                    job,
+                    {
+                        "progress": {"completed": completed, "total": total},
+                        "params": job["params"],
+                        "result_ids": job.get("result_ids") or [],
+                        "lease_expires_at": self._lease_expiry(),
+                    },
+                )
+
+        try:
+            result_ids = self._handlers[job["kind"]](job, report_progress)
+        except (ValueError, BackendError) as exc:
+            self._finish(job, job_lock, "failed", error=str(exc))
+            return
+        except Exception:
+            logger.exception("Job %s (%s) failed", job["id"], job.get("kind"))
+            self._finish(job, job_lock, "failed", error="Job failed.")
+            return
+
+        job["result_ids"] = result_ids
+        self._finish(job, job_lock, "succeeded")
+
+
+def register_research_jobs(queue: JobQueue, service: Any) -> None:
+    def run_simulation(job: dict[str, Any], report_progress: ProgressCallback) -> list[str]:
+        params = job["params"]
+        if not params.get("simulation_id"):
+            simulation = service.start_simulation(
+                params["persona_id"],
+                params["question_guide_id"],
+                job["owner_user_id"],
+                params.get("protocol_id"),
+                params.get("study_id"),
+            )
+            # Persisted with the job so a retry after a crash resumes this record instead of starting over.
+            params["simulation_id"] = simulation["id"]
+            job["result_ids"] = [simulation["id"]]
+            report_progress(0, len(simulation["questions"]))
+        simulation = service.resume_simulation(
+            params["simulation_id"],
+            job["owner_user_id"],
+            on_progress=report_progress,
+            stream_tokens=bool(params.get("stream")),
+        )
+        return [simulation["id"]]
+
+    def abandon_simulation(job: dict[str, Any]) -> None:
+        simulation_id = job["params"].get("simulation_id")
+        if simulation_id:
+            service.abandon_simulation(
+                simulation_id,
+                job["owner_user_id"],
+                f"{job['error']} Resume the simulation to answer the rest.",
+            )
+
+    def run_gioia(job: dict[str, Any], report_progress: ProgressCallback) -> list[str]:
+        params = job["params"]
+        report_progress(0, 1)
+        analysis = service.run_ai_gioia(
+            params["simulation_id"], job["owner_user_id"], params.get("protocol_id"), params.get("study_id")
+        )
+        report_progress(1, 1)
+        return [analysis["id"]]
+
+    def run_comparison(job: dict[str, Any], report_progress: ProgressCallback) -> list[str]:
+        params = job["params"]
+        report_progress(0, 1)
+        comparison = service.run_structured_comparison(
+            params["transcript_id"],
+            params["simulation_id"],
+            job["owner_user_id"],
+            params.get("protocol_id"),
+            params.get("study_id"),
+        )
+        report_progress(1, 1)
+        return [comparison["id"]]
+
+    queue.register("simulation", run_simulation, on_give_up=abandon_simulation)
+    queue.register("simulation_resume", run_simulation, on_give_up=abandon_simulation)
+    queue.register("gioia_analysis", run_gioia)
+    queue.register("comparison", run_comparison)
@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from openai.types.chat import ChatCompletion
+
+from backend.cache import DiskLRUCache
+from backend.rate_limit import get_llm_scheduler
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_cache_singleton: DiskLRUCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> DiskLRUCache | None:
+    global _cache_singleton
+    if not settings.llm_cache_enabled or settings.llm_cache_max_bytes <= 0:
+        return None
+    with _cache_lock:
+        if _cache_singleton is None:
+            _cache_singleton = DiskLRUCache(settings.llm_cache_path, settings.llm_cache_max_bytes)
+        return _cache_singleton
+
+
+def llm_cache_stats() -> dict[str, float | int]:
+    cache = get_llm_cache()
+    return cache.stats() if cache else {"enabled": 0}
+
+
+def completion_cache_key(params: dict[str, Any]) -> str:
+    # model, messages, temperature and max_tokens (plus any other request option) fully determine the request.
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _load_cached(cache: DiskLRUCache, key: str) -> ChatCompletion | None:
+    raw = cache.get(key)
+    if raw is None:
+        return None
+    try:
+        return ChatCompletion.model_validate_json(raw)
+    except Exception:
+        logger.warning("Discarding unreadable LLM cache entry %s", key)
+        return None
+
+
+def _store(cache: DiskLRUCache, key: str, response: ChatCompletion) -> None:
+    if not response.choices or response.choices[0].finish_reason not in {"stop", "length"}:
+        return
+    cache.set(key, response.model_dump_json().encode("utf-8"))
+
+
+def chat_completion(client: Any, *, cache: bool = True, **params: Any) -> ChatCompletion:
+    """`client.chat.completions.create(**params)` behind the shared response cache and rate limiter.
+
+    Pass `cache=False` for calls that are meant to be sampled fresh every time.
+    """
+    store = get_llm_cache() if cache else None
+    key = completion_cache_key(params) if store else ""
+    if store:
+        cached = _load_cached(store, key)
+        if cached is not None:
+            return cached
+    response = get_llm_scheduler().call(lambda: client.chat.completions.create(**params), params)
+    if store:
+        _store(store, key, response)
+    return response
+
+
+async def achat_completion(client: Any, *, cache: bool = True, **params: Any) -> ChatCompletion:
+    store = get_llm_cache() if cache else None
+    key = completion_cache_key(params) if store else ""
+    if store:
+        cached = await asyncio.to_thread(_load_cached, store, key)
+        if cached is not None:
+            return cached
+    response = await get_llm_scheduler().acall(lambda: client.chat.completions.create(**params), params)
+    if store:
+        await asyncio.to_thread(_store, store, key, response)
+    return response
+
+
+async def astream_chat_completion(client: Any, on_delta: Callable[[str], None], **params: Any) -> str:
+    """Stream a completion, calling `on_delta` with each content fragment, and return the full text.
+
+    Streamed calls are never cached. The scheduler paces and retries opening the stream
+    and holds its concurrency slot until the stream has been read to the end.
+    """
+
+    async def read(stream: Any) -> str:
+        parts: list[str] = []
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    on_delta(delta)
+        finally:
+            await stream.close()
+        return "".join(parts)
+
+    return await get_llm_scheduler().acall(
+        lambda: client.chat.completions.create(stream=True, **params), params, consume=read
+    )
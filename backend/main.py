@@ -1,19 +1,29 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import Depends, FastAPI, File, HTTPException, Request, Response, UploadFile, status
+from fastapi import Depends, FastAPI, File, HTTPException, Query, Request, Response, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 from backend.auth import (
-    get_auth_context_from_access_token,
+    auth_metrics,
+    get_auth_context_for_new_session,
     get_optional_auth_context,
     require_authenticated_user,
     sign_in_with_password,
     sign_up_with_password,
     sign_out_with_token,
 )
-from backend.errors import AuthenticationError, SupabaseOperationError
+from backend.errors import (
+    AuthenticationError,
+    ExportInProgressError,
+    InvalidCursorError,
+    SupabaseOperationError,
+    UploadTooLargeError,
+)
 from backend.schemas import (
     AuthSessionResponse,
     AuthSignInRequest,
@@ -24,6 +34,9 @@ from backend.schemas import (
     GioiaAnalysisRequest,
     GioiaAnalysisResponse,
     HealthResponse,
+    JobRecord,
+    ListView,
+    MetricsResponse,
     StudyCreate,
     StudyRecord,
     PersonaCreate,
@@ -34,34 +47,69 @@ from backend.schemas import (
     QuestionGuideRecord,
     SimulationRequest,
     SimulationResponse,
+    SimulationSummary,
     StudyProtocol,
     StudyProtocolCreate,
     TranscriptCreate,
     TranscriptRecord,
+    TranscriptSummary,
     UploadTextResponse,
 )
-from backend.services import ResearchBackendService
+from backend.events import simulation_events
+from backend.exports import etag_matches, export_cache_stats, parse_export_formats, shutdown_render_pool
+from backend.jobs import JobQueue, register_research_jobs
+from backend.llm import llm_cache_stats
+from backend.openai_client import close_openai_client
+from backend.parsing import ParsingExecutor, upload_cache_stats
+from backend.rate_limit import get_llm_scheduler
+from backend.services import ResearchBackendService, indexed_responses
 from backend.settings import settings
 from backend.storage import get_storage
+from backend.uploads import declared_upload_too_large, spooled_upload
+from utils.pdf_engine import normalize_page_spec, shutdown_page_pool
+
 
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    _job_queue.recover()
+    _parsing_executor.warm()
+    yield
+    _job_queue.shutdown()
+    _parsing_executor.shutdown()
+    shutdown_render_pool()
+    shutdown_page_pool()
+    close_openai_client()
 
-app = FastAPI(title=settings.api_title, version=settings.api_version)
+
+app = FastAPI(title=settings.api_title, version=settings.api_version, lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origin_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
 _service_singleton = ResearchBackendService(get_storage())
+_job_queue = JobQueue(get_storage(), settings.job_workers, settings.job_lease_seconds)
+register_research_jobs(_job_queue, _service_singleton)
+_parsing_executor = ParsingExecutor(settings.parse_workers, settings.parse_executor)
 
 
 def get_service() -> ResearchBackendService:
     return _service_singleton
 
 
+def get_job_queue() -> JobQueue:
+    return _job_queue
+
+
+def get_parsing_executor() -> ParsingExecutor:
+    return _parsing_executor
+
+
 frontend_dir = Path("frontend")
 if frontend_dir.exists():
     app.mount("/frontend", StaticFiles(directory=str(frontend_dir)), name="frontend")
@@ -79,6 +127,18 @@ def health() -> HealthResponse:
     return HealthResponse(status="ok", storage_backend=settings.storage_backend)
 
 
+@app.get("/api/metrics", response_model=MetricsResponse)
+def metrics() -> MetricsResponse:
+    return MetricsResponse(
+        auth=auth_metrics(),
+        llm_cache=llm_cache_stats(),
+        llm_scheduler=get_llm_scheduler().stats(),
+        parsing=_parsing_executor.stats(),
+        upload_cache=upload_cache_stats(),
+        export_cache=export_cache_stats(),
+    )
+
+
 PUBLIC_PAGE_ROUTES = {"/", "/sign-in"}
 FRONTEND_PAGE_ROUTES = {
     "/": "index.html",
@@ -147,6 +207,31 @@ async def handle_authentication_error(_: Request, exc: AuthenticationError):
     )
 
 
+@app.exception_handler(UploadTooLargeError)
+async def handle_upload_too_large_error(_: Request, exc: UploadTooLargeError):
+    return JSONResponse(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        content={"detail": str(exc)},
+    )
+
+
+@app.exception_handler(ExportInProgressError)
+async def handle_export_in_progress_error(_: Request, exc: ExportInProgressError):
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "5"},
+    )
+
+
+@app.exception_handler(InvalidCursorError)
+async def handle_invalid_cursor_error(_: Request, exc: InvalidCursorError):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
 @app.middleware("http")
 async def enforce_authentication(request: Request, call_next):
     path = request.url.path
@@ -163,8 +248,16 @@ async def enforce_authentication(request: Request, call_next):
         except HTTPException as exc:
             return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
+    if path.endswith("/extract-upload") and declared_upload_too_large(request.headers.get("content-length")):
+        # Refuse before Starlette spools the body to disk.
+        detail = str(UploadTooLargeError(settings.upload_max_bytes))
+        return JSONResponse(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, content={"detail": detail})
+
     response = await call_next(request)
     _apply_refreshed_session_cookies(request, response)
+    auth_duration_ms = getattr(request.state, "auth_duration_ms", None)
+    if auth_duration_ms is not None:
+        response.headers.append("Server-Timing", f"auth;dur={auth_duration_ms:.2f}")
     if path in NO_CACHE_PATHS or path.startswith("/frontend/"):
         response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
         response.headers["Pragma"] = "no-cache"
@@ -185,8 +278,8 @@ for route_path, filename in FRONTEND_PAGE_ROUTES.items():
 
 @app.post("/api/auth/sign-in", response_model=AuthSessionResponse)
 def sign_in(payload: AuthSignInRequest):
-    access_token, refresh_token = sign_in_with_password(payload.email, payload.password)
-    context = get_auth_context_from_access_token(access_token)
+    access_token, refresh_token, user = sign_in_with_password(payload.email, payload.password)
+    context = get_auth_context_for_new_session(access_token, user)
 
     response = JSONResponse(
         content={
@@ -210,7 +303,7 @@ def sign_up(payload: AuthSignUpRequest):
         role = str(app_metadata["role"])
 
     if access_token and refresh_token:
-        context = get_auth_context_from_access_token(access_token)
+        context = get_auth_context_for_new_session(access_token, user)
         response = JSONResponse(
             content={
                 "authenticated": True,
@@ -250,10 +343,46 @@ def auth_session(request: Request, response: Response):
     )
 
 
+PAGE_LIMIT_QUERY = Query(default=None, ge=1, le=500)
+UPLOAD_PAGES_QUERY = Query(default=None, description='PDF pages to extract, e.g. "1-5,8" or "10-".')
+UPLOAD_MAX_CHARS_QUERY = Query(default=None, ge=1)
+
+
+def _upload_pages(pages: str | None) -> str | None:
+    try:
+        return normalize_page_spec(pages)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+async def _extract_upload(
+    parser: ParsingExecutor, kind: str, file: UploadFile, pages: str | None, max_chars: int | None
+) -> UploadTextResponse:
+    async with spooled_upload(file) as upload:
+        # One character past the cap tells whether the document was cut, without reading the rest of it.
+        text = await parser.parse(kind, upload, _upload_pages(pages), max_chars + 1 if max_chars else None)
+    truncated = max_chars is not None and len(text) > max_chars
+    return UploadTextResponse(text=text[:max_chars] if truncated else text, truncated=truncated)
+
+
+def _page_items(response: Response, page: tuple[list[dict], str | None]) -> list[dict]:
+    items, next_cursor = page
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
 @app.get("/api/studies", response_model=list[StudyRecord])
-def list_studies(request: Request, service: ResearchBackendService = Depends(get_service)):
+def list_studies(
+    request: Request,
+    response: Response,
+    limit: int | None = PAGE_LIMIT_QUERY,
+    cursor: str | None = None,
+    service: ResearchBackendService = Depends(get_service),
+):
     context = require_authenticated_user(request)
-    return service.list_collection("studies", context.user_id)
+    page = service.list_page("studies", context.user_id, limit=limit, cursor=cursor)
+    return _page_items(response, page)
 
 
 @app.post("/api/studies", response_model=StudyRecord)
@@ -263,9 +392,17 @@ def create_study(payload: StudyCreate, request: Request, service: ResearchBacken
 
 
 @app.get("/api/protocols", response_model=list[StudyProtocol])
-def list_protocols(request: Request, study_id: str | None = None, service: ResearchBackendService = Depends(get_service)):
+def list_protocols(
+    request: Request,
+    response: Response,
+    study_id: str | None = None,
+    limit: int | None = PAGE_LIMIT_QUERY,
+    cursor: str | None = None,
+    service: ResearchBackendService = Depends(get_service),
+):
     context = require_authenticated_user(request)
-    return service.list_collection("protocols", context.user_id, study_id=study_id)
+    page = service.list_page("protocols", context.user_id, study_id=study_id, limit=limit, cursor=cursor)
+    return _page_items(response, page)
 
 
 @app.post("/api/protocols", response_model=StudyProtocol)
@@ -275,9 +412,17 @@ def create_protocol(payload: StudyProtocolCreate, request: Request, service: Res
 
 
 @app.get("/api/personas", response_model=list[PersonaRecord])
-def list_personas(request: Request, study_id: str | None = None, service: ResearchBackendService = Depends(get_service)):
+def list_personas(
+    request: Request,
+    response: Response,
+    study_id: str | None = None,
+    limit: int | None = PAGE_LIMIT_QUERY,
+    cursor: str | None = None,
+    service: ResearchBackendService = Depends(get_service),
+):
     context = require_authenticated_user(request)
-    return service.list_collection("personas", context.user_id, study_id=study_id)
+    page = service.list_page("personas", context.user_id, study_id=study_id, limit=limit, cursor=cursor)
+    return _page_items(response, page)
 
 
 @app.post("/api/personas", response_model=PersonaRecord)
@@ -294,10 +439,13 @@ def extract_persona(payload: PersonaExtractRequest, request: Request, service: R
 
 
 @app.post("/api/personas/extract-upload", response_model=UploadTextResponse)
-async def extract_persona_upload(file: UploadFile = File(...), service: ResearchBackendService = Depends(get_service)):
-    content = await file.read()
-    text = service.extract_persona_text_from_upload(file.filename or "upload", file.content_type or "", content)
-    return UploadTextResponse(text=text)
+async def extract_persona_upload(
+    file: UploadFile = File(...),
+    pages: str | None = UPLOAD_PAGES_QUERY,
+    max_chars: int | None = UPLOAD_MAX_CHARS_QUERY,
+    parser: ParsingExecutor = Depends(get_parsing_executor),
+):
+    return await _extract_upload(parser, "persona", file, pages, max_chars)
 
 
 @app.post("/api/question-guides/extract", response_model=list[str])
@@ -306,17 +454,23 @@ def extract_questions(payload: QuestionExtractRequest, service: ResearchBackendS
 
 
 @app.post("/api/question-guides/extract-upload", response_model=UploadTextResponse)
-async def extract_questions_upload(file: UploadFile = File(...), service: ResearchBackendService = Depends(get_service)):
-    content = await file.read()
-    text = service.extract_text_from_upload(file.filename or "upload", file.content_type or "", content)
-    return UploadTextResponse(text=text)
+async def extract_questions_upload(
+    file: UploadFile = File(...),
+    pages: str | None = UPLOAD_PAGES_QUERY,
+    max_chars: int | None = UPLOAD_MAX_CHARS_QUERY,
+    parser: ParsingExecutor = Depends(get_parsing_executor),
+):
+    return await _extract_upload(parser, "text", file, pages, max_chars)
 
 
 @app.post("/api/protocols/extract-upload", response_model=UploadTextResponse)
-async def extract_protocol_upload(file: UploadFile = File(...), service: ResearchBackendService = Depends(get_service)):
-    content = await file.read()
-    text = service.extract_text_from_upload(file.filename or "upload", file.content_type or "", content)
-    return UploadTextResponse(text=text)
+async def extract_protocol_upload(
+    file: UploadFile = File(...),
+    pages: str | None = UPLOAD_PAGES_QUERY,
+    max_chars: int | None = UPLOAD_MAX_CHARS_QUERY,
+    parser: ParsingExecutor = Depends(get_parsing_executor),
+):
+    return await _extract_upload(parser, "text", file, pages, max_chars)
 
 
 @app.post("/api/question-guides", response_model=QuestionGuideRecord)
@@ -327,10 +481,16 @@ def create_question_guide(payload: QuestionGuideCreate, request: Request, servic
 
 @app.get("/api/question-guides", response_model=list[QuestionGuideRecord])
 def list_question_guides(
-    request: Request, study_id: str | None = None, service: ResearchBackendService = Depends(get_service)
+    request: Request,
+    response: Response,
+    study_id: str | None = None,
+    limit: int | None = PAGE_LIMIT_QUERY,
+    cursor: str | None = None,
+    service: ResearchBackendService = Depends(get_service),
 ):
     context = require_authenticated_user(request)
-    return service.list_collection("question_guides", context.user_id, study_id=study_id)
+    page = service.list_page("question_guides", context.user_id, study_id=study_id, limit=limit, cursor=cursor)
+    return _page_items(response, page)
 
 
 @app.post("/api/transcripts", response_model=TranscriptRecord)
@@ -340,77 +500,309 @@ def create_transcript(payload: TranscriptCreate, request: Request, service: Rese
 
 
 @app.post("/api/transcripts/extract-upload", response_model=UploadTextResponse)
-async def extract_transcript_upload(file: UploadFile = File(...), service: ResearchBackendService = Depends(get_service)):
-    content = await file.read()
-    text = service.extract_text_from_upload(file.filename or "upload", file.content_type or "", content)
-    return UploadTextResponse(text=text)
+async def extract_transcript_upload(
+    file: UploadFile = File(...),
+    pages: str | None = UPLOAD_PAGES_QUERY,
+    max_chars: int | None = UPLOAD_MAX_CHARS_QUERY,
+    parser: ParsingExecutor = Depends(get_parsing_executor),
+):
+    return await _extract_upload(parser, "text", file, pages, max_chars)
+
+
+@app.get("/api/transcripts", response_model=list[TranscriptRecord] | list[TranscriptSummary])
+def list_transcripts(
+    request: Request,
+    response: Response,
+    study_id: str | None = None,
+    limit: int | None = PAGE_LIMIT_QUERY,
+    cursor: str | None = None,
+    view: ListView = "full",
+    service: ResearchBackendService = Depends(get_service),
+):
+    context = require_authenticated_user(request)
+    page = service.list_page("transcripts", context.user_id, study_id=study_id, limit=limit, cursor=cursor, view=view)
+    return _page_items(response, page)
 
 
-@app.get("/api/transcripts", response_model=list[TranscriptRecord])
-def list_transcripts(request: Request, study_id: str | None = None, service: ResearchBackendService = Depends(get_service)):
+@app.get("/api/transcripts/{transcript_id}", response_model=TranscriptRecord)
+def get_transcript(transcript_id: str, request: Request, service: ResearchBackendService = Depends(get_service)):
     context = require_authenticated_user(request)
-    return service.list_collection("transcripts", context.user_id, study_id=study_id)
+    try:
+        return service.get_item("transcripts", transcript_id, context.user_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+def _enqueue_job(
+    kind: str,
+    params: dict,
+    references: dict[str, str | None],
+    user_id: str,
+    service: ResearchBackendService,
+    jobs: JobQueue,
+) -> dict:
+    try:
+        service.require_items(user_id, references)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return jobs.submit(kind, params, user_id, study_id=params.get("study_id"))
 
 
-@app.post("/api/simulations", response_model=SimulationResponse)
-def create_simulation(payload: SimulationRequest, request: Request, service: ResearchBackendService = Depends(get_service)):
+@app.post("/api/simulations", response_model=JobRecord, status_code=status.HTTP_202_ACCEPTED)
+def create_simulation(
+    payload: SimulationRequest,
+    request: Request,
+    service: ResearchBackendService = Depends(get_service),
+    jobs: JobQueue = Depends(get_job_queue),
+):
     context = require_authenticated_user(request)
+    # The record is created up front so clients can open /stream before the first answer exists.
     try:
-        return service.run_simulation(
-            payload.persona_id,
-            payload.question_guide_id,
-            context.user_id,
-            payload.protocol_id,
-            payload.study_id,
+        simulation = service.start_simulation(
+            payload.persona_id, payload.question_guide_id, context.user_id, payload.protocol_id, payload.study_id
         )
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return jobs.submit(
+        "simulation",
+        {**payload.model_dump(), "simulation_id": simulation["id"]},
+        context.user_id,
+        study_id=simulation.get("study_id"),
+        result_ids=[simulation["id"]],
+    )
+
+
+@app.post(
+    "/api/simulations/{simulation_id}/resume", response_model=JobRecord, status_code=status.HTTP_202_ACCEPTED
+)
+def resume_simulation(
+    simulation_id: str,
+    request: Request,
+    service: ResearchBackendService = Depends(get_service),
+    jobs: JobQueue = Depends(get_job_queue),
+):
+    context = require_authenticated_user(request)
+    try:
+        simulation = service.get_item("simulations", simulation_id, context.user_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    if simulation.get("status") != "partial":
+        raise HTTPException(status_code=409, detail="Only partial simulations can be resumed.")
+    return _enqueue_job(
+        "simulation_resume",
+        {"simulation_id": simulation_id, "study_id": simulation.get("study_id")},
+        {"personas": simulation.get("persona_id")},
+        context.user_id,
+        service,
+        jobs,
+    )
+
+
+SSE_POLL_SECONDS = 2.0
+SSE_HEARTBEAT_SECONDS = 15.0
+TERMINAL_SIMULATION_STATUSES = {"completed", "partial"}
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _simulation_snapshot_events(simulation: dict, sent: set[int]) -> list[str]:
+    chunks = []
+    indexed = indexed_responses(simulation)
+    total = len(simulation.get("questions") or indexed)
+    for index, response in indexed:
+        if index not in sent:
+            sent.add(index)
+            chunks.append(_sse("answer", {"type": "answer", "index": index, "completed": len(indexed), "total": total, **response}))
+    status = simulation.get("status", "completed")
+    if status in TERMINAL_SIMULATION_STATUSES:
+        chunks.append(_sse("done", {"type": "done", "status": status, "error": simulation.get("error")}))
+    return chunks
 
 
-@app.get("/api/simulations", response_model=list[SimulationResponse])
-def list_simulations(request: Request, study_id: str | None = None, service: ResearchBackendService = Depends(get_service)):
+@app.get("/api/simulations/{simulation_id}/stream")
+async def stream_simulation(simulation_id: str, request: Request, service: ResearchBackendService = Depends(get_service)):
     context = require_authenticated_user(request)
-    return service.list_collection("simulations", context.user_id, study_id=study_id)
 
+    def load() -> dict:
+        return service.get_item("simulations", simulation_id, context.user_id)
 
-@app.post("/api/analyses/gioia", response_model=GioiaAnalysisResponse)
-def create_gioia_analysis(
-    payload: GioiaAnalysisRequest, request: Request, service: ResearchBackendService = Depends(get_service)
+    try:
+        await asyncio.to_thread(load)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+    async def events():
+        sent: set[int] = set()
+        with simulation_events.subscribe(simulation_id) as queue:
+            # Subscribed before the snapshot is read, so no answer can fall between the two.
+            current = await asyncio.to_thread(load)
+            total = len(current.get("questions") or current["responses"])
+            yield _sse(
+                "status",
+                {
+                    "type": "status",
+                    "status": current.get("status", "completed"),
+                    "total": total,
+                    "questions": current.get("questions") or [],
+                },
+            )
+            for chunk in _simulation_snapshot_events(current, sent):
+                yield chunk
+            if current.get("status", "completed") in TERMINAL_SIMULATION_STATUSES:
+                return
+            idle = 0.0
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    # The job may be running in another worker process; fall back to the stored checkpoints.
+                    current = await asyncio.to_thread(load)
+                    chunks = _simulation_snapshot_events(current, sent)
+                    for chunk in chunks:
+                        yield chunk
+                    if current.get("status", "completed") in TERMINAL_SIMULATION_STATUSES:
+                        return
+                    idle = 0.0 if chunks else idle + SSE_POLL_SECONDS
+                    if idle >= SSE_HEARTBEAT_SECONDS:
+                        idle = 0.0
+                        yield ": keep-alive\n\n"
+                    continue
+                idle = 0.0
+                if event["type"] == "answer":
+                    if event["index"] in sent:
+                        continue
+                    sent.add(event["index"])
+                yield _sse(event["type"], event)
+                if event["type"] == "done":
+                    return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/simulations", response_model=list[SimulationResponse] | list[SimulationSummary])
+def list_simulations(
+    request: Request,
+    response: Response,
+    study_id: str | None = None,
+    limit: int | None = PAGE_LIMIT_QUERY,
+    cursor: str | None = None,
+    view: ListView = "full",
+    service: ResearchBackendService = Depends(get_service),
 ):
+    context = require_authenticated_user(request)
+    page = service.list_page("simulations", context.user_id, study_id=study_id, limit=limit, cursor=cursor, view=view)
+    return _page_items(response, page)
+
+
+@app.get("/api/simulations/{simulation_id}", response_model=SimulationResponse)
+def get_simulation(simulation_id: str, request: Request, service: ResearchBackendService = Depends(get_service)):
     context = require_authenticated_user(request)
     try:
-        return service.run_ai_gioia(payload.simulation_id, context.user_id, payload.protocol_id, payload.study_id)
+        return service.get_item("simulations", simulation_id, context.user_id)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
+@app.post("/api/analyses/gioia", response_model=JobRecord, status_code=status.HTTP_202_ACCEPTED)
+def create_gioia_analysis(
+    payload: GioiaAnalysisRequest,
+    request: Request,
+    service: ResearchBackendService = Depends(get_service),
+    jobs: JobQueue = Depends(get_job_queue),
+):
+    context = require_authenticated_user(request)
+    return _enqueue_job(
+        "gioia_analysis",
+        payload.model_dump(),
+        {"simulations": payload.simulation_id, "protocols": payload.protocol_id, "studies": payload.study_id},
+        context.user_id,
+        service,
+        jobs,
+    )
+
+
 @app.get("/api/analyses/gioia", response_model=list[GioiaAnalysisResponse])
 def list_gioia_analyses(
-    request: Request, study_id: str | None = None, service: ResearchBackendService = Depends(get_service)
+    request: Request,
+    response: Response,
+    study_id: str | None = None,
+    limit: int | None = PAGE_LIMIT_QUERY,
+    cursor: str | None = None,
+    service: ResearchBackendService = Depends(get_service),
 ):
     context = require_authenticated_user(request)
-    return service.list_collection("gioia_analyses", context.user_id, study_id=study_id)
+    page = service.list_page("gioia_analyses", context.user_id, study_id=study_id, limit=limit, cursor=cursor)
+    return _page_items(response, page)
 
 
-@app.post("/api/comparisons", response_model=ComparisonResponse)
-def create_comparison(payload: ComparisonRequest, request: Request, service: ResearchBackendService = Depends(get_service)):
+@app.get("/api/analyses/gioia/{analysis_id}", response_model=GioiaAnalysisResponse)
+def get_gioia_analysis(analysis_id: str, request: Request, service: ResearchBackendService = Depends(get_service)):
     context = require_authenticated_user(request)
     try:
-        return service.run_structured_comparison(
-            payload.transcript_id,
-            payload.simulation_id,
-            context.user_id,
-            payload.protocol_id,
-            payload.study_id,
-        )
+        return service.get_item("gioia_analyses", analysis_id, context.user_id)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
 
+@app.post("/api/comparisons", response_model=JobRecord, status_code=status.HTTP_202_ACCEPTED)
+def create_comparison(
+    payload: ComparisonRequest,
+    request: Request,
+    service: ResearchBackendService = Depends(get_service),
+    jobs: JobQueue = Depends(get_job_queue),
+):
+    context = require_authenticated_user(request)
+    return _enqueue_job(
+        "comparison",
+        payload.model_dump(),
+        {
+            "transcripts": payload.transcript_id,
+            "simulations": payload.simulation_id,
+            "protocols": payload.protocol_id,
+            "studies": payload.study_id,
+        },
+        context.user_id,
+        service,
+        jobs,
+    )
+
+
 @app.get("/api/comparisons", response_model=list[ComparisonResponse])
-def list_comparisons(request: Request, study_id: str | None = None, service: ResearchBackendService = Depends(get_service)):
+def list_comparisons(
+    request: Request,
+    response: Response,
+    study_id: str | None = None,
+    limit: int | None = PAGE_LIMIT_QUERY,
+    cursor: str | None = None,
+    service: ResearchBackendService = Depends(get_service),
+):
+    context = require_authenticated_user(request)
+    page = service.list_page("comparisons", context.user_id, study_id=study_id, limit=limit, cursor=cursor)
+    return _page_items(response, page)
+
+
+@app.get("/api/comparisons/{comparison_id}", response_model=ComparisonResponse)
+def get_comparison(comparison_id: str, request: Request, service: ResearchBackendService = Depends(get_service)):
+    context = require_authenticated_user(request)
+    try:
+        return service.get_item("comparisons", comparison_id, context.user_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobRecord)
+def get_job(job_id: str, request: Request, jobs: JobQueue = Depends(get_job_queue)):
     context = require_authenticated_user(request)
-    return service.list_collection("comparisons", context.user_id, study_id=study_id)
+    job = jobs.get(job_id, context.user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
 
 
 @app.get("/api/simulations/{simulation_id}/exports/{file_type}")
@@ -419,11 +811,33 @@ def export_simulation(
 ):
     context = require_authenticated_user(request)
     try:
-        export_path = service.export_simulation(simulation_id, context.user_id, file_type)
+        export = service.export_simulation(simulation_id, context.user_id, file_type)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
-    file_path = Path(export_path)
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Export file not found.")
-    return FileResponse(file_path, filename=file_path.name)
+    # no-cache: browsers keep the file but revalidate, so an edited simulation is never served stale.
+    headers = {"ETag": export.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), export.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="{export.filename}"'
+    return StreamingResponse(export.render(), media_type=export.media_type, headers=headers)
+
+
+@app.get("/api/studies/{study_id}/export.zip")
+def export_study_archive(
+    study_id: str,
+    request: Request,
+    formats: str | None = Query(default=None, description='Simulation export formats, e.g. "csv,pdf"; all by default.'),
+    service: ResearchBackendService = Depends(get_service),
+):
+    context = require_authenticated_user(request)
+    try:
+        file_types = parse_export_formats(formats)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    try:
+        archive = service.export_study_archive(study_id, context.user_id, file_types)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    headers = {"Content-Disposition": f'attachment; filename="study_{study_id}.zip"'}
+    return StreamingResponse(archive, media_type="application/zip", headers=headers)
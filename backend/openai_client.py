@@ -0,0 +1,138 @@
+import asyncio
+import atexit
+import importlib.util
+import logging
+import threading
+import weakref
+
+import openai
+
+try:  # recent openai releases are built on the httpx2 fork; pool options must come from the same package.
+    import httpx2 as httpx
+except ImportError:
+    import httpx
+
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_sync_client_singleton: openai.OpenAI | None = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, openai.AsyncOpenAI]" = weakref.WeakKeyDictionary()
+_client_lock = threading.Lock()
+_client_loop: asyncio.AbstractEventLoop | None = None
+_client_loop_thread: threading.Thread | None = None
+
+
+def _http2_enabled() -> bool:
+    if not settings.openai_http2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("OPENAI_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1.")
+        return False
+    return True
+
+
+def http_client_options() -> dict:
+    return {
+        "http2": _http2_enabled(),
+        "timeout": httpx.Timeout(settings.openai_timeout_seconds, connect=settings.openai_connect_timeout_seconds),
+        "limits": httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+            keepalive_expiry=settings.openai_keepalive_expiry_seconds,
+        ),
+    }
+
+
+# Retries are owned by backend.rate_limit, which also paces and throttles, so the SDK must not retry on its own.
+def get_openai_client() -> openai.OpenAI:
+    global _sync_client_singleton
+    with _client_lock:
+        if _sync_client_singleton is None:
+            _sync_client_singleton = openai.OpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url,
+                max_retries=0,
+                http_client=openai.DefaultHttpxClient(**http_client_options()),
+            )
+        return _sync_client_singleton
+
+
+def get_async_openai_client() -> openai.AsyncOpenAI:
+    # httpx async pools are bound to the loop that opened them, so keep one client per running loop.
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = openai.AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url,
+                max_retries=0,
+                http_client=openai.DefaultAsyncHttpxClient(**http_client_options()),
+            )
+            _async_clients[loop] = client
+        return client
+
+
+async def close_async_openai_client() -> None:
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.close()
+
+
+def _get_client_loop() -> asyncio.AbstractEventLoop:
+    global _client_loop, _client_loop_thread
+    with _client_lock:
+        if _client_loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="openai-loop", daemon=True)
+            thread.start()
+            _client_loop, _client_loop_thread = loop, thread
+        return _client_loop
+
+
+def run_on_client_loop(coroutine):
+    """Run a coroutine from synchronous code on the shared background loop and wait for its result.
+
+    The loop lives as long as the process, so the AsyncOpenAI client it owns keeps its
+    connections (and HTTP/2 sessions) open across calls instead of rebuilding them.
+    """
+    loop = _get_client_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coroutine.close()
+        raise RuntimeError("run_on_client_loop cannot block the client loop it would run on; await the coroutine instead.")
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+def close_client_loop() -> None:
+    global _client_loop, _client_loop_thread
+    with _client_lock:
+        loop, thread = _client_loop, _client_loop_thread
+        _client_loop, _client_loop_thread = None, None
+    if loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(close_async_openai_client(), loop).result(timeout=10)
+    except Exception:
+        logger.warning("Closing the background OpenAI client failed", exc_info=True)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=10)
+    loop.close()
+
+
+atexit.register(close_client_loop)
+
+
+def close_openai_client() -> None:
+    global _sync_client_singleton
+    with _client_lock:
+        client, _sync_client_singleton = _sync_client_singleton, None
+    if client is not None:
+        client.close()
+    close_client_loop()
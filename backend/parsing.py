@@ -0,0 +1,253 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import BinaryIO
+
+from backend.cache import DiskLRUCache
+from backend.settings import settings
+from backend.uploads import SpooledUpload, copy_upload_to_path
+
+logger = logging.getLogger(__name__)
+
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+PARSE_KINDS = ("text", "persona")
+# Part of every upload cache key: bump whenever extraction output changes so stale text is never served.
+EXTRACTOR_VERSION = "1"
+
+_upload_cache_singleton: DiskLRUCache | None = None
+_upload_cache_lock = threading.Lock()
+
+
+def get_upload_cache() -> DiskLRUCache | None:
+    global _upload_cache_singleton
+    if not settings.upload_cache_enabled or settings.upload_cache_max_bytes <= 0:
+        return None
+    with _upload_cache_lock:
+        if _upload_cache_singleton is None:
+            _upload_cache_singleton = DiskLRUCache(settings.upload_cache_path, settings.upload_cache_max_bytes)
+        return _upload_cache_singleton
+
+
+def upload_cache_stats() -> dict[str, float | int]:
+    cache = get_upload_cache()
+    return cache.stats() if cache else {"enabled": 0}
+
+
+def document_format(filename: str, content_type: str) -> str:
+    if content_type == "application/pdf" or filename.lower().endswith(".pdf"):
+        return "pdf"
+    if content_type == DOCX_CONTENT_TYPE or filename.lower().endswith(".docx"):
+        return "docx"
+    return "text"
+
+
+def upload_cache_key(
+    filename: str, content_type: str, sha256: str, pages: str | None = None, max_chars: int | None = None
+) -> str:
+    # Persona and text uploads share one extractor per format, so the same file hits across endpoints.
+    file_format = document_format(filename, content_type)
+    selection = f"pages={pages or 'all'}:chars={max_chars or 'all'}"
+    return f"upload:v{EXTRACTOR_VERSION}:{file_format}:{selection}:{sha256}"
+
+
+def load_cached_text(key: str) -> str | None:
+    cache = get_upload_cache()
+    raw = cache.get(key) if cache else None
+    return raw.decode("utf-8") if raw is not None else None
+
+
+def store_cached_text(key: str, text: str) -> None:
+    cache = get_upload_cache()
+    if cache is not None:
+        cache.set(key, text.encode("utf-8"))
+
+
+def parse_document(
+    kind: str,
+    filename: str,
+    content_type: str,
+    source: bytes | str | Path | BinaryIO,
+    pages: str | None = None,
+    max_chars: int | None = None,
+) -> tuple[str, float]:
+    """Extract plain text from an uploaded document; returns the text and the seconds spent parsing.
+
+    `source` is the file content, a path the parsers open directly, or a binary file handle.
+    `pages` ("1-5,8") applies to PDFs only. `max_chars` caps the text; PDFs stop reading pages once it is reached.
+    """
+    from utils.docx_parser import extract_text_from_docx
+    from utils.pdf_parser import extract_text_from_pdf
+    from utils.persona_parser import extract_text_from_pdf_persona
+
+    started = time.perf_counter()
+    document = str(source) if isinstance(source, Path) else source
+    if isinstance(document, bytes):
+        document = io.BytesIO(document)
+        document.name = filename
+    file_format = document_format(filename, content_type)
+    if file_format == "pdf":
+        extract = extract_text_from_pdf_persona if kind == "persona" else extract_text_from_pdf
+        text = extract(document, pages=pages, max_chars=max_chars)
+    elif file_format == "docx":
+        text = extract_text_from_docx(document)
+    elif isinstance(document, (str, Path)):
+        text = Path(document).read_text(encoding="utf-8")
+    else:
+        document.seek(0)
+        text = document.read().decode("utf-8")
+    if max_chars is not None:
+        text = text[:max_chars]
+    return text, time.perf_counter() - started
+
+
+def _warm_worker() -> None:
+    # Paid once per worker at start-up instead of on the first upload it handles.
+    import docx  # noqa: F401
+    import fitz  # noqa: F401
+    import pdfplumber  # noqa: F401
+    import PyPDF2  # noqa: F401
+
+    import utils.docx_parser  # noqa: F401
+    import utils.pdf_engine  # noqa: F401
+    import utils.pdf_parser  # noqa: F401
+    import utils.persona_parser  # noqa: F401
+
+
+def _init_process_worker() -> None:
+    import utils.pdf_engine
+
+    utils.pdf_engine.mark_worker_process()
+    _warm_worker()
+
+
+def _ping() -> bool:
+    return True
+
+
+class ParsingExecutor:
+    """Runs document parsing off the event loop in a warm process pool, falling back to threads."""
+
+    def __init__(self, max_workers: int, mode: str = "process"):
+        self.max_workers = max(1, max_workers)
+        self.mode = mode
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            "pending": 0,
+            "cache_hits": 0,
+            "completed": 0,
+            "failed": 0,
+            "parse_seconds_total": 0.0,
+            "parse_seconds_max": 0.0,
+            "wait_seconds_total": 0.0,
+        }
+
+    def _pool(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_pool()
+            return self._executor
+
+    def _create_pool(self) -> Executor:
+        if self.mode == "process":
+            try:
+                # spawn: forking a process that already runs job threads and SQLite connections is not safe.
+                return ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_process_worker,
+                )
+            except (OSError, NotImplementedError, ValueError):
+                logger.warning("Process pool unavailable; parsing uploads in threads instead.")
+                self.mode = "thread"
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="parse", initializer=_warm_worker)
+
+    def warm(self) -> None:
+        pool = self._pool()
+        for _ in range(self.max_workers):
+            pool.submit(_ping)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _reset_broken_pool(self, broken: Executor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _record(self, **changes: float) -> None:
+        with self._lock:
+            for key, value in changes.items():
+                self._metrics[key] += value
+
+    async def parse(
+        self, kind: str, upload: SpooledUpload, pages: str | None = None, max_chars: int | None = None
+    ) -> str:
+        if kind not in PARSE_KINDS:
+            raise ValueError(f"Unknown parse kind: {kind}")
+        # The upload was hashed while it was spooled; only the SQLite lookup is left, and it blocks.
+        key = upload_cache_key(upload.filename, upload.content_type, upload.sha256, pages, max_chars)
+        cached = await asyncio.to_thread(load_cached_text, key)
+        if cached is not None:
+            self._record(cache_hits=1)
+            return cached
+
+        pool = self._pool()
+        # Worker processes cannot share the request's file handle, and PDFs are opened by path so
+        # pages load lazily (and page workers can open them too); only those cases copy the upload.
+        needs_path = self.mode == "process" or document_format(upload.filename, upload.content_type) == "pdf"
+        path = await asyncio.to_thread(copy_upload_to_path, upload) if needs_path else None
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self._record(pending=1)
+        try:
+            text, parse_seconds = await loop.run_in_executor(
+                pool, parse_document, kind, upload.filename, upload.content_type, path or upload.file, pages, max_chars
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. a crafted PDF crashed the native parser); replace the pool for later uploads.
+            self._reset_broken_pool(pool)
+            self._record(pending=-1, failed=1)
+            raise
+        except Exception:
+            self._record(pending=-1, failed=1)
+            raise
+        finally:
+            if path is not None:
+                path.unlink(missing_ok=True)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._metrics["pending"] -= 1
+            self._metrics["completed"] += 1
+            self._metrics["parse_seconds_total"] += parse_seconds
+            self._metrics["parse_seconds_max"] = max(self._metrics["parse_seconds_max"], parse_seconds)
+            self._metrics["wait_seconds_total"] += max(0.0, elapsed - parse_seconds)
+        await asyncio.to_thread(store_cached_text, key, text)
+        return text
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        completed = metrics["completed"]
+        return {
+            "workers": self.max_workers,
+            "process_pool": int(self.mode == "process"),
+            "pending": metrics["pending"],
+            "queue_depth": max(0, metrics["pending"] - self.max_workers),
+            "completed": completed,
+            "cache_hits": metrics["cache_hits"],
+            "failed": metrics["failed"],
+            "avg_parse_ms": 1000 * metrics["parse_seconds_total"] / completed if completed else 0.0,
+            "max_parse_ms": 1000 * metrics["parse_seconds_max"],
+            "avg_wait_ms": 1000 * metrics["wait_seconds_total"] / completed if completed else 0.0,
+        }
@@ -0,0 +1,300 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+import openai
+
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Rough prompt size used for the tokens-per-minute budget before the real usage is known.
+CHARS_PER_TOKEN = 4
+DEFAULT_COMPLETION_TOKENS = 1024
+OVERLOADED_STATUS_CODES = {429, 503, 529}
+ASYNC_POLL_SECONDS = 0.05
+
+
+class TokenBucket:
+    """Per-minute budget refilled continuously. Callers reserve capacity and sleep off the deficit."""
+
+    def __init__(self, per_minute: int):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self._available = float(per_minute)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self, now: float) -> None:
+        self._available = min(self.capacity, self._available + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` from the bucket and return how long the caller must wait before using it."""
+        if not self.enabled:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self._available -= amount
+            return max(0.0, -self._available / self.rate)
+
+    def refund(self, amount: float) -> None:
+        if not self.enabled or amount == 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._available = min(self.capacity, self._available + amount)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on in-flight requests: grow by one per window of successes, halve on overload."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int, decrease_cooldown_seconds: float = 2.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self.decrease_cooldown_seconds = decrease_cooldown_seconds
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        # The limiter is shared with worker threads, so async callers poll instead of blocking the loop.
+        while not self.try_acquire():
+            await asyncio.sleep(ASYNC_POLL_SECONDS)
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def record_success(self) -> None:
+        with self._condition:
+            previous = int(self.limit)
+            self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            if int(self.limit) > previous:
+                self._condition.notify()
+
+    def record_overload(self) -> None:
+        with self._condition:
+            now = time.monotonic()
+            # One burst of 429s from the same window should only halve the limit once.
+            if now - self._last_decrease < self.decrease_cooldown_seconds:
+                return
+            self._last_decrease = now
+            self.limit = max(float(self.minimum), self.limit / 2)
+
+
+def estimate_request_tokens(params: dict[str, Any]) -> int:
+    prompt_chars = len(json.dumps(params.get("messages", []), default=str))
+    completion_tokens = params.get("max_tokens") or params.get("max_completion_tokens") or DEFAULT_COMPLETION_TOKENS
+    return prompt_chars // CHARS_PER_TOKEN + int(completion_tokens)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, openai.RateLimitError):
+        # An exhausted quota will not recover by waiting.
+        return getattr(exc, "code", None) != "insufficient_quota"
+    return isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError))
+
+
+def is_overload(exc: BaseException) -> bool:
+    return isinstance(exc, openai.APIStatusError) and exc.status_code in OVERLOADED_STATUS_CODES
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return max(0.0, float(milliseconds) / 1000)
+        except ValueError:
+            pass
+    seconds = headers.get("retry-after")
+    if seconds:
+        try:
+            return max(0.0, float(seconds))
+        except ValueError:
+            return None
+    return None
+
+
+class LLMScheduler:
+    """Central gate for OpenAI requests: RPM/TPM buckets, adaptive concurrency and jittered retries."""
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        concurrency: AdaptiveConcurrencyLimiter,
+        max_retries: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _admission_delay(self, estimated_tokens: int) -> float:
+        with self._lock:
+            paused = max(0.0, self._paused_until - time.monotonic())
+        return max(paused, self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+
+    def _settle_tokens(self, estimated_tokens: int, response: Any) -> None:
+        usage = getattr(response, "usage", None)
+        total = getattr(usage, "total_tokens", None)
+        if isinstance(total, int):
+            self.tokens.refund(estimated_tokens - total)
+
+    def _retry_delay(self, exc: BaseException, attempt: int) -> float:
+        server_delay = retry_after_seconds(exc)
+        if server_delay is not None:
+            delay = server_delay + random.uniform(0, self.backoff_base_seconds)
+            # Everyone sharing the account is over the limit, not just this caller.
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + server_delay)
+            return delay
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2**attempt))
+
+    def _on_failure(self, exc: BaseException, attempt: int, retry: bool = True) -> float | None:
+        if isinstance(exc, openai.RateLimitError):
+            self._count("rate_limited")
+        if is_overload(exc) or isinstance(exc, openai.APITimeoutError):
+            self.concurrency.record_overload()
+        if not retry or not is_retryable(exc) or attempt >= self.max_retries:
+            self._count("failures")
+            return None
+        self._count("retries")
+        delay = self._retry_delay(exc, attempt)
+        logger.warning("OpenAI request failed (%s); retry %s/%s in %.1fs", type(exc).__name__, attempt + 1, self.max_retries, delay)
+        return delay
+
+    def call(self, send: Callable[[], T], params: dict[str, Any]) -> T:
+        estimated_tokens = estimate_request_tokens(params)
+        attempt = 0
+        while True:
+            time.sleep(self._admission_delay(estimated_tokens))
+            self.concurrency.acquire()
+            self._count("requests")
+            try:
+                response = send()
+            except Exception as exc:
+                delay = self._on_failure(exc, attempt)
+                if delay is None:
+                    raise
+            else:
+                self.concurrency.record_success()
+                self._settle_tokens(estimated_tokens, response)
+                return response
+            finally:
+                self.concurrency.release()
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(
+        self,
+        send: Callable[[], Awaitable[Any]],
+        params: dict[str, Any],
+        consume: Callable[[Any], Awaitable[T]] | None = None,
+    ) -> T:
+        """Send a request under the limits, retrying transient failures.
+
+        With `consume`, the concurrency slot is held until `consume(response)` returns,
+        so a stream counts against the limit until it is fully read or closed. A
+        failure while consuming is not retried: part of the output has been delivered.
+        """
+        estimated_tokens = estimate_request_tokens(params)
+        attempt = 0
+        while True:
+            # Every attempt, retries included, reserves its own request and token budget.
+            await asyncio.sleep(self._admission_delay(estimated_tokens))
+            await self.concurrency.acquire_async()
+            self._count("requests")
+            consuming = False
+            try:
+                response = await send()
+                if consume is not None:
+                    consuming = True
+                    response = await consume(response)
+            except Exception as exc:
+                delay = self._on_failure(exc, attempt, retry=not consuming)
+                if delay is None:
+                    raise
+            else:
+                self.concurrency.record_success()
+                self._settle_tokens(estimated_tokens, response)
+                return response
+            finally:
+                self.concurrency.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight,
+        }
+
+
+_scheduler_singleton: LLMScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    global _scheduler_singleton
+    with _scheduler_lock:
+        if _scheduler_singleton is None:
+            _scheduler_singleton = LLMScheduler(
+                requests_per_minute=settings.openai_requests_per_minute,
+                tokens_per_minute=settings.openai_tokens_per_minute,
+                concurrency=AdaptiveConcurrencyLimiter(
+                    initial=settings.openai_initial_concurrency,
+                    minimum=settings.openai_min_concurrency,
+                    maximum=settings.openai_max_concurrency,
+                ),
+                max_retries=settings.openai_max_retries,
+                backoff_base_seconds=settings.openai_backoff_base_seconds,
+                backoff_max_seconds=settings.openai_backoff_max_seconds,
+            )
+        return _scheduler_singleton
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class StudyBase(BaseModel):
@@ -103,11 +103,25 @@ class TranscriptRecord(BaseModel):
     updated_at: datetime
 
 
+class TranscriptSummary(BaseModel):
+    id: str
+    name: str
+    source_type: str = "text"
+    study_id: str | None = None
+    content_chars: int | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
 class SimulationRequest(BaseModel):
     persona_id: str
     question_guide_id: str
     protocol_id: str | None = None
     study_id: str | None = None
+    stream: bool = False
+
+
+SimulationStatus = Literal["in_progress", "partial", "completed"]
 
 
 class SimulationResponse(BaseModel):
@@ -116,8 +130,32 @@ class SimulationResponse(BaseModel):
     question_guide_id: str
     protocol_id: str | None = None
     study_id: str | None = None
+    questions: list[str] | None = None
     responses: list[dict[str, Any]]
+    status: SimulationStatus = "completed"
+    error: str | None = None
+    created_at: datetime
+
+
+class SimulationSummary(BaseModel):
+    id: str
+    persona_id: str
+    question_guide_id: str
+    protocol_id: str | None = None
+    study_id: str | None = None
+    response_count: int | None = None
+    status: SimulationStatus = "completed"
     created_at: datetime
+    updated_at: datetime | None = None
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def _default_legacy_status(cls, value: Any) -> Any:
+        # Records written before checkpointing have no status and were only ever saved once finished.
+        return value or "completed"
+
+
+ListView = Literal["full", "summary"]
 
 
 class GioiaAnalysisRequest(BaseModel):
@@ -152,8 +190,27 @@ class ComparisonResponse(BaseModel):
     created_at: datetime
 
 
+class JobProgress(BaseModel):
+    completed: int = 0
+    total: int = 0
+
+
+class JobRecord(BaseModel):
+    id: str
+    kind: str
+    status: str
+    progress: JobProgress = Field(default_factory=JobProgress)
+    result_ids: list[str] = Field(default_factory=list)
+    error: str | None = None
+    study_id: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
 class UploadTextResponse(BaseModel):
     text: str
+    # True only when the caller passed max_chars and the document had more text than that.
+    truncated: bool = False
 
 
 class HealthResponse(BaseModel):
@@ -161,6 +218,15 @@ class HealthResponse(BaseModel):
     storage_backend: str
 
 
+class MetricsResponse(BaseModel):
+    auth: dict[str, float | int]
+    llm_cache: dict[str, float | int]
+    llm_scheduler: dict[str, float | int]
+    parsing: dict[str, float | int]
+    upload_cache: dict[str, float | int]
+    export_cache: dict[str, float | int]
+
+
 class AuthSignInRequest(BaseModel):
     email: str
     password: str
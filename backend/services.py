@@ -1,23 +1,23 @@
-import io
 import json
 import re
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterator
 from pathlib import Path
 from typing import Any
 
-import openai
-
+from backend.errors import SimulationIncompleteError
+from backend.events import simulation_events
+from backend.exports import SimulationExport, build_simulation_export, iter_zip_archive, study_archive_entries
+from backend.llm import chat_completion
+from backend.openai_client import get_openai_client
 from backend.settings import settings
-from backend.storage import StorageAdapter, utc_now
-from scripts.analyze_gioia import analyze_gioia
-from scripts.export_results import export_format
-from scripts.simulate_interviews import simulate_interview
-from utils.pdf_parser import extract_questions_with_ai, extract_text_from_pdf, validate_and_improve_questions
-from utils.persona_parser import (
-    extract_persona_info_with_ai,
-    extract_text_from_docx,
-    extract_text_from_pdf_persona,
-    validate_persona_data,
-)
+from backend.storage import StorageAdapter, encode_cursor, utc_now
+from backend.token_budget import fit_messages
+from scripts.analyze_gioia import analyze_gioia_text, format_interview
+from scripts.simulate_interviews import simulate_questions
+from utils.pdf_parser import extract_questions_with_ai, validate_and_improve_questions
+from utils.persona_parser import extract_persona_info_with_ai, validate_persona_data
 
 
 DEFAULT_PROTOCOL = {
@@ -35,6 +35,41 @@ DEFAULT_PROTOCOL = {
     ),
 }
 
+SUMMARY_FIELDS = {
+    "transcripts": ["id", "name", "source_type", "study_id", "created_at", "updated_at", "content_chars"],
+    "simulations": [
+        "id",
+        "persona_id",
+        "question_guide_id",
+        "protocol_id",
+        "study_id",
+        "created_at",
+        "updated_at",
+        "response_count",
+        "status",
+    ],
+}
+
+
+def missing_question_indexes(questions: list[str], responses: list[dict[str, Any]]) -> list[int]:
+    answered = Counter(response.get("question") for response in responses)
+    missing = []
+    for index, question in enumerate(questions):
+        if answered[question] > 0:
+            answered[question] -= 1
+        else:
+            missing.append(index)
+    return missing
+
+
+def indexed_responses(simulation: dict[str, Any]) -> list[tuple[int, dict[str, Any]]]:
+    questions = simulation.get("questions")
+    if questions is None:
+        return list(enumerate(simulation["responses"]))
+    missing = set(missing_question_indexes(questions, simulation["responses"]))
+    answered = [index for index in range(len(questions)) if index not in missing]
+    return list(zip(answered, simulation["responses"]))
+
 
 class ResearchBackendService:
     def __init__(self, storage: StorageAdapter):
@@ -44,11 +79,36 @@ class ResearchBackendService:
     def _owner_filters(user_id: str) -> dict[str, Any]:
         return {"owner_user_id": user_id}
 
-    def list_collection(self, collection: str, user_id: str, study_id: str | None = None) -> list[dict[str, Any]]:
-        items = self.storage.list_items(collection, filters=self._owner_filters(user_id))
-        if study_id is None:
-            return items
-        return [item for item in items if item.get("study_id") == study_id]
+    def list_page(
+        self,
+        collection: str,
+        user_id: str,
+        study_id: str | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+        view: str = "full",
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        filters = self._owner_filters(user_id)
+        if study_id is not None:
+            filters["study_id"] = study_id
+        order_by = "created_at" if limit is not None or cursor is not None else None
+        fields = SUMMARY_FIELDS.get(collection) if view == "summary" else None
+        items = self.storage.list_items(
+            collection, filters=filters, limit=limit, order_by=order_by, cursor=cursor, fields=fields
+        )
+        next_cursor = encode_cursor(items[-1], order_by) if limit is not None and len(items) == limit else None
+        return items, next_cursor
+
+    def iter_collection(
+        self, collection: str, user_id: str, study_id: str | None = None, page_size: int = 25
+    ) -> Iterator[dict[str, Any]]:
+        """Yield a collection page by page so large studies are never loaded whole."""
+        cursor = None
+        while True:
+            items, cursor = self.list_page(collection, user_id, study_id=study_id, limit=page_size, cursor=cursor)
+            yield from items
+            if cursor is None:
+                return
 
     def get_item(self, collection: str, item_id: str, user_id: str) -> dict[str, Any]:
         item = self.storage.get_item(collection, item_id, filters=self._owner_filters(user_id))
@@ -56,6 +116,11 @@ class ResearchBackendService:
             raise ValueError(f"{collection.rstrip('s').title()} not found.")
         return item
 
+    def require_items(self, user_id: str, references: dict[str, str | None]) -> None:
+        for collection, item_id in references.items():
+            if item_id is not None:
+                self.get_item(collection, item_id, user_id)
+
     def save_study(self, study: dict[str, Any], user_id: str) -> dict[str, Any]:
         study["owner_user_id"] = user_id
         return self.storage.upsert_item("studies", study)
@@ -113,7 +178,7 @@ class ResearchBackendService:
             questions = validate_and_improve_questions(questions)
         return questions
 
-    def run_simulation(
+    def start_simulation(
         self,
         persona_id: str,
         question_guide_id: str,
@@ -127,38 +192,125 @@ class ResearchBackendService:
         resolved_study_id = study_id or persona.get("study_id") or guide.get("study_id") or protocol.get("study_id")
         self.ensure_study_exists(resolved_study_id, user_id)
 
-        from tempfile import NamedTemporaryFile
-
-        with NamedTemporaryFile("w+", suffix=".json", delete=True) as persona_file, NamedTemporaryFile(
-            "w+", suffix=".txt", delete=True
-        ) as questions_file, NamedTemporaryFile("w+", suffix=".json", delete=True) as output_file:
-            json.dump(persona, persona_file)
-            persona_file.flush()
-            questions_file.write("\n".join(guide["questions"]))
-            questions_file.flush()
-            responses = simulate_interview(
-                persona_file.name,
-                questions_file.name,
-                output_file.name,
-                settings={
-                    "shared_context": protocol.get("shared_context", ""),
-                    "interview_style": protocol.get("interview_style_guidance", ""),
-                    "consistency_rules": protocol.get("consistency_rules", ""),
-                    "analysis_focus": protocol.get("analysis_focus", ""),
-                    "protocol_name": protocol.get("name", "Default Protocol"),
-                },
-            )
+        # The question list is snapshotted so a resume answers the same guide even if it is edited meanwhile.
         simulation = {
             "persona_id": persona_id,
             "question_guide_id": question_guide_id,
             "protocol_id": protocol_id,
             "study_id": resolved_study_id,
             "owner_user_id": user_id,
-            "responses": responses,
+            "questions": [question.strip() for question in guide["questions"] if question and question.strip()],
+            "responses": [],
+            "status": "in_progress",
+            "error": None,
             "created_at": utc_now().isoformat(),
         }
         return self.storage.upsert_item("simulations", simulation)
 
+    def resume_simulation(
+        self,
+        simulation_id: str,
+        user_id: str,
+        on_progress: Callable[[int, int], None] | None = None,
+        stream_tokens: bool = False,
+    ) -> dict[str, Any]:
+        simulation = self.get_item("simulations", simulation_id, user_id)
+        questions = simulation.get("questions")
+        if simulation.get("status", "completed") == "completed" or questions is None:
+            return simulation
+        missing = missing_question_indexes(questions, simulation["responses"])
+        missing_set = set(missing)
+        answered_indexes = [index for index in range(len(questions)) if index not in missing_set]
+        answers = dict(zip(answered_indexes, simulation["responses"]))
+        total = len(questions)
+        checkpoint_lock = threading.Lock()
+
+        def checkpoint() -> None:
+            simulation["responses"] = [answers[index] for index in sorted(answers)]
+            simulation.update(self.storage.upsert_item("simulations", simulation))
+
+        def finish(status: str, error: str | None = None) -> None:
+            with checkpoint_lock:
+                simulation["status"] = status
+                simulation["error"] = error
+                checkpoint()
+            simulation_events.publish(simulation_id, {"type": "done", "status": status, "error": error})
+
+        def record_answer(position: int, response: dict[str, Any]) -> None:
+            with checkpoint_lock:
+                answers[missing[position]] = response
+                checkpoint()
+                completed = len(answers)
+                if on_progress is not None:
+                    on_progress(completed, total)
+            simulation_events.publish(
+                simulation_id,
+                {"type": "answer", "index": missing[position], "completed": completed, "total": total, **response},
+            )
+
+        def record_token(position: int, text: str) -> None:
+            simulation_events.publish(simulation_id, {"type": "token", "index": missing[position], "text": text})
+
+        simulation["status"] = "in_progress"
+        simulation["error"] = None
+        with checkpoint_lock:
+            checkpoint()
+            if on_progress is not None:
+                on_progress(len(answers), total)
+        simulation_events.publish(simulation_id, {"type": "status", "status": "in_progress", "completed": len(answers), "total": total})
+        try:
+            persona = self.get_item("personas", simulation["persona_id"], user_id)
+            protocol_id = simulation.get("protocol_id")
+            protocol = self.get_item("protocols", protocol_id, user_id) if protocol_id else DEFAULT_PROTOCOL
+        except ValueError as exc:
+            finish("partial", str(exc))
+            raise
+
+        try:
+            simulate_questions(
+                persona,
+                [questions[index] for index in missing],
+                on_answer=record_answer,
+                on_token=record_token if stream_tokens else None,
+                settings={
+                    "shared_context": protocol.get("shared_context", ""),
+                    "interview_style": protocol.get("interview_style_guidance", ""),
+                    "consistency_rules": protocol.get("consistency_rules", ""),
+                    "analysis_focus": protocol.get("analysis_focus", ""),
+                    "protocol_name": protocol.get("name", "Default Protocol"),
+                    "simulation_concurrency": settings.simulation_concurrency,
+                },
+            )
+        except Exception as exc:
+            finish("partial", f"{len(answers)} of {total} questions answered before {type(exc).__name__}.")
+            raise SimulationIncompleteError(f"{simulation['error']} Resume the simulation to answer the rest.") from exc
+
+        finish("completed")
+        return simulation
+
+    def abandon_simulation(self, simulation_id: str, user_id: str, error: str) -> dict[str, Any]:
+        # Called when its job gives up: leave the record resumable instead of in_progress with no worker.
+        simulation = self.get_item("simulations", simulation_id, user_id)
+        if simulation.get("status", "completed") != "in_progress":
+            return simulation
+        simulation["status"] = "partial"
+        simulation["error"] = error
+        simulation = self.storage.upsert_item("simulations", simulation)
+        simulation_events.publish(simulation_id, {"type": "done", "status": "partial", "error": error})
+        return simulation
+
+    def run_simulation(
+        self,
+        persona_id: str,
+        question_guide_id: str,
+        user_id: str,
+        protocol_id: str | None = None,
+        study_id: str | None = None,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> dict[str, Any]:
+        simulation = self.start_simulation(persona_id, question_guide_id, user_id, protocol_id, study_id)
+        return self.resume_simulation(simulation["id"], user_id, on_progress=on_progress)
+
     def run_ai_gioia(
         self, simulation_id: str, user_id: str, protocol_id: str | None = None, study_id: str | None = None
     ) -> dict[str, Any]:
@@ -167,18 +319,10 @@ class ResearchBackendService:
         resolved_study_id = study_id or simulation.get("study_id") or protocol.get("study_id")
         self.ensure_study_exists(resolved_study_id, user_id)
 
-        from tempfile import NamedTemporaryFile
-
-        with NamedTemporaryFile("w+", suffix=".json", delete=True) as simulation_file, NamedTemporaryFile(
-            "w+", suffix=".md", delete=True
-        ) as output_file:
-            json.dump(simulation["responses"], simulation_file)
-            simulation_file.flush()
-            markdown = analyze_gioia(
-                simulation_file.name,
-                output_file.name,
-                settings={"analysis_focus": protocol.get("analysis_focus", "")},
-            )
+        markdown = analyze_gioia_text(
+            format_interview(simulation["responses"]),
+            settings={"analysis_focus": protocol.get("analysis_focus", "")},
+        )
 
         result = {
             "simulation_id": simulation_id,
@@ -204,9 +348,11 @@ class ResearchBackendService:
         resolved_study_id = study_id or transcript.get("study_id") or simulation.get("study_id") or protocol.get("study_id")
         self.ensure_study_exists(resolved_study_id, user_id)
 
-        client = openai.OpenAI(api_key=settings.openai_api_key)
+        client = get_openai_client()
         ai_text = "\n".join([f"Q: {item['question']}\nA: {item['answer']}" for item in simulation["responses"]])
-        prompt = f"""
+
+        def build_messages(sections: dict[str, str]) -> list[dict[str, str]]:
+            prompt = f"""
         Compare a real interview transcript against an AI-generated interview and return valid JSON only.
 
         Use this structure exactly:
@@ -250,23 +396,28 @@ class ResearchBackendService:
         {protocol.get("analysis_focus", "")}
 
         Real transcript:
-        {transcript["content"][:6000]}
+        {sections["transcript"]}
 
         AI transcript:
-        {ai_text[:6000]}
+        {sections["ai_transcript"]}
         """
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
+            return [
                 {
                     "role": "system",
                     "content": "You are an expert qualitative researcher. Return valid JSON only.",
                 },
                 {"role": "user", "content": prompt},
-            ],
-            max_tokens=2200,
-            temperature=0.3,
+            ]
+
+        model = "gpt-3.5-turbo"
+        max_tokens = 2200
+        messages, prompt_budget = fit_messages(
+            model,
+            build_messages,
+            {"transcript": transcript["content"], "ai_transcript": ai_text},
+            completion_tokens=max_tokens,
         )
+        response = chat_completion(client, model=model, messages=messages, max_tokens=max_tokens, temperature=0.3)
         payload = self._extract_json_payload(response.choices[0].message.content)
         result = {
             "transcript_id": transcript_id,
@@ -274,50 +425,28 @@ class ResearchBackendService:
             "protocol_id": protocol_id,
             "study_id": resolved_study_id,
             "owner_user_id": user_id,
-            "payload": payload or {"markdown_report": response.choices[0].message.content},
+            "payload": {
+                **(payload or {"markdown_report": response.choices[0].message.content}),
+                "prompt_budget": prompt_budget,
+            },
             "created_at": utc_now().isoformat(),
         }
         return self.storage.upsert_item("comparisons", result)
 
-    def export_simulation(self, simulation_id: str, user_id: str, file_type: str) -> str:
+    def export_simulation(self, simulation_id: str, user_id: str, file_type: str) -> SimulationExport:
         simulation = self.get_item("simulations", simulation_id, user_id)
-        export_root = settings.local_storage_root / "generated_exports"
-        export_root.mkdir(parents=True, exist_ok=True)
-        from tempfile import NamedTemporaryFile
-
-        with NamedTemporaryFile("w+", suffix=".json", delete=True) as simulation_file:
-            json.dump(simulation["responses"], simulation_file)
-            simulation_file.flush()
-            return export_format(
-                simulation_file.name,
-                f"simulation_{simulation_id}",
-                file_type=file_type,
-                output_dir=str(export_root),
-            )
-
-    def extract_text_from_upload(self, filename: str, content_type: str, file_bytes: bytes) -> str:
-        buffer = io.BytesIO(file_bytes)
-        buffer.name = filename
-        if content_type == "application/pdf" or filename.lower().endswith(".pdf"):
-            return extract_text_from_pdf(buffer)
-        if (
-            content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            or filename.lower().endswith(".docx")
-        ):
-            return extract_text_from_docx(buffer)
-        return file_bytes.decode("utf-8")
-
-    def extract_persona_text_from_upload(self, filename: str, content_type: str, file_bytes: bytes) -> str:
-        buffer = io.BytesIO(file_bytes)
-        buffer.name = filename
-        if content_type == "application/pdf" or filename.lower().endswith(".pdf"):
-            return extract_text_from_pdf_persona(buffer)
-        if (
-            content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            or filename.lower().endswith(".docx")
-        ):
-            return extract_text_from_docx(buffer)
-        return file_bytes.decode("utf-8")
+        return build_simulation_export(simulation, file_type)
+
+    def export_study_archive(self, study_id: str, user_id: str, formats: list[str]) -> Iterator[bytes]:
+        study = self.get_item("studies", study_id, user_id)
+        entries = study_archive_entries(
+            study,
+            self.iter_collection("simulations", user_id, study_id),
+            self.iter_collection("gioia_analyses", user_id, study_id),
+            self.iter_collection("comparisons", user_id, study_id),
+            formats,
+        )
+        return iter_zip_archive(entries, window=2 * max(1, settings.export_workers))
 
     @staticmethod
     def _extract_json_payload(raw_text: str) -> dict[str, Any] | None:
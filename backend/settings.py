@@ -8,8 +8,45 @@ class BackendSettings(BaseSettings):
     api_title: str = "Qualitative AI Interview Studio API"
     api_version: str = "0.1.0"
     openai_api_key: str | None = Field(default=None, alias="OPENAI_API_KEY")
+    openai_base_url: str | None = Field(default=None, alias="OPENAI_BASE_URL")
+    openai_timeout_seconds: float = Field(default=120.0, alias="OPENAI_TIMEOUT_SECONDS")
+    openai_connect_timeout_seconds: float = Field(default=10.0, alias="OPENAI_CONNECT_TIMEOUT_SECONDS")
+    openai_max_connections: int = Field(default=64, alias="OPENAI_MAX_CONNECTIONS")
+    openai_max_keepalive_connections: int = Field(default=32, alias="OPENAI_MAX_KEEPALIVE_CONNECTIONS")
+    openai_keepalive_expiry_seconds: float = Field(default=90.0, alias="OPENAI_KEEPALIVE_EXPIRY_SECONDS")
+    openai_http2: bool = Field(default=False, alias="OPENAI_HTTP2")
+    openai_requests_per_minute: int = Field(default=0, alias="OPENAI_REQUESTS_PER_MINUTE")
+    openai_tokens_per_minute: int = Field(default=0, alias="OPENAI_TOKENS_PER_MINUTE")
+    openai_initial_concurrency: int = Field(default=8, alias="OPENAI_INITIAL_CONCURRENCY")
+    openai_min_concurrency: int = Field(default=1, alias="OPENAI_MIN_CONCURRENCY")
+    openai_max_concurrency: int = Field(default=64, alias="OPENAI_MAX_CONCURRENCY")
+    openai_max_retries: int = Field(default=6, alias="OPENAI_MAX_RETRIES")
+    openai_backoff_base_seconds: float = Field(default=1.0, alias="OPENAI_BACKOFF_BASE_SECONDS")
+    openai_backoff_max_seconds: float = Field(default=60.0, alias="OPENAI_BACKOFF_MAX_SECONDS")
+    simulation_concurrency: int = Field(default=4, alias="SIMULATION_CONCURRENCY")
+    job_workers: int = Field(default=2, alias="JOB_WORKERS")
+    job_lease_seconds: float = Field(default=60.0, alias="JOB_LEASE_SECONDS")
+    parse_workers: int = Field(default=2, alias="PARSE_WORKERS")
+    parse_executor: str = Field(default="process", alias="PARSE_EXECUTOR")
+    pdf_page_workers: int = Field(default=0, alias="PDF_PAGE_WORKERS")
+    llm_cache_enabled: bool = Field(default=True, alias="LLM_CACHE_ENABLED")
+    llm_cache_path: Path = Field(default=Path("backend_data/llm_cache.sqlite3"), alias="LLM_CACHE_PATH")
+    llm_cache_max_bytes: int = Field(default=256 * 1024 * 1024, alias="LLM_CACHE_MAX_BYTES")
+    upload_max_bytes: int = Field(default=64 * 1024 * 1024, alias="UPLOAD_MAX_BYTES")
+    upload_spool_dir: Path | None = Field(default=None, alias="UPLOAD_SPOOL_DIR")
+    upload_cache_enabled: bool = Field(default=True, alias="UPLOAD_CACHE_ENABLED")
+    upload_cache_path: Path = Field(default=Path("backend_data/upload_cache.sqlite3"), alias="UPLOAD_CACHE_PATH")
+    upload_cache_max_bytes: int = Field(default=128 * 1024 * 1024, alias="UPLOAD_CACHE_MAX_BYTES")
+    export_cache_enabled: bool = Field(default=True, alias="EXPORT_CACHE_ENABLED")
+    export_cache_path: Path = Field(default=Path("backend_data/export_cache.sqlite3"), alias="EXPORT_CACHE_PATH")
+    export_cache_max_bytes: int = Field(default=256 * 1024 * 1024, alias="EXPORT_CACHE_MAX_BYTES")
+    export_wait_seconds: float = Field(default=30.0, alias="EXPORT_WAIT_SECONDS")
+    export_workers: int = Field(default=2, alias="EXPORT_WORKERS")
+    export_executor: str = Field(default="process", alias="EXPORT_EXECUTOR")
+    tiktoken_cache_dir: Path | None = Field(default=None, alias="TIKTOKEN_CACHE_DIR")
     storage_backend: str = Field(default="local", alias="STORAGE_BACKEND")
     local_storage_root: Path = Field(default=Path("backend_data"), alias="LOCAL_STORAGE_ROOT")
+    sqlite_path: Path = Field(default=Path("backend_data/storage.sqlite3"), alias="SQLITE_PATH")
     supabase_url: str | None = Field(default=None, alias="SUPABASE_URL")
     supabase_anon_key: str | None = Field(default=None, alias="SUPABASE_ANON_KEY")
     supabase_service_role_key: str | None = Field(default=None, alias="SUPABASE_SERVICE_ROLE_KEY")
@@ -17,6 +54,13 @@ class BackendSettings(BaseSettings):
     auth_refresh_cookie_name: str = Field(default="qa_refresh_token", alias="AUTH_REFRESH_COOKIE_NAME")
     auth_cookie_secure: bool = Field(default=False, alias="AUTH_COOKIE_SECURE")
     auth_cookie_samesite: str = Field(default="lax", alias="AUTH_COOKIE_SAMESITE")
+    auth_verification_mode: str = Field(default="remote", alias="AUTH_VERIFICATION_MODE")
+    supabase_jwt_secret: str | None = Field(default=None, alias="SUPABASE_JWT_SECRET")
+    supabase_jwks_url: str | None = Field(default=None, alias="SUPABASE_JWKS_URL")
+    supabase_jwks_cache_seconds: int = Field(default=3600, alias="SUPABASE_JWKS_CACHE_SECONDS")
+    auth_jwt_audience: str = Field(default="authenticated", alias="AUTH_JWT_AUDIENCE")
+    auth_cache_ttl_seconds: float = Field(default=60.0, alias="AUTH_CACHE_TTL_SECONDS")
+    auth_cache_max_entries: int = Field(default=1024, alias="AUTH_CACHE_MAX_ENTRIES")
     cors_origins: str = Field(default="*", alias="CORS_ORIGINS")
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore", populate_by_name=True)
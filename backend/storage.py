@@ -1,12 +1,17 @@
+import base64
 import json
 import logging
+import os
+import re
+import sqlite3
+import threading
 import uuid
 from abc import ABC, abstractmethod
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
-from backend.errors import SupabaseOperationError
+from backend.errors import InvalidCursorError, SupabaseOperationError
 from backend.settings import settings
 
 try:
@@ -18,28 +23,144 @@ except Exception:  # pragma: no cover - optional until installed/configured
 logger = logging.getLogger(__name__)
 
 
+ORDERABLE_FIELDS = {"created_at", "updated_at"}
+# Size columns computed from a heavy field; generated columns in Supabase, derived on read elsewhere.
+DERIVED_FIELDS = {"content_chars": "content", "response_count": "responses"}
+
+
 def utc_now() -> datetime:
     return datetime.now(UTC)
 
 
+def parse_order_by(order_by: str | None) -> tuple[str, bool]:
+    order_by = order_by or "created_at"
+    descending = order_by.startswith("-")
+    field = order_by.lstrip("-")
+    if field not in ORDERABLE_FIELDS:
+        raise ValueError(f"Unsupported order_by field: {field}")
+    return field, descending
+
+
+def encode_cursor(item: dict[str, Any], order_by: str | None) -> str:
+    field, _ = parse_order_by(order_by)
+    raw = json.dumps([item.get(field) or "", item["id"]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    # Cursors come from clients: accept only what encode_cursor produces (an ISO timestamp or "", and a UUID).
+    try:
+        value, item_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(value, str) or not isinstance(item_id, str):
+            raise ValueError("cursor fields must be strings")
+        if value:
+            datetime.fromisoformat(value)
+        item_id = str(uuid.UUID(item_id))
+    except Exception as exc:
+        raise InvalidCursorError() from exc
+    return value, item_id
+
+
+def postgrest_quote(value: str) -> str:
+    """Quote a value for a PostgREST logical filter, so `,().:` inside it are not read as syntax."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def paginate_in_memory(
+    items: list[dict[str, Any]], limit: int | None, order_by: str | None, cursor: str | None
+) -> list[dict[str, Any]]:
+    if limit is None and order_by is None and cursor is None:
+        return items
+
+    field, descending = parse_order_by(order_by)
+
+    def sort_key(item: dict[str, Any]) -> tuple[str, str]:
+        return (item.get(field) or "", item.get("id") or "")
+
+    items = sorted(items, key=sort_key, reverse=descending)
+    if cursor:
+        position = decode_cursor(cursor)
+        items = [item for item in items if (sort_key(item) < position if descending else sort_key(item) > position)]
+    return items[:limit] if limit is not None else items
+
+
+def project_item(item: dict[str, Any], fields: list[str] | None) -> dict[str, Any]:
+    if fields is None:
+        return item
+    projected = {}
+    for field in fields:
+        source = DERIVED_FIELDS.get(field)
+        if source is None:
+            projected[field] = item.get(field)
+        else:
+            value = item.get(source)
+            projected[field] = len(value) if value is not None else None
+    return projected
+
+
+def strip_derived_fields(item: dict[str, Any]) -> dict[str, Any]:
+    for field in DERIVED_FIELDS:
+        item.pop(field, None)
+    return item
+
+
 class StorageAdapter(ABC):
     @abstractmethod
-    def list_items(self, collection: str, filters: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    def list_items(
+        self,
+        collection: str,
+        filters: dict[str, Any] | None = None,
+        *,
+        limit: int | None = None,
+        order_by: str | None = None,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """List records matching `filters`.
+
+        `order_by` is `created_at`/`updated_at` (prefix `-` for descending) and defaults
+        to `created_at` once `limit` or `cursor` is given. `cursor` comes from
+        `encode_cursor(last_item, order_by)` of the previous page. `fields` projects each
+        record onto the named keys, including the sizes in `DERIVED_FIELDS`.
+        """
         raise NotImplementedError
 
     @abstractmethod
-    def get_item(self, collection: str, item_id: str, filters: dict[str, Any] | None = None) -> dict[str, Any] | None:
+    def get_item(
+        self,
+        collection: str,
+        item_id: str,
+        filters: dict[str, Any] | None = None,
+        fields: list[str] | None = None,
+    ) -> dict[str, Any] | None:
         raise NotImplementedError
 
     @abstractmethod
     def upsert_item(self, collection: str, item: dict[str, Any]) -> dict[str, Any]:
         raise NotImplementedError
 
+    @abstractmethod
+    def update_item_if(
+        self, collection: str, item_id: str, expected: dict[str, Any], changes: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Atomically merge `changes` into a record whose fields still equal `expected`.
+
+        Returns the updated record, or None when the record is missing or another
+        writer changed one of the `expected` fields first (compare-and-set).
+        """
+        raise NotImplementedError
+
+
+def _matches_expected(item: dict[str, Any] | None, expected: dict[str, Any]) -> bool:
+    return item is not None and all(item.get(key) == value for key, value in expected.items())
+
 
 class LocalJsonStorage(StorageAdapter):
     def __init__(self, root: Path):
         self.root = root
         self.root.mkdir(parents=True, exist_ok=True)
+        # Serialises writers within this process; like the other local backends, one process owns the files.
+        self._lock = threading.RLock()
 
     def _collection_path(self, collection: str) -> Path:
         path = self.root / f"{collection}.json"
@@ -51,38 +172,468 @@ class LocalJsonStorage(StorageAdapter):
         return json.loads(self._collection_path(collection).read_text(encoding="utf-8"))
 
     def _write(self, collection: str, items: list[dict[str, Any]]) -> None:
-        self._collection_path(collection).write_text(json.dumps(items, indent=2), encoding="utf-8")
-
-    def list_items(self, collection: str, filters: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        # Replace the file in one step so a concurrent reader never sees it half-written.
+        path = self._collection_path(collection)
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(items, indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def list_items(
+        self,
+        collection: str,
+        filters: dict[str, Any] | None = None,
+        *,
+        limit: int | None = None,
+        order_by: str | None = None,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
         items = self._read(collection)
-        if not filters:
-            return items
-        return [item for item in items if all(item.get(key) == value for key, value in filters.items())]
-
-    def get_item(self, collection: str, item_id: str, filters: dict[str, Any] | None = None) -> dict[str, Any] | None:
+        if filters:
+            items = [item for item in items if all(item.get(key) == value for key, value in filters.items())]
+        return [project_item(item, fields) for item in paginate_in_memory(items, limit, order_by, cursor)]
+
+    def get_item(
+        self,
+        collection: str,
+        item_id: str,
+        filters: dict[str, Any] | None = None,
+        fields: list[str] | None = None,
+    ) -> dict[str, Any] | None:
         for item in self.list_items(collection, filters=filters):
             if item.get("id") == item_id:
-                return item
+                return project_item(item, fields)
         return None
 
     def upsert_item(self, collection: str, item: dict[str, Any]) -> dict[str, Any]:
-        items = self._read(collection)
+        strip_derived_fields(item)
         timestamp = utc_now().isoformat()
         if not item.get("id"):
             item["id"] = str(uuid.uuid4())
             item["created_at"] = timestamp
         item["updated_at"] = timestamp
 
-        replaced = False
-        for index, existing in enumerate(items):
-            if existing.get("id") == item["id"]:
-                item["created_at"] = existing.get("created_at", timestamp)
-                items[index] = item
-                replaced = True
-                break
-        if not replaced:
-            items.append(item)
-        self._write(collection, items)
+        with self._lock:
+            items = self._read(collection)
+            replaced = False
+            for index, existing in enumerate(items):
+                if existing.get("id") == item["id"]:
+                    item["created_at"] = existing.get("created_at", timestamp)
+                    items[index] = item
+                    replaced = True
+                    break
+            if not replaced:
+                items.append(item)
+            self._write(collection, items)
+        return item
+
+    def update_item_if(
+        self, collection: str, item_id: str, expected: dict[str, Any], changes: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        with self._lock:
+            item = self.get_item(collection, item_id)
+            if not _matches_expected(item, expected):
+                return None
+            item.update(changes)
+            return self.upsert_item(collection, item)
+
+
+class AppendLogStorage(StorageAdapter):
+    """Local storage that appends every upsert to `<collection>.jsonl`.
+
+    Each collection keeps an in-memory `id -> (offset, length)` index of the latest
+    record, so upserts cost one appended line and `get_item` is a single seek + read.
+    Superseded lines are reclaimed by a background compaction once they make up
+    most of the file. Like `LocalJsonStorage`, this assumes a single process owns
+    the data directory.
+    """
+
+    def __init__(self, root: Path, compaction_min_bytes: int = 1_048_576, compaction_ratio: float = 0.5):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compaction_min_bytes = compaction_min_bytes
+        self.compaction_ratio = compaction_ratio
+        self._lock = threading.RLock()
+        self._indexes: dict[str, dict[str, tuple[int, int]]] = {}
+        self._live_bytes: dict[str, int] = {}
+        self._compacting: set[str] = set()
+
+    def _log_path(self, collection: str) -> Path:
+        return self.root / f"{collection}.jsonl"
+
+    @staticmethod
+    def _encode(item: dict[str, Any]) -> bytes:
+        return json.dumps(item, separators=(",", ":")).encode("utf-8") + b"\n"
+
+    def _seed_from_legacy_json(self, collection: str) -> None:
+        legacy_path = self.root / f"{collection}.json"
+        log_path = self._log_path(collection)
+        if log_path.exists() or not legacy_path.exists():
+            return
+        items = json.loads(legacy_path.read_text(encoding="utf-8"))
+        tmp_path = log_path.with_suffix(".jsonl.tmp")
+        with tmp_path.open("wb") as handle:
+            for item in items:
+                handle.write(self._encode(item))
+        os.replace(tmp_path, log_path)
+
+    def _index(self, collection: str) -> dict[str, tuple[int, int]]:
+        index = self._indexes.get(collection)
+        if index is not None:
+            return index
+
+        self._seed_from_legacy_json(collection)
+        index = {}
+        log_path = self._log_path(collection)
+        if log_path.exists():
+            torn_at = None
+            with log_path.open("rb") as handle:
+                offset = 0
+                for line in handle:
+                    if not line.endswith(b"\n"):
+                        # A crash mid-append leaves an unterminated last line; it was never acknowledged.
+                        torn_at = offset
+                        break
+                    if line.strip():
+                        try:
+                            item_id = json.loads(line).get("id")
+                        except ValueError:
+                            logger.warning("Skipping an unreadable line at byte %s of %s", offset, log_path)
+                            item_id = None
+                        if item_id:
+                            index[item_id] = (offset, len(line))
+                    offset += len(line)
+            if torn_at is not None:
+                logger.warning("Truncating a partial record at byte %s of %s", torn_at, log_path)
+                # Otherwise the next append would be glued onto the partial line.
+                os.truncate(log_path, torn_at)
+        self._indexes[collection] = index
+        self._live_bytes[collection] = sum(length for _, length in index.values())
+        return index
+
+    def _read_at(self, collection: str, offset: int, length: int) -> dict[str, Any]:
+        with self._log_path(collection).open("rb") as handle:
+            handle.seek(offset)
+            return json.loads(handle.read(length))
+
+    @staticmethod
+    def _matches(item: dict[str, Any], filters: dict[str, Any] | None) -> bool:
+        return all(item.get(key) == value for key, value in (filters or {}).items())
+
+    def list_items(
+        self,
+        collection: str,
+        filters: dict[str, Any] | None = None,
+        *,
+        limit: int | None = None,
+        order_by: str | None = None,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        with self._lock:
+            positions = sorted(self._index(collection).values())
+            if not positions:
+                return []
+            with self._log_path(collection).open("rb") as handle:
+                items = []
+                for offset, length in positions:
+                    handle.seek(offset)
+                    items.append(json.loads(handle.read(length)))
+        # Log order moves every updated record to the end; list in creation order like the other adapters.
+        items = sorted(
+            (item for item in items if self._matches(item, filters)),
+            key=lambda item: (item.get("created_at") or "", item.get("id") or ""),
+        )
+        return [project_item(item, fields) for item in paginate_in_memory(items, limit, order_by, cursor)]
+
+    def get_item(
+        self,
+        collection: str,
+        item_id: str,
+        filters: dict[str, Any] | None = None,
+        fields: list[str] | None = None,
+    ) -> dict[str, Any] | None:
+        with self._lock:
+            position = self._index(collection).get(item_id)
+            if position is None:
+                return None
+            item = self._read_at(collection, *position)
+        return project_item(item, fields) if self._matches(item, filters) else None
+
+    def upsert_item(self, collection: str, item: dict[str, Any]) -> dict[str, Any]:
+        strip_derived_fields(item)
+        timestamp = utc_now().isoformat()
+        with self._lock:
+            index = self._index(collection)
+            if not item.get("id"):
+                item["id"] = str(uuid.uuid4())
+                item["created_at"] = timestamp
+            item["updated_at"] = timestamp
+
+            previous = index.get(item["id"])
+            if previous is not None:
+                item["created_at"] = self._read_at(collection, *previous).get("created_at", timestamp)
+                self._live_bytes[collection] -= previous[1]
+
+            line = self._encode(item)
+            log_path = self._log_path(collection)
+            with log_path.open("ab") as handle:
+                offset = handle.tell()
+                handle.write(line)
+            index[item["id"]] = (offset, len(line))
+            self._live_bytes[collection] += len(line)
+            self._maybe_schedule_compaction(collection, offset + len(line))
+        return item
+
+    def update_item_if(
+        self, collection: str, item_id: str, expected: dict[str, Any], changes: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        with self._lock:
+            item = self.get_item(collection, item_id)
+            if not _matches_expected(item, expected):
+                return None
+            item.update(changes)
+            return self.upsert_item(collection, item)
+
+    def _maybe_schedule_compaction(self, collection: str, file_size: int) -> None:
+        if collection in self._compacting or file_size < self.compaction_min_bytes:
+            return
+        dead_bytes = file_size - self._live_bytes[collection]
+        if dead_bytes < file_size * self.compaction_ratio:
+            return
+        self._compacting.add(collection)
+        threading.Thread(
+            target=self._compact, args=(collection,), name=f"compact-{collection}", daemon=True
+        ).start()
+
+    def _compact(self, collection: str) -> None:
+        log_path = self._log_path(collection)
+        tmp_path = log_path.with_suffix(".jsonl.compact")
+        try:
+            with self._lock:
+                snapshot = sorted(self._index(collection).items(), key=lambda entry: entry[1][0])
+                snapshot_end = log_path.stat().st_size
+
+            # The log is append-only, so snapshot offsets stay valid while writers keep appending.
+            new_index: dict[str, tuple[int, int]] = {}
+            with log_path.open("rb") as source, tmp_path.open("wb") as target:
+                for item_id, (offset, length) in snapshot:
+                    source.seek(offset)
+                    new_index[item_id] = (target.tell(), length)
+                    target.write(source.read(length))
+
+            with self._lock:
+                with log_path.open("rb") as source, tmp_path.open("ab") as target:
+                    source.seek(snapshot_end)
+                    for line in source:
+                        if line.strip():
+                            new_index[json.loads(line)["id"]] = (target.tell(), len(line))
+                        target.write(line)
+                    target.flush()
+                    os.fsync(target.fileno())
+                os.replace(tmp_path, log_path)
+                self._indexes[collection] = new_index
+                self._live_bytes[collection] = sum(length for _, length in new_index.values())
+        except Exception:  # pragma: no cover - depends on filesystem state
+            logger.exception("Compaction of %s failed", collection)
+            tmp_path.unlink(missing_ok=True)
+        finally:
+            with self._lock:
+                self._compacting.discard(collection)
+
+
+class SqliteStorage(StorageAdapter):
+    indexed_columns = ("owner_user_id", "study_id", "created_at", "updated_at")
+    _collection_pattern = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._known_tables: set[str] = set()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=30000")
+            self._local.connection = connection
+        return connection
+
+    def _table(self, collection: str) -> str:
+        if not self._collection_pattern.match(collection):
+            raise ValueError(f"Invalid collection name: {collection}")
+        if collection in self._known_tables:
+            return collection
+
+        connection = self._connection()
+        connection.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {collection} (
+                id TEXT PRIMARY KEY,
+                owner_user_id TEXT,
+                study_id TEXT,
+                created_at TEXT,
+                updated_at TEXT,
+                data TEXT NOT NULL
+            )
+            """
+        )
+        connection.execute(f"CREATE INDEX IF NOT EXISTS idx_{collection}_owner_user_id ON {collection}(owner_user_id)")
+        connection.execute(f"CREATE INDEX IF NOT EXISTS idx_{collection}_study_id ON {collection}(study_id)")
+        self._known_tables.add(collection)
+        return collection
+
+    def _select(self, fields: list[str] | None) -> str:
+        if fields is None:
+            return "data"
+        parts = []
+        for field in fields:
+            if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", field):
+                raise ValueError(f"Invalid projection field: {field}")
+            source = DERIVED_FIELDS.get(field)
+            if field == "id" or field in self.indexed_columns:
+                expression = field
+            elif source == "responses":
+                expression = f"json_array_length(data, '$.{source}')"
+            elif source is not None:
+                expression = f"length(json_extract(data, '$.{source}'))"
+            else:
+                expression = f"data -> '$.{field}'"
+            parts.append(f"'{field}', {expression}")
+        return f"json_object({', '.join(parts)})"
+
+    def _where(self, filters: dict[str, Any] | None) -> tuple[list[str], list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        for key, value in (filters or {}).items():
+            if key == "id" or key in self.indexed_columns:
+                column = key
+            elif re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", key):
+                column = f"json_extract(data, '$.{key}')"
+            else:
+                raise ValueError(f"Invalid filter field: {key}")
+            if value is None:
+                clauses.append(f"{column} IS NULL")
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return clauses, params
+
+    def list_items(
+        self,
+        collection: str,
+        filters: dict[str, Any] | None = None,
+        *,
+        limit: int | None = None,
+        order_by: str | None = None,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        table = self._table(collection)
+        clauses, params = self._where(filters)
+        order_sql = "rowid"
+        if limit is not None or order_by is not None or cursor is not None:
+            field, descending = parse_order_by(order_by)
+            direction, comparison = ("DESC", "<") if descending else ("ASC", ">")
+            if cursor:
+                value, last_id = decode_cursor(cursor)
+                clauses.append(f"(COALESCE({field}, '') {comparison} ? OR (COALESCE({field}, '') = ? AND id {comparison} ?))")
+                params.extend([value, value, last_id])
+            order_sql = f"COALESCE({field}, '') {direction}, id {direction}"
+
+        sql = f"SELECT {self._select(fields)} FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_sql}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self._connection().execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_item(
+        self,
+        collection: str,
+        item_id: str,
+        filters: dict[str, Any] | None = None,
+        fields: list[str] | None = None,
+    ) -> dict[str, Any] | None:
+        table = self._table(collection)
+        clauses, params = self._where({**(filters or {}), "id": item_id})
+        row = self._connection().execute(
+            f"SELECT {self._select(fields)} FROM {table} WHERE {' AND '.join(clauses)} LIMIT 1", params
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def upsert_item(self, collection: str, item: dict[str, Any]) -> dict[str, Any]:
+        strip_derived_fields(item)
+        table = self._table(collection)
+        connection = self._connection()
+        timestamp = utc_now().isoformat()
+        if not item.get("id"):
+            item["id"] = str(uuid.uuid4())
+            item["created_at"] = timestamp
+        item["updated_at"] = timestamp
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(f"SELECT created_at FROM {table} WHERE id = ?", (item["id"],)).fetchone()
+            if row:
+                item["created_at"] = row[0] or timestamp
+            item.setdefault("created_at", timestamp)
+            connection.execute(
+                f"""
+                INSERT INTO {table} (id, owner_user_id, study_id, created_at, updated_at, data)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    owner_user_id = excluded.owner_user_id,
+                    study_id = excluded.study_id,
+                    created_at = excluded.created_at,
+                    updated_at = excluded.updated_at,
+                    data = excluded.data
+                """,
+                (
+                    item["id"],
+                    item.get("owner_user_id"),
+                    item.get("study_id"),
+                    item["created_at"],
+                    item["updated_at"],
+                    json.dumps(item),
+                ),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return item
+
+    def update_item_if(
+        self, collection: str, item_id: str, expected: dict[str, Any], changes: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        strip_derived_fields(changes)
+        table = self._table(collection)
+        connection = self._connection()
+        # BEGIN IMMEDIATE takes the database write lock, so the check and the write are atomic across processes.
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(f"SELECT data FROM {table} WHERE id = ?", (item_id,)).fetchone()
+            item = json.loads(row[0]) if row else None
+            if not _matches_expected(item, expected):
+                connection.execute("ROLLBACK")
+                return None
+            item.update(changes)
+            item["updated_at"] = utc_now().isoformat()
+            connection.execute(
+                f"UPDATE {table} SET owner_user_id = ?, study_id = ?, updated_at = ?, data = ? WHERE id = ?",
+                (item.get("owner_user_id"), item.get("study_id"), item["updated_at"], json.dumps(item), item_id),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
         return item
 
 
@@ -100,11 +651,32 @@ class SupabaseStorage(StorageAdapter):
             logger.exception("Supabase %s failed", operation)
             raise SupabaseOperationError(f"Supabase {operation} failed.") from exc
 
-    def list_items(self, collection: str, filters: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    def list_items(
+        self,
+        collection: str,
+        filters: dict[str, Any] | None = None,
+        *,
+        limit: int | None = None,
+        order_by: str | None = None,
+        cursor: str | None = None,
+        fields: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        paginate = limit is not None or order_by is not None or cursor is not None
+        field, descending = parse_order_by(order_by) if paginate else ("created_at", False)
+        position = decode_cursor(cursor) if cursor else None
+
         def run_query():
-            query = self.client.table(collection).select("*")
+            query = self.client.table(collection).select(",".join(fields) if fields else "*")
             for key, value in (filters or {}).items():
                 query = query.eq(key, value)
+            if position is not None:
+                value, last_id = (postgrest_quote(part) for part in position)
+                op = "lt" if descending else "gt"
+                query = query.or_(f"{field}.{op}.{value},and({field}.eq.{value},id.{op}.{last_id})")
+            if paginate:
+                query = query.order(field, desc=descending).order("id", desc=descending)
+            if limit is not None:
+                query = query.range(0, limit - 1)
             return query.execute()
 
         response = self._safe_execute(
@@ -113,9 +685,15 @@ class SupabaseStorage(StorageAdapter):
         )
         return response.data or []
 
-    def get_item(self, collection: str, item_id: str, filters: dict[str, Any] | None = None) -> dict[str, Any] | None:
+    def get_item(
+        self,
+        collection: str,
+        item_id: str,
+        filters: dict[str, Any] | None = None,
+        fields: list[str] | None = None,
+    ) -> dict[str, Any] | None:
         def run_query():
-            query = self.client.table(collection).select("*").eq("id", item_id)
+            query = self.client.table(collection).select(",".join(fields) if fields else "*").eq("id", item_id)
             for key, value in (filters or {}).items():
                 query = query.eq(key, value)
             return query.limit(1).execute()
@@ -128,6 +706,7 @@ class SupabaseStorage(StorageAdapter):
         return rows[0] if rows else None
 
     def upsert_item(self, collection: str, item: dict[str, Any]) -> dict[str, Any]:
+        strip_derived_fields(item)
         timestamp = utc_now().isoformat()
         if not item.get("id"):
             item["id"] = str(uuid.uuid4())
@@ -140,6 +719,22 @@ class SupabaseStorage(StorageAdapter):
         rows = response.data or []
         return rows[0] if rows else item
 
+    def update_item_if(
+        self, collection: str, item_id: str, expected: dict[str, Any], changes: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        strip_derived_fields(changes)
+
+        def run_query():
+            # One conditional UPDATE: Postgres checks `expected` and writes under the row lock.
+            query = self.client.table(collection).update(changes).eq("id", item_id)
+            for key, value in expected.items():
+                query = query.is_(key, "null") if value is None else query.eq(key, value)
+            return query.execute()
+
+        response = self._safe_execute(run_query, f"update_item_if({collection})")
+        rows = response.data or []
+        return rows[0] if rows else None
+
 
 _supabase_admin_client_singleton: Client | None = None
 _supabase_auth_client_singleton: Client | None = None
@@ -186,5 +781,13 @@ def get_storage() -> StorageAdapter:
         _storage_singleton = SupabaseStorage(get_supabase_admin_client())
         return _storage_singleton
 
+    if settings.storage_backend.lower() == "sqlite":
+        _storage_singleton = SqliteStorage(settings.sqlite_path)
+        return _storage_singleton
+
+    if settings.storage_backend.lower() == "local_log":
+        _storage_singleton = AppendLogStorage(settings.local_storage_root)
+        return _storage_singleton
+
     _storage_singleton = LocalJsonStorage(settings.local_storage_root)
     return _storage_singleton
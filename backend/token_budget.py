@@ -0,0 +1,249 @@
+import logging
+import math
+import os
+import re
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+from backend.settings import settings
+
+try:
+    import tiktoken
+except Exception:  # pragma: no cover - optional until installed/configured
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Longest prefix wins, so dated snapshots ("gpt-4o-mini-2024-07-18") resolve to their family.
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16_385,
+    "gpt-4": 8_192,
+    "gpt-4-32k": 32_768,
+    "gpt-4-turbo": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4o-mini": 128_000,
+    "gpt-4.1": 1_047_576,
+    "gpt-4.1-mini": 1_047_576,
+    "gpt-4.1-nano": 1_047_576,
+    "o1": 200_000,
+    "o3": 200_000,
+    "o4-mini": 200_000,
+}
+DEFAULT_CONTEXT_WINDOW = 16_385
+DEFAULT_ENCODING = "cl100k_base"
+O200K_PREFIXES = ("gpt-4o", "gpt-4.1", "o1", "o3", "o4")
+
+# Chat framing overhead per message and for priming the reply, as documented for the chat completions API.
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+TRUNCATION_MARKER = "\n[... truncated to fit the model context ...]"
+
+# Offline estimate used when tiktoken or its BPE files are unavailable: split like the
+# GPT pre-tokenizer and charge one token per ~4 ASCII characters of each piece. The
+# estimate must never undercount, or prompts overflow the context window: non-ASCII
+# characters (CJK, Cyrillic, accented letters, emoji) often cost a token or more each,
+# so each is charged a full token, and the total carries a safety margin on top.
+_PIECE_PATTERN = re.compile(r"\s?[^\W\d_]+|\s?\d{1,3}|\s?[^\s\w]+|\s+(?!\S)|\s+")
+_HEURISTIC_CHARS_PER_TOKEN = 4
+_HEURISTIC_SAFETY_MARGIN = 1.25
+# Generous upper bound for prose, used to stop extracting source text that could never reach a prompt.
+MAX_CHARS_PER_TOKEN = 8
+
+
+def context_window(model: str) -> int:
+    matches = [prefix for prefix in MODEL_CONTEXT_WINDOWS if model.startswith(prefix)]
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)] if matches else DEFAULT_CONTEXT_WINDOW
+
+
+def source_char_budget(model: str, completion_tokens: int) -> int:
+    """Most characters of source text worth extracting for one prompt; fit_messages makes the exact cut."""
+    return max(0, context_window(model) - completion_tokens) * MAX_CHARS_PER_TOKEN
+
+
+def _encoding_name(model: str) -> str:
+    return "o200k_base" if model.startswith(O200K_PREFIXES) else DEFAULT_ENCODING
+
+
+@lru_cache(maxsize=8)
+def _load_encoding(name: str) -> Any:
+    if tiktoken is None:
+        return None
+    if settings.tiktoken_cache_dir:
+        os.environ.setdefault("TIKTOKEN_CACHE_DIR", str(settings.tiktoken_cache_dir))
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception:
+        # Not in the local cache and no network: fall back to the estimate instead of failing the request.
+        logger.warning("tiktoken encoding %s is unavailable; using the offline token estimate.", name)
+        return None
+
+
+def warm_tokenizers() -> None:
+    """Download the BPE files into TIKTOKEN_CACHE_DIR so counting works offline at runtime."""
+    for name in {DEFAULT_ENCODING, "o200k_base"}:
+        _load_encoding(name)
+
+
+def _pieces(text: str) -> list[str]:
+    return _PIECE_PATTERN.findall(text)
+
+
+def _piece_tokens(piece: str) -> int:
+    # A single leading space merges into the following word, as it does in the real vocabularies.
+    body = piece[1:] if len(piece) > 1 and piece[0] == " " and not piece[1].isspace() else piece
+    non_ascii = sum(1 for char in body if not char.isascii())
+    return max(1, non_ascii + math.ceil((len(body) - non_ascii) / _HEURISTIC_CHARS_PER_TOKEN))
+
+
+def _piece_prefix(piece: str, max_tokens: int) -> str:
+    # Unspaced scripts (CJK, Thai) form one long piece, so cut inside it rather than dropping it whole.
+    start = 1 if len(piece) > 1 and piece[0] == " " and not piece[1].isspace() else 0
+    ascii_chars = non_ascii = 0
+    end = start
+    for char in piece[start:]:
+        if char.isascii():
+            ascii_chars += 1
+        else:
+            non_ascii += 1
+        if non_ascii + math.ceil(ascii_chars / _HEURISTIC_CHARS_PER_TOKEN) > max_tokens:
+            break
+        end += 1
+    return piece[:end] if end > start else ""
+
+
+class Tokenizer:
+    def __init__(self, model: str):
+        self.model = model
+        self.encoding = _load_encoding(_encoding_name(model))
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return math.ceil(sum(_piece_tokens(piece) for piece in _pieces(text)) * _HEURISTIC_SAFETY_MARGIN)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else self.encoding.decode(tokens[:max_tokens])
+        kept: list[str] = []
+        used = 0
+        budget = max_tokens / _HEURISTIC_SAFETY_MARGIN
+        for piece in _pieces(text):
+            cost = _piece_tokens(piece)
+            if used + cost > budget:
+                kept.append(_piece_prefix(piece, math.floor(budget - used)))
+                break
+            kept.append(piece)
+            used += cost
+        return "".join(kept)
+
+    def split(self, text: str, max_tokens: int) -> list[str]:
+        """Cut `text` into consecutive windows of at most `max_tokens` tokens that concatenate back to `text`.
+
+        Windows are sliced from the text itself at token start offsets, never decoded
+        from partial token lists, so multi-byte characters split across tokens do not
+        shift later windows.
+        """
+        if not text:
+            return []
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            decoded, offsets = self.encoding.decode_with_offsets(tokens)
+            bounds = sorted({offsets[index] for index in range(0, len(tokens), max(1, max_tokens))} | {0, len(decoded)})
+            return [decoded[start:end] for start, end in zip(bounds, bounds[1:]) if end > start]
+        windows = []
+        remainder = text
+        while remainder:
+            # The offline truncation keeps whole characters of the original text, so it slices exactly.
+            window = self.truncate(remainder, max_tokens) or remainder[:1]
+            windows.append(window)
+            remainder = remainder[len(window):]
+        return windows
+
+    def count_messages(self, messages: list[dict[str, str]]) -> int:
+        return sum(TOKENS_PER_MESSAGE + self.count(message.get("content") or "") for message in messages) + TOKENS_PER_REPLY
+
+
+def allocate(budget: int, demands: dict[str, int]) -> dict[str, int]:
+    """Water-fill `budget` across sections: short sections keep everything, long ones share the rest evenly."""
+    allocation: dict[str, int] = {}
+    remaining = max(0, budget)
+    pending = sorted(demands, key=demands.get)
+    while pending:
+        share = remaining // len(pending)
+        name = pending[0]
+        if demands[name] <= share:
+            allocation[name] = demands[name]
+            remaining -= demands[name]
+            pending.pop(0)
+            continue
+        for name in pending:
+            allocation[name] = share
+        break
+    return allocation
+
+
+def fit_messages(
+    model: str,
+    build_messages: Callable[[dict[str, str]], list[dict[str, str]]],
+    sections: dict[str, str],
+    completion_tokens: int,
+) -> tuple[list[dict[str, str]], dict[str, Any]]:
+    """Build chat messages whose variable `sections` are truncated to fit the model's context window.
+
+    `build_messages` renders the full prompt from section texts; it is first rendered with empty
+    sections to measure the fixed instructions, and the remaining budget is shared across sections.
+    Returns the messages and a report of the budget and any truncation applied.
+    """
+    tokenizer = Tokenizer(model)
+    window = context_window(model)
+    fixed_tokens = tokenizer.count_messages(build_messages({name: "" for name in sections}))
+    available = window - completion_tokens - fixed_tokens
+
+    demands = {name: tokenizer.count(text) for name, text in sections.items()}
+    allocation = allocate(available, demands)
+    marker_tokens = tokenizer.count(TRUNCATION_MARKER)
+
+    fitted: dict[str, str] = {}
+    section_report: dict[str, dict[str, Any]] = {}
+    for name, text in sections.items():
+        truncated = demands[name] > allocation[name]
+        if truncated:
+            kept = tokenizer.truncate(text, allocation[name] - marker_tokens)
+            fitted[name] = kept + TRUNCATION_MARKER if kept else ""
+        else:
+            fitted[name] = text
+        section_report[name] = {
+            "tokens": demands[name],
+            "kept_tokens": tokenizer.count(fitted[name]),
+            "truncated": truncated,
+        }
+
+    messages = build_messages(fitted)
+    report = {
+        "model": model,
+        "exact": tokenizer.exact,
+        "context_window": window,
+        "completion_tokens": completion_tokens,
+        "instruction_tokens": fixed_tokens,
+        "prompt_tokens": tokenizer.count_messages(messages),
+        "sections": section_report,
+    }
+    dropped = {name: info for name, info in section_report.items() if info["truncated"]}
+    if dropped:
+        logger.info(
+            "Prompt for %s truncated to fit %s tokens: %s",
+            model,
+            window,
+            ", ".join(f"{name} {info['kept_tokens']}/{info['tokens']}" for name, info in dropped.items()),
+        )
+    return messages, report
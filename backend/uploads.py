@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import UploadFile
+
+from backend.errors import UploadTooLargeError
+from backend.settings import settings
+
+SPOOL_CHUNK_BYTES = 1024 * 1024
+# Multipart boundaries and part headers on top of the file itself when checking Content-Length.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class SpooledUpload:
+    filename: str
+    content_type: str
+    file: BinaryIO
+    size: int
+    sha256: str
+
+
+def _measure(source: BinaryIO, max_bytes: int) -> tuple[int, str]:
+    digest = hashlib.sha256()
+    size = 0
+    source.seek(0)
+    while chunk := source.read(SPOOL_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        digest.update(chunk)
+    source.seek(0)
+    return size, digest.hexdigest()
+
+
+def copy_upload_to_path(upload: SpooledUpload) -> Path:
+    """Copy an upload to a named temp file in UPLOAD_SPOOL_DIR, for parsers that can only open it by path.
+
+    Starlette's spooled file has no name a worker process could open, and PyMuPDF reads a
+    handle whole into memory; a path lets it load pages lazily. The caller removes the file.
+    """
+    directory = settings.upload_spool_dir
+    if directory is not None:
+        directory.mkdir(parents=True, exist_ok=True)
+    upload.file.seek(0)
+    handle = tempfile.NamedTemporaryFile(prefix="upload-", dir=directory, delete=False)
+    try:
+        with handle:
+            shutil.copyfileobj(upload.file, handle, SPOOL_CHUNK_BYTES)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+    finally:
+        upload.file.seek(0)
+    return Path(handle.name)
+
+
+@asynccontextmanager
+async def spooled_upload(file: UploadFile, max_bytes: int | None = None) -> AsyncIterator[SpooledUpload]:
+    """Hash and size-check an upload in chunks, straight from the file Starlette already spooled it to.
+
+    The document is neither held in memory whole nor written out again; parsers read the rewound handle.
+    """
+    limit = settings.upload_max_bytes if max_bytes is None else max_bytes
+    if file.size is not None and file.size > limit:
+        raise UploadTooLargeError(limit)
+    size, sha256 = await asyncio.to_thread(_measure, file.file, limit)
+    yield SpooledUpload(file.filename or "upload", file.content_type or "", file.file, size, sha256)
+
+
+def declared_upload_too_large(content_length: str | None) -> bool:
+    """True when a request's Content-Length already rules it out, so the body need not be read at all."""
+    try:
+        return content_length is not None and int(content_length) > settings.upload_max_bytes + MULTIPART_OVERHEAD_BYTES
+    except ValueError:
+        return False
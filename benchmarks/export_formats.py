@@ -0,0 +1,75 @@
+"""
+Time each export format, and export_all_formats sequentially versus in parallel.
+
+Generates synthetic interviews of 10, 100 and 1000 question/answer pairs and
+reports, per size:
+
+- the render time of every format on its own (scripts.export_results.render_export)
+- sequential: export_all_formats as called by default, one format after another
+- parallel: export_all_formats(parallel=True), DOCX and PDF rendered in the
+  shared export pool (EXPORT_WORKERS, EXPORT_EXECUTOR)
+
+    EXPORT_WORKERS=2 python -m benchmarks.export_formats --pairs 10 100 1000
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.pdf_extraction import PARAGRAPH, timed  # noqa: E402
+from backend.exports import shutdown_render_pool  # noqa: E402
+from scripts.export_results import EXPORT_MEDIA_TYPES, export_all_formats, render_export  # noqa: E402
+
+
+def build_interview(pairs):
+    """
+    Build `pairs` simulated question/answer records, answers of varying length.
+    """
+    return [
+        {
+            "question": f"Question {number + 1}: how did the pilot change your week?",
+            "answer": " ".join([PARAGRAPH] * (1 + number % 4)),
+        }
+        for number in range(pairs)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    formats = list(EXPORT_MEDIA_TYPES)
+    with tempfile.TemporaryDirectory() as workdir:
+        # Start the render workers before timing so the parallel column measures rendering, not spawn.
+        warmup = Path(workdir) / "warmup.json"
+        warmup.write_text(json.dumps(build_interview(1)), encoding="utf-8")
+        export_all_formats(str(warmup), "warmup", output_dir=workdir, parallel=True)
+
+        print(f"{'pairs':>6} " + " ".join(f"{name:>8}" for name in formats) + f" {'sequential':>11} {'parallel':>9} {'speedup':>8}")
+        for pairs in args.pairs:
+            data = build_interview(pairs)
+            renders = [timed(render_export, data, file_type, repeat=args.repeat)[0] for file_type in formats]
+            source = Path(workdir) / f"interview_{pairs}.json"
+            source.write_text(json.dumps(data), encoding="utf-8")
+            sequential, _ = timed(
+                export_all_formats, str(source), source.stem, output_dir=workdir, repeat=args.repeat
+            )
+            parallel, _ = timed(
+                export_all_formats, str(source), source.stem, output_dir=workdir, parallel=True,
+                repeat=args.repeat,
+            )
+            print(
+                f"{pairs:>6} " + " ".join(f"{seconds:7.2f}s" for seconds in renders)
+                + f" {sequential:10.2f}s {parallel:8.2f}s {sequential / parallel:7.1f}x"
+            )
+    shutdown_render_pool()
+
+
+if __name__ == "__main__":
+    main()
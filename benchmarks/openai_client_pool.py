@@ -0,0 +1,99 @@
+"""
+Measure the per-call connection cost removed by the shared OpenAI client.
+
+Runs a local fake chat-completions server that counts TCP connections and
+sleeps on every new connection to stand in for the TCP + TLS handshake, then
+compares building a fresh `openai.OpenAI` per call (the old call-site pattern)
+against `backend.openai_client.get_openai_client()`.
+
+    python -m benchmarks.openai_client_pool --calls 50 --handshake-ms 80
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-3.5-turbo",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+}
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    handshake_seconds = 0.0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with FakeOpenAIHandler.lock:
+            FakeOpenAIHandler.connections += 1
+        time.sleep(self.handshake_seconds)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(COMPLETION).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_calls(get_client, calls):
+    from backend.llm import chat_completion
+
+    FakeOpenAIHandler.connections = 0
+    started = time.perf_counter()
+    for _ in range(calls):
+        client = get_client()
+        chat_completion(client, cache=False, model="gpt-3.5-turbo", messages=[{"role": "user", "content": "hi"}])
+    elapsed = time.perf_counter() - started
+    return elapsed, FakeOpenAIHandler.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--handshake-ms", type=float, default=80.0)
+    args = parser.parse_args()
+
+    FakeOpenAIHandler.handshake_seconds = args.handshake_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    import openai
+    from backend.openai_client import close_openai_client, get_openai_client
+
+    def fresh_client():
+        return openai.OpenAI(api_key=os.environ["OPENAI_API_KEY"], base_url=base_url)
+
+    print(f"{args.calls} calls, {args.handshake_ms:.0f} ms simulated handshake per new connection")
+    for label, factory in (("client per call", fresh_client), ("shared client", get_openai_client)):
+        elapsed, connections = run_calls(factory, args.calls)
+        print(f"{label:>16}: {elapsed * 1000 / args.calls:7.1f} ms/call  {connections:4d} connection(s)  {elapsed:6.2f} s total")
+
+    close_openai_client()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -137,6 +137,73 @@ async function callApi(path, options = {}) {
   return data;
 }
 
+async function waitForJob(job, onProgress = () => {}) {
+  let current = job;
+  while (current.status === "queued" || current.status === "running") {
+    onProgress(current);
+    await new Promise((resolve) => setTimeout(resolve, 1500));
+    current = await callApi(`/api/jobs/${current.id}`);
+  }
+  if (current.status !== "succeeded") {
+    throw new Error(current.error || "Job failed.");
+  }
+  return current;
+}
+
+function streamSimulation(simulationId, onUpdate = () => {}) {
+  const answers = new Map();
+  let total = 0;
+  let questions = [];
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`/api/simulations/${simulationId}/stream`);
+    const parse = (event) => JSON.parse(event.data);
+    source.addEventListener("status", (event) => {
+      const data = parse(event);
+      total = data.total || total;
+      questions = data.questions || questions;
+      onUpdate({ answers, total });
+    });
+    source.addEventListener("token", (event) => {
+      const { index, text } = parse(event);
+      const current = answers.get(index) || { question: questions[index] || "", answer: "", streaming: true };
+      if (!current.streaming) return;
+      current.answer += text;
+      answers.set(index, current);
+      onUpdate({ answers, total });
+    });
+    source.addEventListener("answer", (event) => {
+      const data = parse(event);
+      total = data.total || total;
+      answers.set(data.index, { question: data.question, answer: data.answer, streaming: false });
+      onUpdate({ answers, total });
+    });
+    source.addEventListener("done", (event) => {
+      source.close();
+      const data = parse(event);
+      if (data.status === "completed") resolve({ answers, total });
+      else reject(new Error(data.error || "Simulation stopped before all questions were answered."));
+    });
+    source.onerror = () => {
+      // EventSource reconnects on its own; only give up once the browser has closed the stream.
+      if (source.readyState === EventSource.CLOSED) reject(new Error("Lost connection to the simulation stream."));
+    };
+  });
+}
+
+function describeSimulationStream({ answers, total }) {
+  const finished = [...answers.values()].filter((item) => !item.streaming).length;
+  const lines = [`Simulation: ${finished}/${total || "?"} answered`];
+  [...answers.entries()]
+    .sort(([left], [right]) => left - right)
+    .forEach(([, item]) => lines.push("", `Q: ${item.question || "..."}`, `A: ${item.answer}`));
+  return lines.join("\n");
+}
+
+function describeJobProgress(job, label) {
+  const { completed = 0, total = 0 } = job.progress || {};
+  return total ? `${label}: ${completed}/${total} complete...` : `${label}: ${job.status}...`;
+}
+
 async function loadAuthSession() {
   try {
     const session = await callApi("/api/auth/session");
@@ -478,8 +545,10 @@ async function loadStudies() {
   }
 }
 
-async function loadCollection(name) {
-  return callApi(scopedPath(`/api/${name}`));
+async function loadCollection(name, params = {}) {
+  const url = new URL(scopedPath(`/api/${name}`), window.location.origin);
+  Object.entries(params).forEach(([key, value]) => url.searchParams.set(key, value));
+  return callApi(`${url.pathname}${url.search}`);
 }
 
 async function initDashboard() {
@@ -487,8 +556,8 @@ async function initDashboard() {
     loadCollection("protocols"),
     loadCollection("personas"),
     loadCollection("question-guides"),
-    loadCollection("transcripts"),
-    loadCollection("simulations"),
+    loadCollection("transcripts", { view: "summary" }),
+    loadCollection("simulations", { view: "summary" }),
     loadCollection("comparisons"),
   ]);
 
@@ -1095,13 +1164,33 @@ async function initSimulations() {
   const list = document.getElementById("simulation-list");
 
   async function refresh() {
-    const simulations = await loadCollection("simulations");
+    const simulations = await loadCollection("simulations", { view: "summary" });
     renderResourceCards(list, simulations, (simulation) => {
+      const status = simulation.status || "completed";
       const card = resourceCard(
         `Simulation ${simulation.id.slice(0, 8)}`,
-        `${simulation.responses.length} response(s) captured`,
-        [formatDate(simulation.created_at)],
+        `${simulation.response_count ?? 0} response(s) captured`,
+        status === "completed" ? [formatDate(simulation.created_at)] : [formatDate(simulation.created_at), status.replace("_", " ")],
       );
+      if (status === "partial") {
+        const resumeButton = el("button", {
+          className: "button button--secondary",
+          text: "Resume missing questions",
+          attrs: { type: "button" },
+        });
+        resumeButton.addEventListener("click", async () => {
+          resumeButton.disabled = true;
+          try {
+            const job = await callApi(`/api/simulations/${simulation.id}/resume`, { method: "POST" });
+            await waitForJob(job, (current) => setNodeContent(output, describeJobProgress(current, "Resume")));
+            setNodeContent(output, "Simulation completed.");
+          } catch (error) {
+            setNodeContent(output, error.message);
+          }
+          await refresh();
+        });
+        card.appendChild(resumeButton);
+      }
       const exportsRow = el("div", { className: "meta-row" });
       ["txt", "docx", "pdf", "html", "csv"].forEach((fileType) => {
         exportsRow.appendChild(
@@ -1121,19 +1210,22 @@ async function initSimulations() {
     event.preventDefault();
     const formData = new FormData(form);
     try {
-      const result = await callApi("/api/simulations", {
+      const job = await callApi("/api/simulations", {
         method: "POST",
         body: JSON.stringify({
           persona_id: String(formData.get("persona_id") || ""),
           question_guide_id: String(formData.get("question_guide_id") || ""),
           protocol_id: String(formData.get("protocol_id") || "") || null,
           study_id: state.activeStudyId,
+          stream: true,
         }),
       });
-      setNodeContent(output, `Simulation created with ${result.responses.length} responses.`);
+      const streamed = await streamSimulation(job.result_ids[0], (progress) => setNodeContent(output, describeSimulationStream(progress)));
+      setNodeContent(output, `Simulation created with ${streamed.answers.size} responses.\n${describeSimulationStream(streamed).split("\n").slice(1).join("\n")}`);
       await refresh();
     } catch (error) {
       setNodeContent(output, error.message);
+      await refresh();
     }
   });
 
@@ -1188,8 +1280,8 @@ function renderComparisonReport(container, payload) {
 async function initComparisons() {
   if (requireActiveStudy("comparison-list", "Select a study before generating or viewing comparisons.")) return;
   const [transcripts, simulations, protocols] = await Promise.all([
-    loadCollection("transcripts"),
-    loadCollection("simulations"),
+    loadCollection("transcripts", { view: "summary" }),
+    loadCollection("simulations", { view: "summary" }),
     loadCollection("protocols"),
   ]);
 
@@ -1218,7 +1310,7 @@ async function initComparisons() {
     event.preventDefault();
     const formData = new FormData(form);
     try {
-      const result = await callApi("/api/comparisons", {
+      const job = await callApi("/api/comparisons", {
         method: "POST",
         body: JSON.stringify({
           transcript_id: String(formData.get("transcript_id") || ""),
@@ -1227,6 +1319,8 @@ async function initComparisons() {
           study_id: state.activeStudyId,
         }),
       });
+      const finished = await waitForJob(job, (current) => setNodeContent(output, describeJobProgress(current, "Comparison")));
+      const result = await callApi(`/api/comparisons/${finished.result_ids[0]}`);
       setNodeContent(output, "Comparison generated successfully.");
       renderComparisonReport(report, result.payload);
       await refresh();
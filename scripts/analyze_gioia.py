@@ -1,29 +1,38 @@
-import openai
+import asyncio
 import os
 import json
-from config import get_secret
+from backend.llm import achat_completion
+from backend.openai_client import get_async_openai_client
+from backend.token_budget import Tokenizer
+from scripts.simulate_interviews import run_coroutine_sync
 
 
-def analyze_gioia(interview_json_path, output_path, settings=None):
+DEFAULT_CHUNK_TOKENS = 3000
+DEFAULT_MERGE_TOKENS = 8000
+DEFAULT_ANALYSIS_CONCURRENCY = 8
+CONCEPT_LIST_MAX_TOKENS = 900
+
+SYSTEM_PROMPT = (
+    "You are an expert qualitative researcher. "
+    "Write with methodological clarity and avoid empty repetition."
+)
+
+
+def format_interview(interview_data):
     """
-    Analyze interview data using Gioia methodology.
+    Render question/answer pairs as the plain-text interview the prompts expect.
     """
-    settings = settings or {}
+    return "\n".join([f"Q: {item['question']}\nA: {item['answer']}" for item in interview_data])
 
-    # Load interview data
-    with open(interview_json_path, 'r') as f:
-        interview_data = json.load(f)
-    
-    client = openai.OpenAI(api_key=get_secret("OPENAI_API_KEY"))
-    model = settings.get("model", "gpt-3.5-turbo")
-    temperature = settings.get("analysis_temperature", 0.3)
-    max_tokens = settings.get("analysis_max_tokens", 2000)
+
+def build_gioia_instructions(settings):
+    """
+    Build the Gioia instructions for the final analysis from study settings.
+    """
     quote_count = settings.get("quote_count", 3)
     analysis_focus = settings.get("analysis_focus", "").strip()
     coding_depth = settings.get("coding_depth", "Standard")
-    
-    all_text = "\n".join([f"Q: {item['question']}\nA: {item['answer']}" for item in interview_data])
-    
+
     prompt = (
         "You're a qualitative research assistant using the Gioia methodology.\n"
         "Analyze the following interview data and identify:\n"
@@ -34,32 +43,177 @@ def analyze_gioia(interview_json_path, output_path, settings=None):
         f"5. Coding depth preference: {coding_depth}\n"
     )
     if analysis_focus:
-        prompt += f"6. Additional analysis focus: {analysis_focus}\n\n"
-    else:
-        prompt += "\n"
-    prompt += f"Interview Data:\n{all_text}"
-    
-    response = client.chat.completions.create(
-        model=model,
+        prompt += f"6. Additional analysis focus: {analysis_focus}\n"
+    return prompt
+
+
+def chunk_text(text, tokenizer, chunk_tokens):
+    """
+    Split text into chunks of at most `chunk_tokens` tokens, breaking between lines
+    so question/answer turns stay intact wherever they fit.
+
+    The chunks concatenate back to exactly `text`: blank stretches are kept with a
+    neighbouring chunk rather than sent on their own.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for line in text.splitlines(keepends=True):
+        line_tokens = tokenizer.count(line)
+        if line_tokens > chunk_tokens:
+            # A single monologue longer than a chunk is split on token boundaries.
+            if current:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(tokenizer.split(line, chunk_tokens))
+            continue
+        if current and current_tokens + line_tokens > chunk_tokens:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        chunks.append("".join(current))
+
+    merged = []
+    for chunk in chunks:
+        if merged and (not chunk.strip() or not merged[-1].strip()):
+            merged[-1] += chunk
+        else:
+            merged.append(chunk)
+    return merged if any(chunk.strip() for chunk in merged) else []
+
+
+def batch_by_tokens(texts, tokenizer, max_tokens):
+    """
+    Group consecutive texts into batches whose combined size stays under `max_tokens`.
+    """
+    batches, current, current_tokens = [], [], 0
+    for text in texts:
+        tokens = tokenizer.count(text)
+        if current and current_tokens + tokens > max_tokens:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def _complete(client, settings, prompt, max_tokens, system=SYSTEM_PROMPT):
+    # Deterministic-enough calls go through the response cache, so re-running an
+    # analysis only pays for chunks whose text or settings changed.
+    response = await achat_completion(
+        client,
+        model=settings.get("model", "gpt-3.5-turbo"),
         messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are an expert qualitative researcher. "
-                    "Write with methodological clarity and avoid empty repetition."
-                ),
-            },
+            {"role": "system", "content": system},
             {"role": "user", "content": prompt},
         ],
         max_tokens=max_tokens,
-        temperature=temperature
+        temperature=settings.get("analysis_temperature", 0.3),
+    )
+    return response.choices[0].message.content or ""
+
+
+async def code_chunk(client, settings, chunk, index, total, semaphore):
+    """
+    First-order coding of one interview chunk (map step).
+    """
+    quote_count = settings.get("quote_count", 3)
+    analysis_focus = settings.get("analysis_focus", "").strip()
+    prompt = (
+        f"This is part {index + 1} of {total} of one interview.\n"
+        "Do first-order (informant-centric) coding of this part only: list the concepts the participant "
+        "expresses, labelled in the participant's own terms.\n"
+        f"Under each concept give up to {quote_count} short verbatim quotes.\n"
+        "Return a markdown bullet list only, no themes or dimensions yet.\n"
+    )
+    if analysis_focus:
+        prompt += f"Additional analysis focus: {analysis_focus}\n"
+    prompt += f"\nInterview excerpt:\n{chunk}"
+    async with semaphore:
+        return await _complete(client, settings, prompt, CONCEPT_LIST_MAX_TOKENS)
+
+
+async def merge_concepts(client, settings, concept_lists, semaphore):
+    """
+    Consolidate the concept lists of consecutive chunks into one list (intermediate reduce step).
+    """
+    prompt = (
+        "Below are first-order concept lists coded from consecutive parts of one interview.\n"
+        "Consolidate them into one list: merge concepts that mean the same thing, keep the "
+        "participant's wording and the strongest verbatim quotes, and drop nothing substantive.\n"
+        "Return a markdown bullet list only.\n\n"
+        + "\n\n".join(concept_lists)
+    )
+    async with semaphore:
+        return await _complete(client, settings, prompt, CONCEPT_LIST_MAX_TOKENS)
+
+
+async def analyze_gioia_text_async(text, settings=None, instructions=None, client=None):
+    """
+    Gioia analysis of an interview of any length.
+
+    Interviews that fit in one chunk are analyzed in a single call. Longer ones are split
+    into token-sized chunks that are coded in parallel, the concept lists are merged in
+    parallel batches until they fit one prompt, and a final call builds the themes and
+    aggregate dimensions from them.
+    """
+    settings = settings or {}
+    instructions = instructions or build_gioia_instructions(settings)
+    client = client or get_async_openai_client()
+    max_tokens = settings.get("analysis_max_tokens", 2000)
+    tokenizer = Tokenizer(settings.get("model", "gpt-3.5-turbo"))
+    chunk_tokens = settings.get("analysis_chunk_tokens", DEFAULT_CHUNK_TOKENS)
+    merge_tokens = settings.get("analysis_merge_tokens", DEFAULT_MERGE_TOKENS)
+    semaphore = asyncio.Semaphore(settings.get("analysis_concurrency", DEFAULT_ANALYSIS_CONCURRENCY))
+
+    chunks = chunk_text(text, tokenizer, chunk_tokens)
+    if len(chunks) <= 1:
+        return await _complete(client, settings, f"{instructions}\nInterview Data:\n{text}", max_tokens)
+
+    concept_lists = list(
+        await asyncio.gather(*(code_chunk(client, settings, chunk, i, len(chunks), semaphore) for i, chunk in enumerate(chunks)))
+    )
+    batches = batch_by_tokens(concept_lists, tokenizer, merge_tokens)
+    while len(batches) > 1:
+        if all(len(batch) == 1 for batch in batches):
+            # Lists that are each over the merge budget are still merged pairwise so the reduction terminates.
+            batches = [concept_lists[i:i + 2] for i in range(0, len(concept_lists), 2)]
+        concept_lists = list(await asyncio.gather(*(merge_concepts(client, settings, batch, semaphore) for batch in batches)))
+        batches = batch_by_tokens(concept_lists, tokenizer, merge_tokens)
+
+    prompt = (
+        f"{instructions}\n"
+        "The interview was first coded in parts; build the themes and aggregate dimensions from these "
+        "first-order concepts and quotes, which together cover the whole interview.\n\n"
+        "First-order concepts:\n" + "\n\n".join(batches[0])
     )
-    
-    analysis = response.choices[0].message.content
-    
+    return await _complete(client, settings, prompt, max_tokens)
+
+
+def analyze_gioia_text(text, settings=None, instructions=None):
+    """
+    Synchronous wrapper around analyze_gioia_text_async.
+    """
+    return run_coroutine_sync(analyze_gioia_text_async(text, settings=settings, instructions=instructions))
+
+
+def analyze_gioia(interview_json_path, output_path, settings=None):
+    """
+    Analyze interview data using Gioia methodology.
+    """
+    settings = settings or {}
+
+    # Load interview data
+    with open(interview_json_path, 'r') as f:
+        interview_data = json.load(f)
+
+    analysis = analyze_gioia_text(format_interview(interview_data), settings=settings)
+
     # Save analysis
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     with open(output_path, 'w') as f:
         f.write(analysis)
-    
+
     return analysis
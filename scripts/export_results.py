@@ -1,5 +1,6 @@
 import csv
 import html
+import io
 import json
 import os
 
@@ -8,29 +9,75 @@ from fpdf import FPDF
 from fpdf.enums import XPos, YPos
 
 
+TRANSCRIPT_TITLE = "Simulated Interview Transcript"
+
+EXPORT_MEDIA_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+    "csv": "text/csv; charset=utf-8",
+    "txt": "text/plain; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+}
+
+
 def _safe_text(value):
     return str(value or "").replace("\r\n", "\n").replace("\r", "\n")
 
-def export_interview_to_docx(data, docx_path):
-    """Export interview data to DOCX format."""
+
+def iter_csv(data):
+    """Yield the CSV export row by row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(["question", "answer"])
+    yield flush()
+    for item in data:
+        writer.writerow([item.get("question", ""), item.get("answer", "")])
+        yield flush()
+
+
+def iter_txt(data):
+    """Yield the plain text export one question/answer pair at a time."""
+    yield f"{TRANSCRIPT_TITLE}\n\n"
+    for item in data:
+        yield f"Q: {item.get('question', '')}\nA: {item.get('answer', '')}\n\n"
+
+
+def iter_html(data):
+    """Yield the HTML export one question/answer pair at a time."""
+    yield f"<html><head><meta charset='utf-8'><title>{TRANSCRIPT_TITLE}</title></head><body>\n<h1>{TRANSCRIPT_TITLE}</h1>"
+    for item in data:
+        question = html.escape(_safe_text(item.get("question", "")))
+        answer = html.escape(_safe_text(item.get("answer", ""))).replace("\n", "<br>")
+        yield f"\n<h2>Q: {question}</h2>\n<p>{answer}</p>"
+    yield "\n</body></html>"
+
+
+def write_docx(data, stream):
+    """Render the DOCX export into a binary stream."""
     doc = Document()
-    doc.add_heading("Simulated Interview Transcript", level=1)
+    doc.add_heading(TRANSCRIPT_TITLE, level=1)
 
     for item in data:
         doc.add_heading(f"Q: {_safe_text(item.get('question', ''))}", level=2)
         doc.add_paragraph(_safe_text(item.get("answer", "")))
-    
-    os.makedirs(os.path.dirname(docx_path), exist_ok=True)
-    doc.save(docx_path)
-    return docx_path
 
-def export_interview_to_pdf(data, pdf_path):
-    """Export interview data to PDF format."""
+    doc.save(stream)
+
+
+def write_pdf(data, stream):
+    """Render the PDF export into a binary stream."""
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
     pdf.set_font("Helvetica", "B", 16)
-    pdf.cell(0, 10, "Simulated Interview Transcript", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
+    pdf.cell(0, 10, TRANSCRIPT_TITLE, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
     pdf.ln(5)
     pdf.set_font("Helvetica", size=12)
 
@@ -43,64 +90,103 @@ def export_interview_to_pdf(data, pdf_path):
         answer = _safe_text(item.get("answer", "")).encode("latin-1", "replace").decode("latin-1")
         pdf.multi_cell(0, 10, f"A: {answer}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         pdf.ln(4)
-    
-    os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
-    pdf.output(pdf_path)
-    return pdf_path
+
+    stream.write(pdf.output())
+
+
+TEXT_EXPORTERS = {"csv": iter_csv, "txt": iter_txt, "html": iter_html}
+BINARY_EXPORTERS = {"docx": write_docx, "pdf": write_pdf}
+
+
+def _normalize_file_type(file_type):
+    file_type = str(file_type or "").lower()
+    if file_type not in TEXT_EXPORTERS and file_type not in BINARY_EXPORTERS:
+        raise ValueError(f"Unsupported export format: {file_type}")
+    return file_type
+
+
+def _iter_binary(writer, data):
+    buffer = io.BytesIO()
+    writer(data, buffer)
+    yield buffer.getvalue()
+
+
+def iter_export(data, file_type):
+    """
+    Return an iterator of encoded chunks for one export format.
+
+    CSV, TXT and HTML are produced incrementally as rows are rendered; DOCX and
+    PDF are whole-document formats and are rendered into memory, then yielded
+    once. Raises ValueError for an unsupported format before anything renders.
+    """
+    file_type = _normalize_file_type(file_type)
+    if file_type in TEXT_EXPORTERS:
+        return (chunk.encode("utf-8") for chunk in TEXT_EXPORTERS[file_type](data))
+    return _iter_binary(BINARY_EXPORTERS[file_type], data)
+
+
+def render_export(data, file_type):
+    """Render one export format to bytes (picklable, so it can run in a worker process)."""
+    return b"".join(iter_export(data, file_type))
+
+
+def write_export(data, file_type, stream):
+    """Write one export format into a binary stream."""
+    for chunk in iter_export(data, file_type):
+        stream.write(chunk)
+
+
+def export_data(data, output_basename, file_type, output_dir="outputs"):
+    """Export in-memory interview data to a single format on disk."""
+    file_type = _normalize_file_type(file_type)
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"{output_basename}.{file_type}")
+    with open(output_path, "wb") as f:
+        write_export(data, file_type, f)
+    return output_path
+
+
+def _export_to_path(data, path, file_type):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        write_export(data, file_type, f)
+    return path
+
+
+def export_interview_to_docx(data, docx_path):
+    """Export interview data to DOCX format."""
+    return _export_to_path(data, docx_path, "docx")
+
+
+def export_interview_to_pdf(data, pdf_path):
+    """Export interview data to PDF format."""
+    return _export_to_path(data, pdf_path, "pdf")
+
 
 def export_both(input_json_path, output_basename, output_dir="outputs"):
     """Export interview data to both DOCX and PDF formats."""
     with open(input_json_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    os.makedirs(output_dir, exist_ok=True)
-    docx_path = os.path.join(output_dir, f"{output_basename}.docx")
-    pdf_path = os.path.join(output_dir, f"{output_basename}.pdf")
-    
-    export_interview_to_docx(data, docx_path)
-    export_interview_to_pdf(data, pdf_path)
-    
+    docx_path = export_data(data, output_basename, "docx", output_dir=output_dir)
+    pdf_path = export_data(data, output_basename, "pdf", output_dir=output_dir)
+
     return docx_path, pdf_path
 
 
 def export_interview_to_csv(data, csv_path):
     """Export interview data to CSV format."""
-    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["question", "answer"])
-        writer.writeheader()
-        for item in data:
-            writer.writerow({"question": item.get("question", ""), "answer": item.get("answer", "")})
-    return csv_path
+    return _export_to_path(data, csv_path, "csv")
 
 
 def export_interview_to_txt(data, txt_path):
     """Export interview data to plain text format."""
-    os.makedirs(os.path.dirname(txt_path), exist_ok=True)
-    with open(txt_path, "w", encoding="utf-8") as f:
-        f.write("Simulated Interview Transcript\n\n")
-        for item in data:
-            f.write(f"Q: {item.get('question', '')}\n")
-            f.write(f"A: {item.get('answer', '')}\n\n")
-    return txt_path
+    return _export_to_path(data, txt_path, "txt")
 
 
 def export_interview_to_html(data, html_path):
     """Export interview data to a simple HTML format."""
-    os.makedirs(os.path.dirname(html_path), exist_ok=True)
-    body = [
-        "<html><head><meta charset='utf-8'><title>Simulated Interview Transcript</title></head><body>",
-        "<h1>Simulated Interview Transcript</h1>",
-    ]
-    for item in data:
-        question = html.escape(_safe_text(item.get("question", "")))
-        answer = html.escape(_safe_text(item.get("answer", ""))).replace("\n", "<br>")
-        body.append(f"<h2>Q: {question}</h2>")
-        body.append(f"<p>{answer}</p>")
-    body.append("</body></html>")
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(body))
-    return html_path
+    return _export_to_path(data, html_path, "html")
 
 
 def export_format(input_json_path, output_basename, file_type, output_dir="outputs"):
@@ -108,31 +194,38 @@ def export_format(input_json_path, output_basename, file_type, output_dir="outpu
     with open(input_json_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    os.makedirs(output_dir, exist_ok=True)
-    file_type = str(file_type or "").lower()
-    output_path = os.path.join(output_dir, f"{output_basename}.{file_type}")
+    return export_data(data, output_basename, file_type, output_dir=output_dir)
 
-    exporters = {
-        "docx": export_interview_to_docx,
-        "pdf": export_interview_to_pdf,
-        "csv": export_interview_to_csv,
-        "txt": export_interview_to_txt,
-        "html": export_interview_to_html,
-    }
-    exporter = exporters.get(file_type)
-    if not exporter:
-        raise ValueError(f"Unsupported export format: {file_type}")
 
-    exporter(data, output_path)
-    return output_path
+def export_all_formats(input_json_path, output_basename, output_dir="outputs", parallel=False):
+    """Export interview data to DOCX, PDF, CSV, TXT, and HTML formats.
 
+    The JSON is parsed once and every format is rendered from it. With
+    `parallel=True`, DOCX and PDF render in the shared export pool
+    (backend.exports, EXPORT_WORKERS) while the text formats are written here.
+    PDF dominates the total, so this gains little; it stays opt-in.
+    """
+    with open(input_json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
 
-def export_all_formats(input_json_path, output_basename, output_dir="outputs"):
-    """Export interview data to DOCX, PDF, CSV, TXT, and HTML formats."""
-    return {
-        "docx": export_format(input_json_path, output_basename, "docx", output_dir=output_dir),
-        "pdf": export_format(input_json_path, output_basename, "pdf", output_dir=output_dir),
-        "csv": export_format(input_json_path, output_basename, "csv", output_dir=output_dir),
-        "txt": export_format(input_json_path, output_basename, "txt", output_dir=output_dir),
-        "html": export_format(input_json_path, output_basename, "html", output_dir=output_dir),
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        file_type: os.path.join(output_dir, f"{output_basename}.{file_type}")
+        for file_type in ("docx", "pdf", "csv", "txt", "html")
     }
+    if not parallel:
+        return {file_type: _export_to_path(data, path, file_type) for file_type, path in paths.items()}
+
+    # Imported here: backend.exports builds on this module.
+    from concurrent.futures import ThreadPoolExecutor
+
+    from backend.exports import render_in_pool
+
+    with ThreadPoolExecutor(max_workers=len(BINARY_EXPORTERS)) as waiters:
+        rendered = {file_type: waiters.submit(render_in_pool, data, file_type) for file_type in BINARY_EXPORTERS}
+        for file_type in TEXT_EXPORTERS:
+            _export_to_path(data, paths[file_type], file_type)
+        for file_type, future in rendered.items():
+            with open(paths[file_type], "wb") as f:
+                f.write(future.result())
+    return paths
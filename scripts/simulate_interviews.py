@@ -1,41 +1,36 @@
-import openai
+import asyncio
 import json
 import os
+from backend.llm import achat_completion, astream_chat_completion
+from backend.openai_client import get_async_openai_client, run_on_client_loop
 from config import get_secret
 
 
-def simulate_interview(persona_path, questions_path, output_path, settings=None):
+DEFAULT_SIMULATION_CONCURRENCY = 4
+
+
+def build_persona_intro(persona):
     """
-    Simulate an interview based on persona file and questions file.
+    Build the persona framing shared by every question of an interview.
     """
-    settings = settings or {}
+    # Build intro using original text if available, otherwise use structured fields
+    if persona.get("original_text") and persona["original_text"].strip():
+        # Use original text as the primary source
+        return f"You are {persona['name']}. Here is information about you:\n\n{persona['original_text']}\n\nBased on this information, answer the following questions authentically and in character."
+    # Fallback to structured fields
+    age_part = f", {persona['age']} years old" if persona.get("age") else ""
+    return f"You are {persona['name']}{age_part}, a {persona['job']} with traits: {persona['personality']}. Based on this persona, answer the following questions authentically."
 
-    # Load persona
-    with open(persona_path, 'r') as f:
-        persona = json.load(f)
-    
-    # Load questions
-    with open(questions_path, 'r') as f:
-        questions = [line.strip() for line in f.readlines() if line.strip()]
-    
-    client = openai.OpenAI(api_key=get_secret("OPENAI_API_KEY"))
-    model = settings.get("model", "gpt-3.5-turbo")
-    temperature = settings.get("temperature", 0.7)
-    max_tokens = settings.get("max_answer_tokens", 500)
+
+def build_system_prompt(settings):
+    """
+    Build the interview system prompt from protocol settings.
+    """
     shared_context = settings.get("shared_context", "").strip()
     interview_style = settings.get("interview_style", "").strip()
     consistency_rules = settings.get("consistency_rules", "").strip()
     protocol_name = settings.get("protocol_name", "").strip()
-    
-    # Build intro using original text if available, otherwise use structured fields
-    if persona.get("original_text") and persona["original_text"].strip():
-        # Use original text as the primary source
-        intro = f"You are {persona['name']}. Here is information about you:\n\n{persona['original_text']}\n\nBased on this information, answer the following questions authentically and in character."
-    else:
-        # Fallback to structured fields
-        age_part = f", {persona['age']} years old" if persona.get("age") else ""
-        intro = f"You are {persona['name']}{age_part}, a {persona['job']} with traits: {persona['personality']}. Based on this persona, answer the following questions authentically."
-    
+
     system_prompt = (
         "You are simulating a qualitative interview participant.\n"
         "Answer in first person.\n"
@@ -52,33 +47,135 @@ def simulate_interview(persona_path, questions_path, output_path, settings=None)
         system_prompt += f"\nConsistency rules:\n{consistency_rules}\n"
     if protocol_name:
         system_prompt += f"\nProtocol name: {protocol_name}\n"
+    return system_prompt
+
+
+def resolve_concurrency(settings):
+    """
+    Number of questions that may be in flight at once for one interview.
+    """
+    value = settings.get("simulation_concurrency") or get_secret("SIMULATION_CONCURRENCY") or DEFAULT_SIMULATION_CONCURRENCY
+    return max(1, int(value))
 
-    responses = []
-    for q in questions:
-        prompt = f"{intro}\n\nQuestion: {q.strip()}\nAnswer:"
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
-        
-        answer = response.choices[0].message.content
-        responses.append(
-            {
-                "question": q.strip(),
-                "answer": answer,
-                "protocol_name": protocol_name,
-            }
-        )
-    
-    # Save responses
+
+async def simulate_questions_async(persona, questions, settings=None, client=None, on_answer=None, on_token=None):
+    """
+    Simulate answers for in-memory persona/questions, running questions concurrently.
+
+    Each question is answered independently from the same persona framing, so the
+    questions run under a semaphore and the answers are returned in question order.
+    `on_answer(index, response)` is called from a worker thread as each answer arrives,
+    so callers can checkpoint them. If a question fails, the other questions still run
+    to completion before the first error is raised. With `on_token(index, text)` the
+    answers are streamed and every fragment is passed on as it arrives.
+    """
+    settings = settings or {}
+    questions = [q.strip() for q in questions if q and q.strip()]
+
+    model = settings.get("model", "gpt-3.5-turbo")
+    temperature = settings.get("temperature", 0.7)
+    max_tokens = settings.get("max_answer_tokens", 500)
+    protocol_name = settings.get("protocol_name", "").strip()
+    intro = build_persona_intro(persona)
+    system_prompt = build_system_prompt(settings)
+    semaphore = asyncio.Semaphore(resolve_concurrency(settings))
+
+    client = client or get_async_openai_client()
+
+    async def answer(index, question):
+        prompt = f"{intro}\n\nQuestion: {question}\nAnswer:"
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ]
+        async with semaphore:
+            if on_token is not None:
+                answer_text = await astream_chat_completion(
+                    client,
+                    lambda text: on_token(index, text),
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+            else:
+                # Answers are sampled on purpose, so they bypass the response cache unless asked otherwise.
+                response = await achat_completion(
+                    client,
+                    cache=bool(settings.get("cache_answers", False)),
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+                answer_text = response.choices[0].message.content
+        result = {
+            "question": question,
+            "answer": answer_text,
+            "protocol_name": protocol_name,
+        }
+        if on_answer is not None:
+            await asyncio.to_thread(on_answer, index, result)
+        return result
+
+    results = await asyncio.gather(*(answer(index, q) for index, q in enumerate(questions)), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+def run_coroutine_sync(coroutine):
+    """
+    Run a coroutine to completion from synchronous code, even if this thread already runs a loop.
+
+    Every call shares one long-lived background loop and its OpenAI client, so
+    connections are reused across simulations; the client is closed at shutdown.
+    """
+    return run_on_client_loop(coroutine)
+
+
+def simulate_questions(persona, questions, settings=None, on_answer=None, on_token=None):
+    """
+    Synchronous wrapper around simulate_questions_async.
+    """
+    return run_coroutine_sync(
+        simulate_questions_async(persona, questions, settings=settings, on_answer=on_answer, on_token=on_token)
+    )
+
+
+def _load_interview_inputs(persona_path, questions_path):
+    # Load persona
+    with open(persona_path, 'r') as f:
+        persona = json.load(f)
+
+    # Load questions
+    with open(questions_path, 'r') as f:
+        questions = [line.strip() for line in f.readlines() if line.strip()]
+    return persona, questions
+
+
+def _save_responses(responses, output_path):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     with open(output_path, 'w') as f:
         json.dump(responses, f, indent=2)
-    
+
+
+async def simulate_interview_async(persona_path, questions_path, output_path, settings=None):
+    """
+    Simulate an interview based on persona file and questions file without blocking the event loop.
+    """
+    persona, questions = _load_interview_inputs(persona_path, questions_path)
+    responses = await simulate_questions_async(persona, questions, settings=settings)
+    _save_responses(responses, output_path)
+    return responses
+
+
+def simulate_interview(persona_path, questions_path, output_path, settings=None):
+    """
+    Simulate an interview based on persona file and questions file.
+    """
+    persona, questions = _load_interview_inputs(persona_path, questions_path)
+    responses = simulate_questions(persona, questions, settings=settings)
+    _save_responses(responses, output_path)
     return responses
@@ -0,0 +1,5 @@
+alter table public.jobs
+  add column if not exists lease_owner text,
+  add column if not exists lease_expires_at timestamptz;
+
+create index if not exists idx_jobs_lease_expires_at on public.jobs(lease_expires_at);
@@ -0,0 +1,24 @@
+create table if not exists public.jobs (
+  id uuid primary key default gen_random_uuid(),
+  owner_user_id uuid not null references auth.users(id) on delete cascade,
+  study_id uuid references public.studies(id) on delete cascade,
+  kind text not null,
+  status text not null default 'queued',
+  params jsonb not null default '{}'::jsonb,
+  progress jsonb not null default '{}'::jsonb,
+  result_ids jsonb not null default '[]'::jsonb,
+  error text,
+  attempts integer not null default 0,
+  started_at timestamptz,
+  finished_at timestamptz,
+  created_at timestamptz not null default timezone('utc', now()),
+  updated_at timestamptz not null default timezone('utc', now())
+);
+
+drop trigger if exists trg_jobs_updated_at on public.jobs;
+create trigger trg_jobs_updated_at
+before update on public.jobs
+for each row execute function public.set_updated_at();
+
+create index if not exists idx_jobs_owner_user_id on public.jobs(owner_user_id);
+create index if not exists idx_jobs_status on public.jobs(status);
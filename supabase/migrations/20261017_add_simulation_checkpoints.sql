@@ -0,0 +1,6 @@
+alter table public.simulations
+  add column if not exists questions jsonb,
+  add column if not exists status text not null default 'completed',
+  add column if not exists error text;
+
+create index if not exists idx_simulations_status on public.simulations(status);
@@ -0,0 +1,7 @@
+alter table public.transcripts
+  add column if not exists content_chars integer generated always as (char_length(content)) stored;
+alter table public.simulations
+  add column if not exists response_count integer generated always as (jsonb_array_length(responses)) stored;
+
+create index if not exists idx_transcripts_study_id on public.transcripts(study_id);
+create index if not exists idx_simulations_study_id on public.simulations(study_id);
@@ -63,6 +63,7 @@ create table if not exists public.transcripts (
   study_id uuid references public.studies(id) on delete cascade,
   name text not null,
   content text not null,
+  content_chars integer generated always as (char_length(content)) stored,
   source_type text not null default 'text',
   created_at timestamptz not null default timezone('utc', now()),
   updated_at timestamptz not null default timezone('utc', now())
@@ -75,7 +76,11 @@ create table if not exists public.simulations (
   persona_id uuid references public.personas(id) on delete set null,
   question_guide_id uuid references public.question_guides(id) on delete set null,
   protocol_id uuid references public.protocols(id) on delete set null,
+  questions jsonb,
   responses jsonb not null default '[]'::jsonb,
+  response_count integer generated always as (jsonb_array_length(responses)) stored,
+  status text not null default 'completed',
+  error text,
   created_at timestamptz not null default timezone('utc', now()),
   updated_at timestamptz not null default timezone('utc', now())
 );
@@ -103,6 +108,25 @@ create table if not exists public.comparisons (
   updated_at timestamptz not null default timezone('utc', now())
 );
 
+create table if not exists public.jobs (
+  id uuid primary key default gen_random_uuid(),
+  owner_user_id uuid not null references auth.users(id) on delete cascade,
+  study_id uuid references public.studies(id) on delete cascade,
+  kind text not null,
+  status text not null default 'queued',
+  params jsonb not null default '{}'::jsonb,
+  progress jsonb not null default '{}'::jsonb,
+  result_ids jsonb not null default '[]'::jsonb,
+  error text,
+  attempts integer not null default 0,
+  lease_owner text,
+  lease_expires_at timestamptz,
+  started_at timestamptz,
+  finished_at timestamptz,
+  created_at timestamptz not null default timezone('utc', now()),
+  updated_at timestamptz not null default timezone('utc', now())
+);
+
 drop trigger if exists trg_studies_updated_at on public.studies;
 create trigger trg_studies_updated_at
 before update on public.studies
@@ -143,6 +167,11 @@ create trigger trg_comparisons_updated_at
 before update on public.comparisons
 for each row execute function public.set_updated_at();
 
+drop trigger if exists trg_jobs_updated_at on public.jobs;
+create trigger trg_jobs_updated_at
+before update on public.jobs
+for each row execute function public.set_updated_at();
+
 create index if not exists idx_studies_owner_user_id on public.studies(owner_user_id);
 create index if not exists idx_protocols_owner_user_id on public.protocols(owner_user_id);
 create index if not exists idx_personas_owner_user_id on public.personas(owner_user_id);
@@ -151,3 +180,9 @@ create index if not exists idx_transcripts_owner_user_id on public.transcripts(o
 create index if not exists idx_simulations_owner_user_id on public.simulations(owner_user_id);
 create index if not exists idx_gioia_analyses_owner_user_id on public.gioia_analyses(owner_user_id);
 create index if not exists idx_comparisons_owner_user_id on public.comparisons(owner_user_id);
+create index if not exists idx_jobs_owner_user_id on public.jobs(owner_user_id);
+create index if not exists idx_jobs_status on public.jobs(status);
+create index if not exists idx_jobs_lease_expires_at on public.jobs(lease_expires_at);
+create index if not exists idx_transcripts_study_id on public.transcripts(study_id);
+create index if not exists idx_simulations_study_id on public.simulations(study_id);
+create index if not exists idx_simulations_status on public.simulations(status);
@@ -0,0 +1,57 @@
+import pytest
+
+from backend import token_budget
+from backend.token_budget import Tokenizer
+from scripts.analyze_gioia import chunk_text
+
+INTERVIEW = (
+    "Q: How did you adopt the scheduling tool?\n"
+    "A: Onboarding took longer than expected, but the shared calendar helped.\n\n\n"
+    "Q: 新しいツールについてどう思いましたか？\n"
+    "A: " + "通知が多すぎて、オフラインモードがないのが不便でした。" * 30 + "\n"
+    "Q: Что бы вы изменили?\n"
+    "A: " + "Уведомления и отсутствие офлайн-режима. 🔔 " * 25 + "\n"
+    "\n\n"
+)
+
+
+def _byte_level_encoding():
+    """A tiktoken encoding whose tokens are single bytes, so every non-ASCII character spans several tokens."""
+    tiktoken = pytest.importorskip("tiktoken")
+    return tiktoken.Encoding(
+        name="bytes",
+        pat_str=r"""\s?[^\s]+|\s+""",
+        mergeable_ranks={bytes([value]): value for value in range(256)},
+        special_tokens={},
+    )
+
+
+@pytest.fixture(params=["offline", "byte_level"])
+def tokenizer(request, monkeypatch):
+    encoding = None if request.param == "offline" else _byte_level_encoding()
+    monkeypatch.setattr(token_budget, "_load_encoding", lambda name: encoding)
+    return Tokenizer("gpt-4o")
+
+
+@pytest.mark.parametrize("chunk_tokens", [7, 40, 300])
+def test_chunks_concatenate_back_to_the_input(tokenizer, chunk_tokens):
+    chunks = chunk_text(INTERVIEW, tokenizer, chunk_tokens)
+    assert len(chunks) > 1
+    assert "".join(chunks) == INTERVIEW
+    assert all(chunk.strip() for chunk in chunks)
+
+
+@pytest.mark.parametrize("chunk_tokens", [1, 5, 64])
+def test_split_windows_round_trip_and_respect_the_limit(tokenizer, chunk_tokens):
+    line = INTERVIEW.splitlines(keepends=True)[4]
+    windows = tokenizer.split(line, chunk_tokens)
+    assert "".join(windows) == line
+    if tokenizer.exact:
+        # Windows start on token boundaries, so only a character straddling a boundary can add a token.
+        assert all(len(tokenizer.encoding.encode(window)) <= chunk_tokens + 4 for window in windows)
+    else:
+        assert all(tokenizer.count(window) <= max(chunk_tokens, tokenizer.count(window[:1])) for window in windows)
+
+
+def test_blank_text_has_no_chunks(tokenizer):
+    assert chunk_text("\n \n\n", tokenizer, 10) == []
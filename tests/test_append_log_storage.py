@@ -0,0 +1,34 @@
+from datetime import UTC, datetime, timedelta
+from itertools import count
+
+from backend import storage as storage_module
+from backend.storage import AppendLogStorage
+
+
+def test_updated_records_keep_their_creation_order(tmp_path, monkeypatch):
+    ticks = count()
+    start = datetime(2026, 10, 17, tzinfo=UTC)
+    monkeypatch.setattr(storage_module, "utc_now", lambda: start + timedelta(seconds=next(ticks)))
+    storage = AppendLogStorage(tmp_path)
+    first = storage.upsert_item("studies", {"name": "first"})
+    storage.upsert_item("studies", {"name": "second"})
+    first["name"] = "first, renamed"
+    storage.upsert_item("studies", first)
+
+    assert [item["name"] for item in storage.list_items("studies")] == ["first, renamed", "second"]
+
+
+def test_a_torn_last_line_is_dropped_and_appends_continue(tmp_path):
+    storage = AppendLogStorage(tmp_path)
+    kept = storage.upsert_item("studies", {"name": "kept"})
+    log_path = tmp_path / "studies.jsonl"
+    intact_size = log_path.stat().st_size
+    with log_path.open("ab") as handle:
+        handle.write(b'{"id":"torn","name":"half wri')
+
+    reopened = AppendLogStorage(tmp_path)
+    assert [item["id"] for item in reopened.list_items("studies")] == [kept["id"]]
+    assert log_path.stat().st_size == intact_size
+
+    added = reopened.upsert_item("studies", {"name": "added"})
+    assert AppendLogStorage(tmp_path).get_item("studies", added["id"])["name"] == "added"
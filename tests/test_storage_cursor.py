@@ -0,0 +1,40 @@
+import base64
+import json
+import uuid
+
+import pytest
+
+from backend.errors import InvalidCursorError
+from backend.storage import decode_cursor, encode_cursor, postgrest_quote
+
+ITEM_ID = str(uuid.uuid4())
+
+
+def _raw_cursor(value, item_id):
+    raw = json.dumps([value, item_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("created_at", ["2026-10-17T09:30:00.123456+00:00", None])
+def test_encoded_cursors_decode(created_at):
+    cursor = encode_cursor({"created_at": created_at, "id": ITEM_ID}, "created_at")
+    assert decode_cursor(cursor) == (created_at or "", ITEM_ID)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        _raw_cursor("2026-10-17T09:30:00+00:00", "x,owner_user_id.neq.nobody"),
+        _raw_cursor('2026-10-17",or(owner_user_id.neq.nobody', ITEM_ID),
+        _raw_cursor(1, ITEM_ID),
+        _raw_cursor("2026-10-17T09:30:00+00:00", None),
+        "not base64 !",
+    ],
+)
+def test_crafted_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_postgrest_quote_escapes_quotes_and_backslashes():
+    assert postgrest_quote('a"b\\c') == '"a\\"b\\\\c"'
@@ -0,0 +1,65 @@
+import pytest
+
+from backend import token_budget
+from backend.token_budget import Tokenizer, context_window, fit_messages
+
+CHINESE = "研究参与者描述了他们在试点期间如何采用新的排班工具，以及入职培训比预期花费更长的时间。"
+RUSSIAN = "Участники описали, как они внедрили новый инструмент планирования во время пилотного проекта."
+JAPANESE = "参加者は、試験運用中に新しいスケジュールツールをどのように導入したかを説明しました。"
+EMOJI = "Onboarding went fine 👍🙂 but notifications 🔔🔔🔔 were noisy."
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Tokenizers built inside the test use the offline estimate, as when the BPE files cannot be downloaded."""
+    monkeypatch.setattr(token_budget, "_load_encoding", lambda name: None)
+
+
+def _exact_encoding(name):
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception:
+        return None
+
+
+@pytest.mark.parametrize("text", [CHINESE, RUSSIAN, JAPANESE, EMOJI])
+def test_offline_estimate_charges_every_non_ascii_character(offline, text):
+    non_ascii = sum(1 for char in text if not char.isascii())
+    assert Tokenizer("gpt-4o").count(text) >= non_ascii
+
+
+@pytest.mark.parametrize("model,encoding", [("gpt-3.5-turbo", "cl100k_base"), ("gpt-4o", "o200k_base")])
+@pytest.mark.parametrize("text", [CHINESE, RUSSIAN, JAPANESE, EMOJI])
+def test_offline_estimate_never_undercounts_the_real_tokenizer(offline, model, encoding, text):
+    exact = _exact_encoding(encoding)
+    if exact is None:
+        pytest.skip(f"{encoding} BPE file is not available offline")
+    for repeat in (1, 50):
+        sample = text * repeat
+        assert Tokenizer(model).count(sample) >= len(exact.encode(sample))
+
+
+@pytest.mark.parametrize("text", [CHINESE * 40, RUSSIAN * 40, JAPANESE * 40])
+def test_offline_truncate_cuts_inside_unspaced_text(offline, text):
+    tokenizer = Tokenizer("gpt-4o")
+    kept = tokenizer.truncate(text, 50)
+    assert kept and text.startswith(kept)
+    assert tokenizer.count(kept) <= 50
+
+
+def test_fit_messages_keeps_non_latin_prompts_inside_the_window(offline):
+    model = "gpt-4"
+    source = CHINESE * 2000
+
+    def build(sections):
+        return [
+            {"role": "system", "content": "Summarise the interview."},
+            {"role": "user", "content": sections["transcript"]},
+        ]
+
+    messages, report = fit_messages(model, build, {"transcript": source}, completion_tokens=1000)
+    assert report["sections"]["transcript"]["truncated"]
+    assert report["prompt_tokens"] + 1000 <= context_window(model)
+    assert sum(1 for char in messages[1]["content"] if not char.isascii()) <= context_window(model) - 1000
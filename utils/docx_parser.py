@@ -14,7 +14,8 @@ def extract_text_from_docx(docx_file) -> str:
     Extract plain text from a DOCX file.
     """
     try:
-        docx_file.seek(0)
+        if hasattr(docx_file, "seek"):
+            docx_file.seek(0)
         document = Document(docx_file)
         paragraphs = [paragraph.text.strip() for paragraph in document.paragraphs if paragraph.text.strip()]
         return "\n".join(paragraphs)
@@ -0,0 +1,332 @@
+import io
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from collections import Counter
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import PyPDF2
+import fitz  # PyMuPDF
+import pdfplumber
+
+from backend.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+# A page is accepted from the first engine whose text is long enough and mostly readable.
+MIN_PAGE_CHARS = 20
+MIN_PAGE_SCORE = 0.8
+# Below this alphanumeric share of the visible characters a page reads as glyph soup.
+MIN_ALNUM_RATIO = 0.5
+# Smaller documents are extracted in-process; spawning page workers costs more than it saves.
+PARALLEL_MIN_PAGES = 200
+RANGES_PER_WORKER = 2
+
+_UNREADABLE = re.compile(r"\ufffd|[\x00-\x08\x0b\x0c\x0e-\x1f]|[\ue000-\uf8ff]|\(cid:\d+\)")
+_NOT_ALNUM = re.compile(r"[\W_]+")
+_WHITESPACE = re.compile(r"\s+")
+_PAGE_RANGE = re.compile(r"\s*(\d+)\s*(?:(-)\s*(\d*)\s*)?")
+
+# A PDF is handled either as a path, which every library (and every page worker) opens itself, or as bytes.
+PdfSource = Union[str, bytes]
+
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_workers = 0
+_page_pool_lock = threading.Lock()
+# Set in the upload parser's worker processes, which extract in-process rather than nest a page pool.
+_in_worker_process = False
+
+
+def score_page_text(text: str) -> float:
+    """
+    Score extracted page text from 0 (empty or garbage) to 1 (clean prose).
+
+    Penalises replacement characters, control and private-use code points and
+    pdfplumber's "(cid:N)" placeholders, which is what a font without a usable
+    Unicode map produces, and text that is mostly symbols rather than words.
+    """
+    stripped = text.strip() if text else ""
+    if not stripped:
+        return 0.0
+    unreadable = sum(len(match) for match in _UNREADABLE.findall(stripped))
+    readable_ratio = 1 - unreadable / len(stripped)
+    visible = len(_WHITESPACE.sub("", stripped)) or 1
+    alnum_ratio = len(_NOT_ALNUM.sub("", stripped)) / visible
+    return max(0.0, readable_ratio) * min(1.0, alnum_ratio / MIN_ALNUM_RATIO)
+
+
+def is_good_page(text: str) -> bool:
+    """
+    True when a page's text is long and clean enough to skip the fallback engines.
+    """
+    return len(text.strip()) >= MIN_PAGE_CHARS and score_page_text(text) >= MIN_PAGE_SCORE
+
+
+def _page_quality(text: str) -> float:
+    return score_page_text(text) * min(1.0, len(text.strip()) / MIN_PAGE_CHARS)
+
+
+def parse_page_spec(spec: str) -> List[Tuple[int, Optional[int]]]:
+    """
+    Parse a page selection such as "1-5,8,20-" into 1-based inclusive ranges.
+
+    An open end ("20-") runs to the last page. Raises ValueError on bad syntax.
+    """
+    ranges = []
+    for part in spec.split(","):
+        match = _PAGE_RANGE.fullmatch(part)
+        if not match:
+            raise ValueError(f"Invalid page range: {part.strip()!r}")
+        start = int(match.group(1))
+        end = (int(match.group(3)) if match.group(3) else None) if match.group(2) else start
+        if start < 1 or (end is not None and end < start):
+            raise ValueError(f"Invalid page range: {part.strip()!r}")
+        ranges.append((start, end))
+    return ranges
+
+
+def normalize_page_spec(spec: Optional[str]) -> Optional[str]:
+    """
+    Canonical form of a page selection (None for all pages), e.g. for cache keys.
+    """
+    if spec is None or not spec.strip():
+        return None
+    return ",".join(
+        str(start) if end == start else f"{start}-{end or ''}"
+        for start, end in sorted(parse_page_spec(spec), key=lambda page_range: (page_range[0], page_range[1] or 0))
+    )
+
+
+def select_pages(spec: Optional[str], page_count: int) -> List[int]:
+    """
+    Zero-based indexes of the selected pages that exist, in document order.
+    """
+    if spec is None or not spec.strip():
+        return list(range(page_count))
+    selected = set()
+    for start, end in parse_page_spec(spec):
+        selected.update(range(start - 1, min(end or page_count, page_count)))
+    return sorted(selected)
+
+
+def _pdf_source(pdf_file) -> PdfSource:
+    if isinstance(pdf_file, (str, os.PathLike)):
+        return os.fspath(pdf_file)
+    if isinstance(pdf_file, bytes):
+        return pdf_file
+    if isinstance(pdf_file, (bytearray, memoryview)):
+        return bytes(pdf_file)
+    if hasattr(pdf_file, "seek"):
+        pdf_file.seek(0)
+    return pdf_file.read()
+
+
+def _stream(source: PdfSource):
+    return source if isinstance(source, str) else io.BytesIO(source)
+
+
+def _open_fitz(source: PdfSource):
+    try:
+        if isinstance(source, str):
+            return fitz.open(source, filetype="pdf")
+        return fitz.open(stream=source, filetype="pdf")
+    except Exception:
+        logger.warning("PyMuPDF could not open the PDF; using the fallback engines for every page")
+        return None
+
+
+class _FallbackPages:
+    """
+    Per-page access to pdfplumber and PyPDF2, opened only if a page needs them.
+    """
+
+    def __init__(self, source: PdfSource):
+        self.source = source
+        self._plumber = None
+        self._pypdf = None
+
+    def pdfplumber_page(self, index: int) -> str:
+        if self._plumber is None:
+            self._plumber = pdfplumber.open(_stream(self.source))
+        page = self._plumber.pages[index]
+        try:
+            return page.extract_text() or ""
+        finally:
+            page.close()
+
+    def pypdf2_page(self, index: int) -> str:
+        if self._pypdf is None:
+            self._pypdf = PyPDF2.PdfReader(_stream(self.source))
+        return self._pypdf.pages[index].extract_text() or ""
+
+    def engines(self):
+        return (("pdfplumber", self.pdfplumber_page), ("pypdf2", self.pypdf2_page))
+
+    def close(self) -> None:
+        if self._plumber is not None:
+            self._plumber.close()
+
+
+def _extract_page(document, fallback: _FallbackPages, index: int) -> Tuple[str, str]:
+    candidates = []
+    engines = [("pymupdf", lambda i: document[i].get_text())] if document is not None else []
+    for engine, extract in engines + list(fallback.engines()):
+        try:
+            text = extract(index)
+        except Exception:
+            logger.debug("%s failed on page %s", engine, index + 1, exc_info=True)
+            continue
+        if is_good_page(text):
+            return text, engine
+        candidates.append((text, engine))
+    best = max(candidates, key=lambda candidate: _page_quality(candidate[0]), default=("", "none"))
+    return best if best[0].strip() else ("", "none")
+
+
+def _iter_page_indexes(source: PdfSource, indexes: List[int]) -> Iterator[Tuple[int, str, str]]:
+    document = _open_fitz(source)
+    fallback = _FallbackPages(source)
+    try:
+        for index in indexes:
+            text, engine = _extract_page(document, fallback, index)
+            yield index, text, engine
+    finally:
+        fallback.close()
+        if document is not None:
+            document.close()
+
+
+def _extract_indexes(source: PdfSource, indexes: List[int]) -> List[Tuple[str, str]]:
+    return [(text, engine) for _, text, engine in _iter_page_indexes(source, indexes)]
+
+
+def _count_pages(source: PdfSource) -> int:
+    document = _open_fitz(source)
+    if document is not None:
+        try:
+            return document.page_count
+        finally:
+            document.close()
+    return len(PyPDF2.PdfReader(_stream(source)).pages)
+
+
+def _split(indexes: List[int], parts: int) -> List[List[int]]:
+    size = -(-len(indexes) // max(1, parts))
+    return [indexes[start:start + size] for start in range(0, len(indexes), size)]
+
+
+def _resolve_page_workers(page_workers: Optional[int]) -> int:
+    workers = settings.pdf_page_workers if page_workers is None else page_workers
+    if workers <= 0:
+        workers = min(4, os.cpu_count() or 1)
+    return workers
+
+
+def mark_worker_process() -> None:
+    """Keep page extraction in this process; called by pool workers so they do not spawn pools of their own."""
+    global _in_worker_process
+    _in_worker_process = True
+
+
+def _get_page_pool(workers: int) -> ProcessPoolExecutor:
+    global _page_pool, _page_pool_workers
+    with _page_pool_lock:
+        if _page_pool is not None and _page_pool_workers != workers:
+            # Resized: ranges other callers already queued still finish in the old pool before it exits.
+            _page_pool.shutdown(wait=False)
+            _page_pool = None
+        if _page_pool is None:
+            # spawn: this may run inside a threaded server process, where fork is unsafe.
+            _page_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _page_pool_workers = workers
+        return _page_pool
+
+
+def shutdown_page_pool() -> None:
+    global _page_pool, _page_pool_workers
+    with _page_pool_lock:
+        pool, _page_pool = _page_pool, None
+        _page_pool_workers = 0
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_pdf_pages(pdf_file, pages: Optional[str] = None) -> Iterator[Tuple[int, str, str]]:
+    """
+    Lazily extract the selected pages, yielding (zero-based index, text, engine).
+
+    Pages are only parsed as the caller asks for them, so a consumer that stops
+    early never pays for the rest of the document.
+    """
+    source = _pdf_source(pdf_file)
+    indexes = select_pages(pages, _count_pages(source))
+    yield from _iter_page_indexes(source, indexes)
+
+
+def extract_pdf_pages(
+    pdf_file, page_workers: Optional[int] = None, pages: Optional[str] = None
+) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Extract the text of the selected pages and report how many pages each engine produced.
+
+    PyMuPDF reads every page first; a page whose text scores poorly is retried
+    with pdfplumber and then PyPDF2, and the best-scoring text is kept. Selections
+    of at least PARALLEL_MIN_PAGES pages are split into page ranges extracted in
+    a process pool of `page_workers` (PDF_PAGE_WORKERS; 0 picks up to 4 by CPU),
+    except inside the upload parser's worker processes, which extract in-process.
+
+    `pdf_file` may be a path, bytes or a binary file object. A path is opened by
+    each library (and page worker) directly instead of being read into memory.
+    """
+    source = _pdf_source(pdf_file)
+    indexes = select_pages(pages, _count_pages(source))
+    workers = _resolve_page_workers(page_workers)
+
+    results = None
+    if workers > 1 and not _in_worker_process and len(indexes) >= PARALLEL_MIN_PAGES:
+        try:
+            pool = _get_page_pool(workers)
+            futures = [pool.submit(_extract_indexes, source, part) for part in _split(indexes, workers * RANGES_PER_WORKER)]
+            results = [page for future in futures for page in future.result()]
+        except (BrokenProcessPool, OSError):
+            logger.warning("PDF page workers unavailable; extracting %s pages in-process", len(indexes), exc_info=True)
+            shutdown_page_pool()
+    if results is None:
+        results = _extract_indexes(source, indexes)
+
+    texts = [text for text, _ in results]
+    engines = Counter(engine for _, engine in results)
+    return texts, dict(engines)
+
+
+def extract_pdf_text(
+    pdf_file, page_workers: Optional[int] = None, pages: Optional[str] = None, max_chars: Optional[int] = None
+) -> str:
+    """
+    Extract the text of a PDF as one string, one block per non-empty page.
+
+    With `max_chars`, pages are read lazily in order and extraction stops as soon
+    as the budget is filled; the result is cut to exactly `max_chars`.
+    """
+    if max_chars is None:
+        texts, _ = extract_pdf_pages(pdf_file, page_workers=page_workers, pages=pages)
+        return "\n".join(text.strip() for text in texts if text.strip())
+
+    parts: List[str] = []
+    collected = 0
+    with closing(iter_pdf_pages(pdf_file, pages=pages)) as page_iter:
+        for _, text, _ in page_iter:
+            text = text.strip()
+            if not text:
+                continue
+            parts.append(text)
+            collected += len(text) + 1
+            if collected >= max_chars:
+                break
+    return "\n".join(parts)[:max_chars]
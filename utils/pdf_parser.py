@@ -1,52 +1,30 @@
-import PyPDF2
-import pdfplumber
-import fitz  # PyMuPDF
-import openai
 import os
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import re
 import logging
 
+from backend.llm import chat_completion
+from backend.openai_client import get_openai_client
+from backend.token_budget import fit_messages, source_char_budget
+from utils.pdf_engine import extract_pdf_text
+
 
 logger = logging.getLogger(__name__)
 
-def extract_text_from_pdf(pdf_file) -> str:
+# Question extraction never sees more text than fits one prompt, so stop reading pages there.
+QUESTION_TEXT_MAX_CHARS = source_char_budget("gpt-3.5-turbo", completion_tokens=1000)
+
+def extract_text_from_pdf(pdf_file, pages: Optional[str] = None, max_chars: Optional[int] = None) -> str:
     """
-    Extract text from PDF using multiple methods for best results.
+    Extract text from PDF: PyMuPDF first, with per-page pdfplumber/PyPDF2 fallback.
+
+    `pages` selects pages ("1-5,8"); `max_chars` stops reading once that much text is extracted.
     """
-    text_content = ""
-    
     try:
-        # Method 1: Try pdfplumber first (best for structured text)
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_content += page_text + "\n"
-        
-        # If pdfplumber didn't extract much text, try PyMuPDF
-        if len(text_content.strip()) < 100:
-            pdf_file.seek(0)  # Reset file pointer
-            pdf_document = fitz.open(stream=pdf_file.read(), filetype="pdf")
-            text_content = ""
-            for page_num in range(pdf_document.page_count):
-                page = pdf_document[page_num]
-                text_content += page.get_text() + "\n"
-            pdf_document.close()
-        
-        # If still not much text, try PyPDF2 as fallback
-        if len(text_content.strip()) < 100:
-            pdf_file.seek(0)  # Reset file pointer
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text_content = ""
-            for page in pdf_reader.pages:
-                text_content += page.extract_text() + "\n"
-                
-    except Exception as e:
+        return extract_pdf_text(pdf_file, pages=pages, max_chars=max_chars)
+    except Exception:
         logger.exception("Error extracting text from PDF")
         return ""
-    
-    return text_content.strip()
 
 def extract_questions_with_ai(text_content: str) -> List[str]:
     """
@@ -56,10 +34,10 @@ def extract_questions_with_ai(text_content: str) -> List[str]:
         return []
     
     try:
-        from config import get_secret
-        client = openai.OpenAI(api_key=get_secret("OPENAI_API_KEY"))
+        client = get_openai_client()
         
-        prompt = f"""
+        def build_messages(sections):
+            prompt = f"""
         Please analyze the following text and extract all interview questions. 
         Look for:
         1. Direct questions (ending with ?)
@@ -70,15 +48,19 @@ def extract_questions_with_ai(text_content: str) -> List[str]:
         Only return the questions, nothing else.
         
         Text to analyze:
-        {text_content[:4000]}  # Limit to avoid token limits
+        {sections["text"]}
         """
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
+            return [
                 {"role": "system", "content": "You are an expert at identifying interview questions from text. Extract only clear, well-formed questions that would be suitable for interviews."},
                 {"role": "user", "content": prompt}
-            ],
+            ]
+        
+        # Size the source text to the model's context window instead of a fixed character cut
+        messages, _ = fit_messages("gpt-3.5-turbo", build_messages, {"text": text_content}, completion_tokens=1000)
+        response = chat_completion(
+            client,
+            model="gpt-3.5-turbo",
+            messages=messages,
             max_tokens=1000,
             temperature=0.1
         )
@@ -109,8 +91,7 @@ def validate_and_improve_questions(questions: List[str]) -> List[str]:
         return []
     
     try:
-        from config import get_secret
-        client = openai.OpenAI(api_key=get_secret("OPENAI_API_KEY"))
+        client = get_openai_client()
         
         questions_text = "\n".join([f"{i+1}. {q}" for i, q in enumerate(questions)])
         
@@ -127,7 +108,8 @@ def validate_and_improve_questions(questions: List[str]) -> List[str]:
         {questions_text}
         """
         
-        response = client.chat.completions.create(
+        response = chat_completion(
+            client,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are an expert at crafting effective interview questions for research purposes."},
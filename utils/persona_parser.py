@@ -1,53 +1,26 @@
 import logging
-from typing import Dict
-
-import PyPDF2
-import fitz  # PyMuPDF
-import openai
-import pdfplumber
+from typing import Dict, Optional
 
+from backend.llm import chat_completion
+from backend.openai_client import get_openai_client
+from backend.token_budget import fit_messages
 from utils.docx_parser import extract_text_from_docx
+from utils.pdf_engine import extract_pdf_text
 
 
 logger = logging.getLogger(__name__)
 
-def extract_text_from_pdf_persona(pdf_file) -> str:
+ORIGINAL_TEXT_MAX_CHARS = 5000
+
+def extract_text_from_pdf_persona(pdf_file, pages: Optional[str] = None, max_chars: Optional[int] = None) -> str:
     """
-    Extract text from PDF using multiple methods for persona parsing.
+    Extract text from PDF for persona parsing (see utils.pdf_engine).
     """
-    text_content = ""
-    
     try:
-        # Method 1: Try pdfplumber first (best for structured text)
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_content += page_text + "\n"
-        
-        # If pdfplumber didn't extract much text, try PyMuPDF
-        if len(text_content.strip()) < 100:
-            pdf_file.seek(0)  # Reset file pointer
-            pdf_document = fitz.open(stream=pdf_file.read(), filetype="pdf")
-            text_content = ""
-            for page_num in range(pdf_document.page_count):
-                page = pdf_document[page_num]
-                text_content += page.get_text() + "\n"
-            pdf_document.close()
-        
-        # If still not much text, try PyPDF2 as fallback
-        if len(text_content.strip()) < 100:
-            pdf_file.seek(0)  # Reset file pointer
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text_content = ""
-            for page in pdf_reader.pages:
-                text_content += page.extract_text() + "\n"
-                
-    except Exception as e:
+        return extract_pdf_text(pdf_file, pages=pages, max_chars=max_chars)
+    except Exception:
         logger.exception("Error extracting text from persona PDF")
         return ""
-    
-    return text_content.strip()
 
 def extract_persona_info_with_ai(text_content: str, persona_counter: int) -> Dict:
     """
@@ -57,10 +30,10 @@ def extract_persona_info_with_ai(text_content: str, persona_counter: int) -> Dic
         return create_default_persona(persona_counter)
     
     try:
-        from config import get_secret
-        client = openai.OpenAI(api_key=get_secret("OPENAI_API_KEY"))
+        client = get_openai_client()
         
-        prompt = f"""
+        def build_messages(sections):
+            prompt = f"""
         Please analyze the following text and extract persona information for creating an interview character.
         Extract the following information if available:
         
@@ -87,15 +60,19 @@ def extract_persona_info_with_ai(text_content: str, persona_counter: int) -> Dic
         For other fields, if information is not available, use "Not specified".
         
         Text to analyze:
-        {text_content[:3000]}  # Limit to avoid token limits
+        {sections["text"]}
         """
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
+            return [
                 {"role": "system", "content": "You are an expert at extracting persona information from text. Always respond with valid JSON."},
                 {"role": "user", "content": prompt}
-            ],
+            ]
+        
+        # Size the source text to the model's context window instead of a fixed character cut
+        messages, _ = fit_messages("gpt-3.5-turbo", build_messages, {"text": text_content}, completion_tokens=800)
+        response = chat_completion(
+            client,
+            model="gpt-3.5-turbo",
+            messages=messages,
             max_tokens=800,
             temperature=0.2
         )
@@ -131,7 +108,7 @@ def extract_persona_info_with_ai(text_content: str, persona_counter: int) -> Dic
             "job": persona_data["job"],
             "education": persona_data["education"],
             "personality": persona_data["personality"],
-            "original_text": text_content[:5000],  # Store original text for AI to use
+            "original_text": text_content[:ORIGINAL_TEXT_MAX_CHARS],  # Store original text for AI to use
             "opinions": {
                 "AI": persona_data["ai_opinion"],
                 "Remote Work": persona_data["remote_work_opinion"]